@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
-from django.db.models import Q, Count, Sum
+from django.db.models import Q, Count, OuterRef, Subquery, Sum
 from datetime import datetime
 from django import forms
 from .models import (
@@ -9,8 +9,12 @@ from .models import (
     Loadinginformation, Operationinformation,
     Stylebasicinformation, EtlExtractLog, EtlQcrExtractLog,
     Size, Color, Style, LineTarget, LineTargetDetail, BreakdownCategory, Breakdown, ClientPurchaseOrder,
-    TransferToPacking
+    TransferToPacking, DailyProductionRollup, PoProgress
 )
+from .admin_pagination import EstimatedCountAdminMixin, KeysetPaginationAdminMixin
+from .line_targets import deferred_line_target_totals
+from .attendance import get_line_attendance, get_present_employee_ids, parse_attendance_date, summarize_attendance
+from .production_categories import CATEGORY_BITS, PRODUCTION_CATEGORIES, category_q, category_totals
 
 
 class LineTargetDetailForm(forms.ModelForm):
@@ -25,7 +29,7 @@ class ProductionFilter(admin.SimpleListFilter):
 
     def lookups(self, request, model_admin):
         # Start with base queryset
-        queryset = OperatorDailyPerformance.objects.all()
+        queryset = DailyProductionRollup.objects.all()
 
         # Check if any date filters are applied
         has_date_filter = (
@@ -69,63 +73,19 @@ class ProductionFilter(admin.SimpleListFilter):
                 elif odp_date_range == 'today_yesterday':
                     queryset = queryset.filter(odp_date__in=[yesterday, today])
 
-        # Calculate sums for each production category
-        categories = []
-
-        # Offline
-        offline_qty = queryset.filter(oc_description='Garment Insert in Poly Bag & Close').aggregate(
-            total=Sum('odpd_quantity'))['total'] or 0
-        categories.append(('offline', f"{_('Offline')} (Quantity: {offline_qty})"))
-
-        # Loading
-        loading_qty = queryset.filter(oc_description='Loading/Panel Segregation').aggregate(
-            total=Sum('odpd_quantity'))['total'] or 0
-        categories.append(('loading', f"{_('Loading')} (Quantity: {loading_qty})"))
-
-        # Midline
-        midline_qty = queryset.filter(oc_description__icontains='midline').aggregate(
-            total=Sum('odpd_quantity'))['total'] or 0
-        categories.append(('midline', f"{_('QC(midline)')} (Quantity: {midline_qty})"))
-
-        # Endline
-        endline_qty = queryset.filter(oc_description__icontains='endline').aggregate(
-            total=Sum('odpd_quantity'))['total'] or 0
-        categories.append(('endline', f"{_('QC(endline)')} (Quantity: {endline_qty})"))
-
-        # Final
-        final_qty = queryset.filter(oc_description__icontains='final').aggregate(
-            total=Sum('odpd_quantity'))['total'] or 0
-        categories.append(('final', f"{_('QC(final)')} (Quantity: {final_qty})"))
-
-        # QC
-        qc_qty = queryset.filter(oc_description__startswith='QC').aggregate(
-            total=Sum('odpd_quantity'))['total'] or 0
-        categories.append(('qc', f"{_('QC')} (Quantity: {qc_qty})"))
-
-        # Selected (all)
-        selected_qty = queryset.aggregate(total=Sum('odpd_quantity'))['total'] or 0
-        categories.append(('selected', f"{_('Selected')} (Quantity: {selected_qty})"))
+        # All category sums come from one query grouped by oc_description
+        totals = category_totals(queryset)
+        categories = [
+            (key, f"{label} (Quantity: {totals[key]})")
+            for key, label, _lookup, _value in PRODUCTION_CATEGORIES
+        ]
+        categories.append(('selected', f"{_('Selected')} (Quantity: {totals['selected']})"))
 
         return categories
 
     def queryset(self, request, queryset):
-        if self.value() == 'offline':
-            return queryset.filter(oc_description='Garment Insert in Poly Bag & Close')
-        elif self.value() == 'loading':
-            return queryset.filter(oc_description='Loading/Panel Segregation')
-        elif self.value() == 'midline':
-            # --------replace equal  with like '%midline%' in below line--------
-            return queryset.filter(oc_description__icontains='midline')
-        elif self.value() == 'endline':
-            # --------replace equal  with like '%endline%' in below line--------
-            return queryset.filter(oc_description__icontains='endline')
-        elif self.value() == 'final':
-            # --------replace equal  with like '%final%' in below line--------
-            return queryset.filter(oc_description__icontains='final')
-        elif self.value() == 'qc':  
-             # --------replace equal  with start with 'qc%' in below line--------  
-
-            return queryset.filter(oc_description__startswith='QC')
+        if self.value() in CATEGORY_BITS:
+            return queryset.filter(category_q(self.value()))
         elif self.value() == 'selected':
             return queryset.all()
         return queryset
@@ -194,7 +154,7 @@ class SourceConnectionFilter(admin.SimpleListFilter):
 
     def lookups(self, request, model_admin):
         # Start with base queryset
-        queryset = OperatorDailyPerformance.objects.all()
+        queryset = DailyProductionRollup.objects.all()
 
         # Check if any date filters are applied
         has_date_filter = (
@@ -269,7 +229,7 @@ class ShiftFilter(admin.SimpleListFilter):
 
     def lookups(self, request, model_admin):
         # Start with base queryset
-        queryset = OperatorDailyPerformance.objects.all()
+        queryset = DailyProductionRollup.objects.all()
 
         # Check if any date filters are applied
         has_date_filter = (
@@ -440,31 +400,12 @@ class AttendanceStatusFilter(admin.SimpleListFilter):
 
     def queryset(self, request, queryset):
         # Get the selected attendance date
-        attendance_date = request.GET.get('attendance_date')
-        if not attendance_date:
+        check_date = parse_attendance_date(request.GET.get('attendance_date'))
+        if not check_date:
             return queryset
 
-        # Parse the date
-        from datetime import date
-        try:
-            if attendance_date in ['today', 'yesterday']:
-                today = date.today()
-                if attendance_date == 'today':
-                    check_date = today
-                else:  # yesterday
-                    check_date = today.replace(day=today.day - 1)
-            else:
-                # ISO format date string
-                check_date = date.fromisoformat(attendance_date)
-        except (ValueError, AttributeError):
-            return queryset
-
-        # Get employee IDs that have production records for the selected date
-        present_employee_ids = set(
-            OperatorDailyPerformance.objects.filter(
-                odp_date=check_date
-            ).values_list('odp_em_key', flat=True)
-        )
+        # Employee IDs that have production records for the selected date
+        present_employee_ids = get_present_employee_ids(request, check_date)
 
         if self.value() == 'present':
             # Filter to employees who have records (Present)
@@ -521,44 +462,17 @@ class HangerlineEmpAdmin(admin.ModelAdmin):
 
     def attendance_status(self, obj):
         """Check if employee was present/absent on selected date"""
-        from datetime import date
-
         # Get the selected attendance date from request
         request = getattr(self, '_request', None)
         if not request:
             return 'N/A'
 
-        selected_date = request.GET.get('attendance_date')
-        if not selected_date:
+        check_date = parse_attendance_date(request.GET.get('attendance_date'))
+        if not check_date:
             return 'N/A'
 
-        # Handle different date formats
-        if selected_date == 'custom':
-            # For custom date, we might need additional handling
-            return 'N/A'
-        else:
-            try:
-                # Parse the date
-                if selected_date in ['today', 'yesterday']:
-                    # These are labels, get actual dates
-                    today = date.today()
-                    if selected_date == 'today':
-                        check_date = today
-                    else:  # yesterday
-                        check_date = today.replace(day=today.day - 1)
-                else:
-                    # ISO format date string
-                    check_date = date.fromisoformat(selected_date)
-
-                # Check if employee has any production records for this date
-                has_records = OperatorDailyPerformance.objects.filter(
-                    odp_em_key=obj.id,
-                    odp_date=check_date
-                ).exists()
-
-                return 'Present' if has_records else 'Absent'
-            except (ValueError, AttributeError):
-                return 'N/A'
+        # The presence set is resolved once per request, not per row
+        return 'Present' if obj.id in get_present_employee_ids(request, check_date) else 'Absent'
 
     attendance_status.short_description = 'Attendance Status'
 
@@ -569,109 +483,47 @@ class HangerlineEmpAdmin(admin.ModelAdmin):
         extra_context = extra_context or {}
 
         # Calculate attendance summary for selected date
-        attendance_date = request.GET.get('attendance_date')
-        if attendance_date:
-            from datetime import date
-            try:
-                # Parse the date
-                if attendance_date in ['today', 'yesterday']:
-                    today = date.today()
-                    if attendance_date == 'today':
-                        check_date = today
-                    else:  # yesterday
-                        check_date = today.replace(day=today.day - 1)
-                else:
-                    # ISO format date string
-                    check_date = date.fromisoformat(attendance_date)
-
-                # Get all employees for the selected date's line/shift combinations
-                line_filter = request.GET.get('line_desc')
-                shift_filter = request.GET.get('shift')
-
-                # Start with all employees, but restrict to lines 21-32 for summary cards
-                target_lines = [f'line-{i}' for i in range(21, 33)]
-                employees_query = HangerlineEmp.objects.filter(line_desc__in=target_lines)
-
-                # Apply additional line and shift filters if selected
-                if line_filter:
-                    employees_query = employees_query.filter(line_desc=line_filter)
-                if shift_filter:
-                    employees_query = employees_query.filter(shift=shift_filter)
-
-                total_employees = employees_query.count()
-
-                # Get employee IDs that have production records for the selected date
-                present_employee_ids = set(
-                    OperatorDailyPerformance.objects.filter(
-                        odp_date=check_date
-                    ).values_list('odp_em_key', flat=True)
-                )
-
-                # Calculate present/absent counts
-                present_count = employees_query.filter(id__in=present_employee_ids).count()
-                absent_count = total_employees - present_count
-
-                # Calculate line-wise attendance - only show lines 21-32
-                from django.db.models import Count, Q
-
-                # Define lines we want to show (21-32)
-                target_lines = [f'line-{i}' for i in range(21, 33)]
-
-                line_attendance = []
-                # Always show line breakdown for lines 21-32, but filter based on selected line if any
-                if not line_filter:
-                    # No specific line selected - show all lines 21-32
-                    lines_to_show = target_lines
-                else:
-                    # Specific line selected - only show that line if it's in our target range
-                    lines_to_show = [line_filter] if line_filter in target_lines else []
-
-                for line_name in lines_to_show:
-                    line_employees = employees_query.filter(line_desc=line_name)
-                    line_total = line_employees.count()
-
-                    if line_total > 0:  # Only include lines that have employees
-                        # Get present count for this line
-                        line_present_ids = set(
-                            OperatorDailyPerformance.objects.filter(
-                                odp_date=check_date,
-                                odp_em_key__in=line_employees.values_list('id', flat=True)
-                            ).values_list('odp_em_key', flat=True)
-                        )
-                        line_present_count = len(line_present_ids)
-                        line_absent_count = line_total - line_present_count
-
-                        line_attendance.append({
-                            'line': line_name,
-                            'total': line_total,
-                            'present': line_present_count,
-                            'absent': line_absent_count,
-                            'present_percent': round((line_present_count / line_total * 100), 1) if line_total > 0 else 0
-                        })
-
-                extra_context.update({
-                    'attendance_summary': {
-                        'date': check_date,
-                        'total_employees': total_employees,
-                        'present_count': present_count,
-                        'absent_count': absent_count,
-                        'present_percent': round((present_count / total_employees * 100), 1) if total_employees > 0 else 0,
-                        'line_attendance': line_attendance
-                    }
-                })
+        check_date = parse_attendance_date(request.GET.get('attendance_date'))
+        if check_date:
+            line_filter = request.GET.get('line_desc')
+            shift_filter = request.GET.get('shift')
 
-            except (ValueError, AttributeError):
-                pass  # Invalid date, don't show summary
+            # Summary cards are restricted to lines 21-32
+            target_lines = [f'line-{i}' for i in range(21, 33)]
+
+            # Always show line breakdown for lines 21-32, but filter based on selected line if any
+            if not line_filter:
+                lines_to_show = target_lines
+            else:
+                lines_to_show = [line_filter] if line_filter in target_lines else []
+
+            # Total/present/absent per line from one grouped query
+            line_attendance = get_line_attendance(
+                check_date, lines=lines_to_show, shifts=[shift_filter] if shift_filter else None
+            ) if lines_to_show else []
+            total_employees, present_count, absent_count, present_percent = summarize_attendance(line_attendance)
+
+            extra_context.update({
+                'attendance_summary': {
+                    'date': check_date,
+                    'total_employees': total_employees,
+                    'present_count': present_count,
+                    'absent_count': absent_count,
+                    'present_percent': present_percent,
+                    'line_attendance': line_attendance
+                }
+            })
 
         return super().changelist_view(request, extra_context)
 
 
 @admin.register(OperatorDailyPerformance)
-class OperatorDailyPerformanceAdmin(admin.ModelAdmin):
+class OperatorDailyPerformanceAdmin(KeysetPaginationAdminMixin, admin.ModelAdmin):
     list_display = ('odp_date', 'shift', 'odp_em_key', 'em_firstname', 'odpd_quantity', 'oc_description', 'st_id', 'odpd_lot_number', 'source_connection')
     search_fields = ('em_firstname', 'em_lastname', 'odp_em_key', 'odpd_lot_number','st_id','oc_description')
     list_filter = (ODPDateRangeFilter, 'odp_date', ShiftFilter, SourceConnectionFilter, ProductionFilter, 'odpd_is_overtime')
-    date_hierarchy = 'odp_date'
+    ordering = ('-odp_date', '-id')
+    keyset = ('odp_date', 'id')
     readonly_fields = ('created_at',)
 
     def get_urls(self):
@@ -742,11 +594,12 @@ class OperatorDailyPerformanceAdmin(admin.ModelAdmin):
 
 
 @admin.register(QualityControlRepair)
-class QualityControlRepairAdmin(admin.ModelAdmin):
+class QualityControlRepairAdmin(KeysetPaginationAdminMixin, admin.ModelAdmin):
     list_display = ('qcr_date', 'qcr_defect_em_key', 'defect_em_firstname', 'oc_description','qcsc_description', 'st_id','cm_description','sm_description','source_connection')
     search_fields = ('defect_em_firstname', 'defect_em_lastname', 'qcsc_description', 'st_id')
     list_filter = ('qcr_date', 'source_connection', QcscDescriptionFilter)
-    date_hierarchy = 'qcr_date'
+    ordering = ('-qcr_date', '-id')
+    keyset = ('qcr_date', 'id')
     readonly_fields = ('created_at',)
 
 
@@ -772,11 +625,10 @@ class QualityControlRepairAdmin(admin.ModelAdmin):
 
 
 @admin.register(Loadinginformation)
-class LoadinginformationAdmin(admin.ModelAdmin):
+class LoadinginformationAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     list_display = ('dated','id', 'pono', 'item_id', 'title','bundleno', 'qty','line_desc')
     search_fields = ('pono', 'item_id', 'title', 'fg_articleno', 'barcode')
     list_filter = ('dated','line_desc', 'item_id')
-    date_hierarchy = 'dated'
     ordering = ['-dated']
 
     def get_queryset(self, request):
@@ -888,7 +740,7 @@ class POProductionDateFilter(admin.SimpleListFilter):
 
 @admin.register(ClientPurchaseOrder)
 class ClientPurchaseOrderAdmin(admin.ModelAdmin):
-    list_display = ('id', 'pono', 'client_title', 'articleno', 'item_title', 'po_qty', 'clientpodate')
+    list_display = ('id', 'pono', 'client_title', 'articleno', 'item_title', 'po_qty', 'clientpodate', 'po_produced', 'po_in_hand', 'po_completion')
     search_fields = ('pono', 'client_title', 'articleno', 'item_title')
     list_filter = ('client_title',  POProductionDateFilter,'pono', 'articleno',)
     date_hierarchy = 'clientpodate'
@@ -912,12 +764,31 @@ class ClientPurchaseOrderAdmin(admin.ModelAdmin):
             last_month = current_month - 1
             last_year = current_year
 
+        # Current progress of the whole PO, read from the PO ledger in the same query
+        ledger = PoProgress.objects.filter(pono=OuterRef('pono'))
         return qs.filter(
             Q(clientpodate__year=current_year) 
+        ).annotate(
+            ledger_po_qty=Subquery(ledger.values('po_qty')[:1]),
+            ledger_produced=Subquery(ledger.values('produced_qty')[:1]),
+            ledger_in_hand=Subquery(ledger.values('in_hand_qty')[:1]),
         )
 
+    def po_produced(self, obj):
+        return obj.ledger_produced
+    po_produced.short_description = 'PO Produced'
+    po_produced.admin_order_field = 'ledger_produced'
 
+    def po_in_hand(self, obj):
+        return obj.ledger_in_hand
+    po_in_hand.short_description = 'In Hand Sewing'
+    po_in_hand.admin_order_field = 'ledger_in_hand'
 
+    def po_completion(self, obj):
+        if not obj.ledger_po_qty:
+            return '-'
+        return f"{round((obj.ledger_produced or 0) / obj.ledger_po_qty * 100, 1)}%"
+    po_completion.short_description = 'PO Completion'
 
     def changelist_view(self, request, extra_context=None):
         """Override changelist view to add PO summary dashboard link"""
@@ -954,12 +825,9 @@ class ClientPurchaseOrderAdmin(admin.ModelAdmin):
 
     def po_summary_view(self, request):
         """PO Progress Summary Dashboard with summary cards and progress bars"""
-        from django.db.models import Sum, Min, Q
         from django.shortcuts import render
         from datetime import date, timedelta
-
-        # Get PO summary data using Django ORM equivalent of the SQL query
-        po_data = []
+        from .po_progress import get_po_progress, summarize_po_progress
 
         # Get date range from request parameters, default to today and yesterday
         start_date_str = request.GET.get('start_date')
@@ -1000,86 +868,9 @@ class ClientPurchaseOrderAdmin(admin.ModelAdmin):
             except (ValueError, AttributeError):
                 pass  # Keep the existing date range
 
-        # Get POs that have production records in the selected date range
-        pos_with_recent_production = OperatorDailyPerformance.objects.filter(
-            odp_date__gte=start_date,
-            odp_date__lte=end_date,
-            unloading_qty__gt=0
-        ).values_list('odpd_lot_number', flat=True).distinct()
-
-        # Get all POs with their quantities, but only those with recent production
-        pos = ClientPurchaseOrder.objects.filter(
-            pono__in=pos_with_recent_production
-        ).annotate(
-            po_start_date=Min('clientpodate')
-        ).values('pono', 'po_start_date').annotate(
-            po_qty=Sum('po_qty')
-        ).order_by('pono')
-
-        for po in pos:
-            pono = po['pono']
-            po_start_date = po['po_start_date']
-            po_qty = po['po_qty'] or 0
-
-            # Skip POs with null start dates or handle them with a fallback
-            if po_start_date is None:
-                # Use a very old date as fallback for POs with no start date
-                from datetime import date
-                po_start_date = date(2000, 1, 1)  # Fallback date
-
-            # Get cumulative produced quantity from PO start to today
-            produced_qty = OperatorDailyPerformance.objects.filter(
-                odpd_lot_number=pono,
-                odp_date__gte=po_start_date,
-                odp_date__lte=date.today(),
-                unloading_qty__gt=0
-            ).aggregate(total=Sum('unloading_qty'))['total'] or 0
-
-            # Get cumulative transferred quantity from PO start to today
-            transferred_qty = TransferToPacking.objects.filter(
-                pono=pono,
-                proddate__gte=po_start_date,
-                proddate__lte=date.today()
-            ).aggregate(total=Sum('qtytransferred'))['total'] or 0
-
-            # Calculate derived values
-            pending_po_qty = po_qty - produced_qty
-            in_hand_sewing = produced_qty - transferred_qty
-
-            # Calculate completion percentage
-            completion_percent = round((produced_qty / po_qty * 100), 1) if po_qty > 0 else 0
-
-            po_data.append({
-                'pono': pono,
-                'po_start_date': po_start_date,
-                'po_qty': po_qty,
-                'todate_produced': produced_qty,
-                'todate_transfer': transferred_qty,
-                'pending_po_qty': max(0, pending_po_qty),  # Ensure not negative
-                'in_hand_sewing': max(0, in_hand_sewing),  # Ensure not negative
-                'completion_percent': completion_percent
-            })
-
-        # Calculate summary statistics
-        total_pos = len(po_data)
-        total_po_qty = sum(po['po_qty'] for po in po_data)
-        total_produced = sum(po['todate_produced'] for po in po_data)
-        total_transferred = sum(po['todate_transfer'] for po in po_data)
-        total_pending = sum(po['pending_po_qty'] for po in po_data)
-        total_in_hand = sum(po['in_hand_sewing'] for po in po_data)
-
-        # Calculate overall completion percentage
-        overall_completion = round((total_produced / total_po_qty * 100), 1) if total_po_qty > 0 else 0
-
-        summary_stats = {
-            'total_pos': total_pos,
-            'total_po_qty': total_po_qty,
-            'total_produced': total_produced,
-            'total_transferred': total_transferred,
-            'total_pending': total_pending,
-            'total_in_hand': total_in_hand,
-            'overall_completion': overall_completion
-        }
+        # PO progress for every PO with production in the range, from one set-based query
+        po_data = get_po_progress(start_date, end_date)
+        summary_stats = summarize_po_progress(po_data)
 
         context = {
             'title': 'PO Progress Summary',
@@ -1149,7 +940,7 @@ class LineTargetAdmin(admin.ModelAdmin):
         )
 
         # Get actual offloading data for comparison
-        actual_offloading = OperatorDailyPerformance.objects.filter(
+        actual_offloading = DailyProductionRollup.objects.filter(
             odp_date__gte=current_month,
             odp_date__lte=next_month
         ).aggregate(
@@ -1203,70 +994,24 @@ class LineTargetAdmin(admin.ModelAdmin):
     def fetch_loading_data(self, request, pk):
         from django.shortcuts import get_object_or_404, redirect
         from django.contrib import messages
-        from django.db.models import Sum
+        from .line_targets import fetch_loading_details
 
         linetarget = get_object_or_404(LineTarget, pk=pk)
 
-        # Clear existing details
-        linetarget.linetargetdetail_set.all().delete()
-
-        # Fetch data from Loadinginformation with exact conditions
-        # Compare date part of datetime field with target_date
-        from django.db.models import Q
-        loading_data = Loadinginformation.objects.filter(
-            Q(dated__date=linetarget.target_date),
-            line_id=linetarget.source_connection
-        ).exclude(
-            pono__isnull=True
-        ).exclude(
-            pono=''
-        )
+        # Replace the details with the day's loading records in one transaction
+        loading_count, created_count = fetch_loading_details(linetarget)
 
-        # Debug: Show what we're filtering
-        messages.info(request, f"Found {loading_data.count()} loading records for date {linetarget.target_date}")
-
-        created_count = 0
-        skipped_count = 0
-
-        for loading_item in loading_data:
-            pono = loading_item.pono or ''
-            st_id = loading_item.fg_articleno or ''
-
-            # Get color and size instances
-            color_instance = Color.objects.filter(cm_key=loading_item.fg_colour).first() if loading_item.fg_colour else None
-            size_instance = Size.objects.filter(sm_key=loading_item.fg_size).first() if loading_item.fg_size else None
-
-            # Create LineTargetDetail for each shift
-            for shift in ['Day', 'Night']:
-                LineTargetDetail.objects.create(
-                    linetarget=linetarget,
-                    pono=pono,
-                    st_id=st_id,
-                    item_id=loading_item.item_id or '',
-                    item_title=loading_item.title or '',
-                    model=loading_item.model,
-                    barcode=loading_item.barcode,
-                    scrvoucher_no=loading_item.scrvoucher_no,
-                    cm_key=color_instance,
-                    sm_key=size_instance,
-                    bundleno=loading_item.bundleno or 0,
-                    target_qty=int(loading_item.qty or 0),
-                    shift=shift
-                )
-                created_count += 1
-
-        # Update loading_qty
-        total_qty = linetarget.linetargetdetail_set.aggregate(
-            total=Sum('target_qty')
-        )['total'] or 0
-        linetarget.loading_qty = total_qty
-        linetarget.save()
-
-        messages.success(request, f"Successfully fetched {created_count} loading data records for {linetarget} (skipped: {skipped_count})")
+        messages.info(request, f"Found {loading_count} loading records for date {linetarget.target_date}")
+        messages.success(request, f"Successfully fetched {created_count} loading data records for {linetarget}")
         return redirect('admin:hangerline_linetarget_change', pk)
 
 
 
+    def save_related(self, request, form, formsets, change):
+        """Save the detail inlines, updating the line target total once on commit"""
+        with deferred_line_target_totals():
+            super().save_related(request, form, formsets, change)
+
     def save_model(self, request, obj, form, change):
         """Override save_model to handle fetch_after_save"""
         super().save_model(request, obj, form, change)
@@ -1290,6 +1035,11 @@ class LineTargetDetailAdmin(admin.ModelAdmin):
     readonly_fields = ('linetarget',)
     autocomplete_fields = ['cpo_id', 'color', 'size']
 
+    def delete_queryset(self, request, queryset):
+        """Bulk delete with one total update per affected line target"""
+        with deferred_line_target_totals():
+            super().delete_queryset(request, queryset)
+
 
 @admin.register(Breakdown)
 class BreakdownAdmin(admin.ModelAdmin):
@@ -1314,10 +1064,10 @@ class BreakdownAdmin(admin.ModelAdmin):
     )
 
     def get_breakdown_time_minutes(self, obj):
-        """Display the calculated breakdown time in minutes"""
-        return obj.breakdown_time_minutes
+        """Display the stored breakdown time in minutes"""
+        return obj.breakdown_minutes
     get_breakdown_time_minutes.short_description = 'Breakdown Time (mins)'
-    get_breakdown_time_minutes.admin_order_field = 'time_start'
+    get_breakdown_time_minutes.admin_order_field = 'breakdown_minutes'
 
     def get_urls(self):
         from django.urls import path
@@ -1353,233 +1103,14 @@ class BreakdownAdmin(admin.ModelAdmin):
 
     def dashboard_view(self, request):
         """Dashboard view showing breakdown summary and pie chart by category"""
-        from django.db.models import Sum, Count, Avg, F, ExpressionWrapper, fields
-        from django.db.models.functions import Extract
         from django.shortcuts import render
-        from datetime import datetime, date
+        from .breakdown_stats import breakdown_date_range, get_breakdown_dashboard_context
 
-        # Get date range from request parameters
-        start_date_str = request.GET.get('start_date')
-        end_date_str = request.GET.get('end_date')
-
-        # Parse dates or use current month as default
-        if start_date_str:
-            try:
-                start_date = date.fromisoformat(start_date_str)
-            except ValueError:
-                start_date = None
-        else:
-            start_date = None
-
-        if end_date_str:
-            try:
-                end_date = date.fromisoformat(end_date_str)
-            except ValueError:
-                end_date = None
-        else:
-            end_date = None
-
-        # Default to current month if no dates provided
-        if not start_date or not end_date:
-            today = date.today()
-            current_month = today.replace(day=1)
-            next_month = date(today.year + (1 if today.month == 12 else 0), (today.month % 12) + 1, 1)
-            start_date = current_month
-            end_date = next_month
-        else:
-            # For display purposes, use the start date's month
-            current_month = start_date.replace(day=1)
-
-        # Get breakdown data first
-        breakdowns = Breakdown.objects.filter(
-            p_date__gte=start_date,
-            p_date__lte=end_date
-        )
-
-        # Calculate statistics manually since we can't use database aggregation with model properties
-        total_breakdowns = breakdowns.count()
-        total_time = sum(b.breakdown_time_minutes for b in breakdowns)
-        avg_time = total_time / total_breakdowns if total_breakdowns > 0 else 0
-
-        total_stats = {
-            'total_breakdowns': total_breakdowns,
-            'total_time': total_time,
-            'avg_time': avg_time
-        }
-
-        # Group by category manually
-        from collections import defaultdict
-        category_data = defaultdict(lambda: {'count': 0, 'total_time': 0, 'times': []})
-
-        for breakdown in breakdowns:
-            cat_name = breakdown.breakdown_category.name
-            time_mins = breakdown.breakdown_time_minutes
-            category_data[cat_name]['count'] += 1
-            category_data[cat_name]['total_time'] += time_mins
-            category_data[cat_name]['times'].append(time_mins)
-
-        # Convert to list and calculate averages
-        category_stats = []
-        for cat_name, data in category_data.items():
-            avg_time = data['total_time'] / data['count'] if data['count'] > 0 else 0
-            category_stats.append({
-                'breakdown_category__name': cat_name,
-                'count': data['count'],
-                'total_time': data['total_time'],
-                'avg_time': avg_time
-            })
-
-        # Sort by total time descending
-        category_stats.sort(key=lambda x: x['total_time'], reverse=True)
-
-        # Calculate percentage for each category
-        total_time_all = total_stats['total_time'] or 0
-        for stat in category_stats:
-            if total_time_all > 0:
-                stat['percentage'] = round((stat['total_time'] or 0) / total_time_all * 100, 1)
-            else:
-                stat['percentage'] = 0.0
-
-        # Group by line manually
-        line_data = defaultdict(lambda: {'count': 0, 'total_time': 0, 'times': []})
-
-        for breakdown in breakdowns:
-            line_name = breakdown.line_no
-            time_mins = breakdown.breakdown_time_minutes
-            line_data[line_name]['count'] += 1
-            line_data[line_name]['total_time'] += time_mins
-            line_data[line_name]['times'].append(time_mins)
-
-        # Convert to list and calculate averages
-        line_stats = []
-        for line_name, data in line_data.items():
-            avg_time = data['total_time'] / data['count'] if data['count'] > 0 else 0
-            line_stats.append({
-                'line_no': line_name,
-                'count': data['count'],
-                'total_time': data['total_time'],
-                'avg_time': avg_time
-            })
-
-        # Sort by total time descending
-        line_stats.sort(key=lambda x: x['total_time'], reverse=True)
-
-        # Calculate percentage for each line
-        for stat in line_stats:
-            if total_time_all > 0:
-                stat['percentage'] = round((stat['total_time'] or 0) / total_time_all * 100, 1)
-            else:
-                stat['percentage'] = 0.0
-
-        # Prepare data for category pie chart
-        category_chart_labels = [stat['breakdown_category__name'] for stat in category_stats] if category_stats else []
-        category_chart_data = [stat['total_time'] or 0 for stat in category_stats] if category_stats else []
-
-        # Prepare data for line pie chart
-        line_chart_labels = [stat['line_no'] for stat in line_stats] if line_stats else []
-        line_chart_data = [stat['total_time'] or 0 for stat in line_stats] if line_stats else []
-
-        # Colors for pie charts
-        chart_colors = [
-            '#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF',
-            '#FF9F40', '#FF6384', '#C9CBCF', '#4BC0C0', '#FF6384'
-        ]
-
-        # Calculate trend data (breakdown time by date and line)
-        from collections import defaultdict
-        trend_data = defaultdict(lambda: defaultdict(float))
-
-        # Group breakdowns by date and line
-        for breakdown in breakdowns:
-            date_str = breakdown.p_date.isoformat()
-            line_name = breakdown.line_no
-            trend_data[date_str][line_name] += breakdown.breakdown_time_minutes
-
-        # Prepare data for line-wise trend chart
-        dates = sorted(trend_data.keys())
-        lines = sorted(set(line for date_data in trend_data.values() for line in date_data.keys()))
-
-        trend_chart_data = []
-        for line in lines:
-            line_data = []
-            for date in dates:
-                line_data.append(trend_data[date].get(line, 0))
-            trend_chart_data.append({
-                'label': f'Line {line}',
-                'data': line_data,
-                'borderColor': chart_colors[len(trend_chart_data) % len(chart_colors)],
-                'backgroundColor': chart_colors[len(trend_chart_data) % len(chart_colors)].replace('1)', '0.1)'),
-                'fill': False,
-                'tension': 0.1
-            })
-
-        # Calculate total downtime trend data (sum across all lines per date)
-        total_trend_data = []
-        for date in dates:
-            total_time = sum(trend_data[date].values())
-            total_trend_data.append(total_time)
-
-        total_trend_chart_data = [{
-            'label': 'Total Downtime',
-            'data': total_trend_data,
-            'borderColor': '#dc3545',
-            'backgroundColor': 'rgba(220, 53, 69, 0.1)',
-            'fill': False,
-            'tension': 0.1,
-            'borderWidth': 3,
-            'pointBackgroundColor': '#dc3545',
-            'pointBorderColor': '#fff',
-            'pointBorderWidth': 2,
-            'pointRadius': 5
-        }]
-
-        # Calculate category-wise trend data (breakdown time by category over time)
-        category_trend_data = defaultdict(lambda: defaultdict(float))
-
-        # Group breakdowns by date and category
-        for breakdown in breakdowns:
-            date_str = breakdown.p_date.isoformat()
-            category_name = breakdown.breakdown_category.name
-            category_trend_data[date_str][category_name] += breakdown.breakdown_time_minutes
-
-        # Prepare data for category trend chart
-        # Get all unique categories across all dates
-        all_categories = sorted(set(category for date_data in category_trend_data.values() for category in date_data.keys()))
-
-        category_trend_chart_data = []
-        for category_name in all_categories:
-            category_line_data = []
-            for date in dates:
-                category_line_data.append(category_trend_data[date].get(category_name, 0))
-            category_trend_chart_data.append({
-                'label': category_name,
-                'data': category_line_data,
-                'borderColor': chart_colors[len(category_trend_chart_data) % len(chart_colors)],
-                'backgroundColor': chart_colors[len(category_trend_chart_data) % len(chart_colors)].replace('1)', '0.1)'),
-                'fill': False,
-                'tension': 0.1,
-                'borderWidth': 2,
-                'pointBackgroundColor': chart_colors[len(category_trend_chart_data) % len(chart_colors)],
-                'pointBorderColor': '#fff',
-                'pointBorderWidth': 1,
-                'pointRadius': 4
-            })
+        start_date, end_date, current_month = breakdown_date_range(request)
 
-        import json
         context = {
             # 'title': 'Breakdown Dashboard',
-            'total_stats': total_stats,
-            'category_stats': category_stats,
-            'line_stats': line_stats,
-            'category_chart_labels': json.dumps(category_chart_labels),
-            'category_chart_data': json.dumps(category_chart_data),
-            'line_chart_labels': json.dumps(line_chart_labels),
-            'line_chart_data': json.dumps(line_chart_data),
-            'trend_dates': json.dumps(dates),
-            'trend_chart_data': json.dumps(trend_chart_data),
-            'total_trend_chart_data': json.dumps(total_trend_chart_data),
-            'category_trend_chart_data': json.dumps(category_trend_chart_data),
-            'chart_colors': json.dumps(chart_colors),
+            **get_breakdown_dashboard_context(start_date, end_date),
             'current_month': current_month.strftime('%B %Y'),
             'start_date': start_date.isoformat(),
             'end_date': end_date.isoformat(),
@@ -0,0 +1,279 @@
+"""
+Changelist pagination for the large ETL tables.
+
+The stock changelist counts the filtered queryset exactly (and, when filtered,
+the whole table again for the "N total" link). EstimatedCountPaginator counts
+at most HANGERLINE_ADMIN_EXACT_COUNT_LIMIT rows exactly; beyond that it takes
+the Postgres planner's row estimate for the filtered query and switches the
+changelist to Previous / Next paging, which needs no count at all: a page
+fetches one extra row to know whether there is a next page.
+
+EstimatedCountAdminMixin plugs this into a ModelAdmin.
+
+KeysetPaginationAdminMixin adds keyset (seek) paging for changelists ordered
+by a (date, id) key: once the count is estimated, Next / Previous carry the
+last / first row's key in the `cursor` parameter and the page is fetched with
+WHERE (date, id) < (key) ORDER BY date DESC, id DESC LIMIT n, so a deep page
+costs the same as the first one. Filters, search and the page number are kept;
+sorting by another column falls back to OFFSET paging.
+"""
+
+from datetime import date
+import json
+
+from django.conf import settings
+from django.contrib.admin.views.main import PAGE_VAR, ChangeList
+from django.core.paginator import Page, PageNotAnInteger, EmptyPage, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+def estimate_count(queryset):
+    """Planner row estimate for queryset, None if it cannot be explained"""
+    queryset = queryset.order_by()
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except Exception:
+        # e.g. EmptyResultSet for a filter that can match nothing
+        return None
+
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedPage(Page):
+    """Page of an estimated paginator; has_next comes from the extra row fetched"""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def start_index(self):
+        return (self.number - 1) * self.paginator.per_page + 1 if self.object_list else 0
+
+    def end_index(self):
+        return (self.number - 1) * self.paginator.per_page + len(self.object_list)
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator counting exactly up to a limit and using the planner estimate above it"""
+
+    # Set by count: True once the exact count limit is exceeded
+    estimated = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pages = {}
+
+    @property
+    def exact_count_limit(self):
+        return getattr(settings, 'HANGERLINE_ADMIN_EXACT_COUNT_LIMIT', 10000)
+
+    @cached_property
+    def count(self):
+        limit = self.exact_count_limit
+        capped = self.object_list.order_by()[:limit + 1].count()
+        self.estimated = capped > limit
+        if not self.estimated:
+            return capped
+        return max(estimate_count(self.object_list) or 0, capped)
+
+    def validate_number(self, number):
+        if not self.count or not self.estimated:
+            return super().validate_number(number)
+        # The estimate may be short, so any page past the first is allowed; an empty one shows no rows
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.estimated:
+            return super().page(number)
+        if number not in self._pages:
+            bottom = (number - 1) * self.per_page
+            rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+            self._pages[number] = EstimatedPage(rows[:self.per_page], number, self, len(rows) > self.per_page)
+        return self._pages[number]
+
+
+class EstimatedCountChangeList(ChangeList):
+    """ChangeList exposing result_count_estimated and Previous / Next links for the pagination template"""
+
+    def get_results(self, request):
+        super().get_results(request)
+        self.result_count_estimated = getattr(self.paginator, 'estimated', False)
+        self.previous_page_url = self.next_page_url = None
+        if not self.result_count_estimated or (self.show_all and self.can_show_all):
+            return
+
+        page = self.paginator.page(self.page_num)
+        if page.has_previous():
+            self.previous_page_url = self.get_query_string({PAGE_VAR: page.number - 1})
+        if page.has_next():
+            self.next_page_url = self.get_query_string({PAGE_VAR: page.number + 1})
+
+
+class EstimatedCountAdminMixin:
+    """
+    ModelAdmin mixin for changelists over millions of rows: bounded exact
+    counts, planner estimates beyond them, no second full-table count and
+    Previous / Next paging when the count is estimated.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return EstimatedCountChangeList
+
+
+# Query parameter carrying the keyset cursor, e.g. ?p=3&cursor=a.2026-10-01.123456
+CURSOR_VAR = 'cursor'
+
+
+def parse_cursor(value):
+    """('after' | 'before', (date, id)) from a cursor parameter, None if missing or invalid"""
+    try:
+        direction, day, pk = value.split('.')
+        return {'a': 'after', 'b': 'before'}[direction], (date.fromisoformat(day), int(pk))
+    except (AttributeError, KeyError, ValueError):
+        return None
+
+
+def format_cursor(direction, key):
+    day, pk = key
+    return f"{direction[0]}.{day.isoformat()}.{pk}"
+
+
+class KeysetPage(EstimatedPage):
+    """Estimated page fetched from a cursor, which knows whether rows precede it"""
+
+    def __init__(self, object_list, number, paginator, has_next, has_previous):
+        super().__init__(object_list, number, paginator, has_next)
+        self._has_previous = has_previous
+
+    def has_previous(self):
+        return self._has_previous
+
+
+class KeysetPaginator(EstimatedCountPaginator):
+    """
+    EstimatedCountPaginator that seeks from a cursor instead of using OFFSET
+    when the count is estimated and the queryset is ordered by the keyset,
+    descending.
+    """
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True, keyset=None, cursor=None):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.keyset = keyset
+        self.cursor = cursor
+
+    @property
+    def uses_keyset(self):
+        if not self.keyset:
+            return False
+        date_field, id_field = self.keyset
+        ordering = tuple(self.object_list.query.order_by)
+        return ordering in ((f'-{date_field}', f'-{id_field}'), (f'-{date_field}', '-pk'))
+
+    def row_key(self, row):
+        return tuple(getattr(row, field) for field in self.keyset)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.estimated or not self.uses_keyset or (self.cursor is None and number > 1):
+            # Exact counts are small enough for OFFSET; a bare ?p=N also keeps working
+            return super().page(number)
+        if number in self._pages:
+            return self._pages[number]
+
+        date_field, id_field = self.keyset
+        queryset = self.object_list
+        direction = None
+        if self.cursor is not None:
+            direction, (day, pk) = self.cursor
+            if direction == 'after':
+                queryset = queryset.filter(
+                    Q(**{f'{date_field}__lt': day}) | Q(**{date_field: day, f'{id_field}__lt': pk})
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(**{f'{date_field}__gt': day}) | Q(**{date_field: day, f'{id_field}__gt': pk})
+                ).reverse()
+
+        rows = list(queryset[:self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == 'before':
+            rows.reverse()
+            has_next, has_previous = True, more
+        else:
+            has_next, has_previous = more, direction is not None
+
+        self._pages[number] = KeysetPage(rows, number, self, has_next, has_previous)
+        return self._pages[number]
+
+
+class KeysetChangeList(EstimatedCountChangeList):
+    """EstimatedCountChangeList whose Previous / Next links carry the keyset cursor"""
+
+    def get_results(self, request):
+        super().get_results(request)
+        if not self.result_count_estimated or not getattr(self.paginator, 'uses_keyset', False):
+            return
+
+        # Page 2's Previous link (plain ?p=1) and rows without a full key keep the OFFSET links
+        page = self.paginator.page(self.page_num)
+        rows = page.object_list
+        if rows and page.has_previous() and page.number > 2:
+            first_key = self.paginator.row_key(rows[0])
+            if None not in first_key:
+                self.previous_page_url = self.get_query_string({
+                    PAGE_VAR: page.number - 1,
+                    CURSOR_VAR: format_cursor('before', first_key),
+                })
+        if rows and page.has_next():
+            last_key = self.paginator.row_key(rows[-1])
+            if None not in last_key:
+                self.next_page_url = self.get_query_string({
+                    PAGE_VAR: page.number + 1,
+                    CURSOR_VAR: format_cursor('after', last_key),
+                })
+
+
+class KeysetPaginationAdminMixin(EstimatedCountAdminMixin):
+    """
+    EstimatedCountAdminMixin with keyset paging on keyset = (date field, id
+    field). The admin's ordering must be the keyset, descending.
+    """
+    paginator = KeysetPaginator
+    keyset = None
+
+    def changelist_view(self, request, extra_context=None):
+        # The changelist treats unknown parameters as filters, so take the cursor out first
+        request._keyset_cursor = None
+        if CURSOR_VAR in request.GET:
+            request.GET = request.GET.copy()
+            request._keyset_cursor = parse_cursor(request.GET.pop(CURSOR_VAR)[-1])
+        return super().changelist_view(request, extra_context)
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        return self.paginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            keyset=self.keyset, cursor=getattr(request, '_keyset_cursor', None),
+        )
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
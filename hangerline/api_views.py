@@ -3,13 +3,20 @@ API Views for Production Dashboard
 Provides REST endpoints for React frontend to consume dashboard data
 """
 
+from datetime import date, timedelta
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
-from .dashboard_utils import get_dashboard_data, convert_decimals
+from django.utils.decorators import method_decorator
+from .conditional import data_condition
+from .dashboard_utils import get_date_wise_efficiency_page
+from .dashboard_cache import get_cached_dashboard_data, normalize_dashboard_filters
+from .fast_json import FastJSONRenderer, dashboard_json_response
+from .po_progress import get_po_ledger, get_po_progress, summarize_po_progress
 
 
 class LoginView(APIView):
@@ -51,7 +58,9 @@ class LoginView(APIView):
 
 class DashboardAPIView(APIView):
     """API endpoint for dashboard data"""
+    renderer_classes = [FastJSONRenderer]
 
+    @method_decorator(data_condition)
     def get(self, request):
         """Get filtered dashboard data"""
         # Get filter parameters
@@ -62,7 +71,7 @@ class DashboardAPIView(APIView):
 
         try:
             # Get dashboard data
-            dashboard_data = get_dashboard_data(start_date, end_date, line_filter, shift_filter)
+            dashboard_data = get_cached_dashboard_data(start_date, end_date, line_filter, shift_filter)
 
             # Return the data
             return Response(dashboard_data)
@@ -73,6 +82,73 @@ class DashboardAPIView(APIView):
             }, status=500)
 
 
+class DateWiseEfficiencyAPIView(APIView):
+    """Paginated, server-sorted date-wise efficiency rows for the dashboard"""
+    renderer_classes = [FastJSONRenderer]
+
+    @method_decorator(data_condition)
+    def get(self, request):
+        """Get one page; pass the returned nextCursor as ?cursor= for the next one"""
+        params = request.query_params
+
+        try:
+            start_date, end_date, line_filter, shift_filter = normalize_dashboard_filters(
+                params.get('start_date'), params.get('end_date'), params.get('line'), params.get('shift')
+            )
+            page = get_date_wise_efficiency_page(
+                start_date, end_date, line_filter, shift_filter,
+                sort=params.get('sort'), cursor=params.get('cursor'), limit=params.get('limit'),
+            )
+        except ValueError as e:
+            return Response({
+                'error': str(e)
+            }, status=400)
+        except Exception as e:
+            return Response({
+                'error': f'Efficiency data error: {str(e)}'
+            }, status=500)
+
+        if params.get('limit'):
+            # An explicitly requested large page is streamed in chunks
+            return dashboard_json_response(page)
+        return Response(page)
+
+
+class POProgressAPIView(APIView):
+    """Current PO progress from the PO ledger"""
+    renderer_classes = [FastJSONRenderer]
+
+    def get(self, request):
+        """
+        POs with offloading between start_date and end_date (default yesterday
+        to today), or the POs given as ?pono=... (comma separated or repeated)
+        """
+        params = request.query_params
+        ponos = [pono for value in params.getlist('pono') for pono in value.split(',') if pono]
+
+        try:
+            if ponos:
+                po_data = get_po_ledger(ponos)
+            else:
+                today = date.today()
+                start_date = date.fromisoformat(params['start_date']) if params.get('start_date') else today - timedelta(days=1)
+                end_date = date.fromisoformat(params['end_date']) if params.get('end_date') else today
+                po_data = get_po_progress(start_date, end_date)
+        except ValueError as e:
+            return Response({
+                'error': str(e)
+            }, status=400)
+        except Exception as e:
+            return Response({
+                'error': f'PO progress error: {str(e)}'
+            }, status=500)
+
+        return Response({
+            'results': po_data,
+            'summary': summarize_po_progress(po_data),
+        })
+
+
 class UserView(APIView):
     """Get current user information"""
 
@@ -0,0 +1,105 @@
+"""
+Employee attendance derived from production records.
+
+An employee is present on a date when operator_daily_performance has a row
+for them on that date. Presence is read from the daily_attendance snapshot
+(one row per employee, day and line, refreshed with the other rollups after
+each ETL load) rather than from the operation rows themselves.
+get_present_employee_ids() resolves the present set for a date with one
+query and memoizes it on the request, so the HangerlineEmp changelist column
+and AttendanceStatusFilter share a single lookup. get_line_attendance() returns
+total/present/absent per line in one grouped query, for the changelist summary
+and the React dashboard.
+"""
+
+from datetime import date, timedelta
+
+from django.db import connection
+
+from .models import DailyAttendance
+from .rollups import maybe_refresh_rollups
+
+# Attribute holding {date: frozenset of present employee ids} on the request
+_REQUEST_ATTR = '_hangerline_present_employee_ids'
+
+
+def parse_attendance_date(value):
+    """Date for an attendance_date parameter ('today', 'yesterday' or ISO), None if missing or invalid"""
+    if not value:
+        return None
+    if value == 'today':
+        return date.today()
+    if value == 'yesterday':
+        return date.today() - timedelta(days=1)
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def get_present_employee_ids(request, check_date):
+    """Ids of the employees with production records on check_date, queried once per request"""
+    present = getattr(request, _REQUEST_ATTR, None)
+    if present is None:
+        present = {}
+        setattr(request, _REQUEST_ATTR, present)
+
+    if check_date not in present:
+        maybe_refresh_rollups()
+        present[check_date] = frozenset(
+            DailyAttendance.objects.filter(
+                odp_date=check_date,
+            ).values_list('odp_em_key', flat=True).distinct()
+        )
+    return present[check_date]
+
+
+def get_line_attendance(start_date, end_date=None, lines=None, shifts=None):
+    """
+    [{'line', 'total', 'present', 'absent', 'present_percent'}] per line_desc,
+    ordered by line. An employee counts as present when they have a production
+    record between start_date and end_date (a single day if end_date is None).
+    lines and shifts are optional lists restricting the employees counted.
+    """
+    conditions, params = [], [start_date, end_date or start_date]
+    if lines:
+        conditions.append("e.line_desc = ANY(%s)")
+        params.append(list(lines))
+    if shifts:
+        conditions.append("e.shift = ANY(%s)")
+        params.append(list(shifts))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    maybe_refresh_rollups()
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT e.line_desc, COUNT(*), COUNT(p.odp_em_key)
+            FROM hangerline_emp e
+            LEFT JOIN (
+                SELECT DISTINCT odp_em_key
+                FROM daily_attendance
+                WHERE odp_date >= %s AND odp_date <= %s
+            ) p ON p.odp_em_key = e.id
+            {where}
+            GROUP BY e.line_desc
+            ORDER BY e.line_desc
+        """, params)
+        rows = cursor.fetchall()
+
+    return [
+        {
+            'line': line,
+            'total': total,
+            'present': present,
+            'absent': total - present,
+            'present_percent': round(present / total * 100, 1) if total > 0 else 0,
+        }
+        for line, total, present in rows
+    ]
+
+
+def summarize_attendance(line_attendance):
+    """(total, present, absent, present_percent) over get_line_attendance() rows"""
+    total = sum(row['total'] for row in line_attendance)
+    present = sum(row['present'] for row in line_attendance)
+    return total, present, total - present, round(present / total * 100, 1) if total > 0 else 0
@@ -0,0 +1,187 @@
+"""
+Breakdown statistics for the breakdown dashboards.
+
+One query groups the breakdowns in range by (p_date, line_no, category),
+summing the stored breakdown_minutes column. The totals, the
+per-category and per-line stats and the date x line / date x category trends
+are all rolled up from those grouped rows, so no Breakdown objects are loaded.
+Used by views.breakdown_dashboard and BreakdownAdmin.dashboard_view.
+"""
+
+from collections import defaultdict
+from datetime import date
+import json
+
+from django.db import connection
+
+CHART_COLORS = [
+    '#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF',
+    '#FF9F40', '#FF6384', '#C9CBCF', '#4BC0C0', '#FF6384'
+]
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def breakdown_date_range(request):
+    """(start_date, end_date, current_month) from the request, the current month if either date is missing"""
+    start_date = _parse_date(request.GET.get('start_date'))
+    end_date = _parse_date(request.GET.get('end_date'))
+
+    if not start_date or not end_date:
+        today = date.today()
+        current_month = today.replace(day=1)
+        next_month = date(today.year + (1 if today.month == 12 else 0), (today.month % 12) + 1, 1)
+        return current_month, next_month, current_month
+
+    # For display purposes, use the start date's month
+    return start_date, end_date, start_date.replace(day=1)
+
+
+def _grouped_breakdowns(start_date, end_date):
+    """[(p_date, line_no, category, count, minutes)] for the range"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT
+                b.p_date,
+                b.line_no,
+                c.name,
+                COUNT(*),
+                COALESCE(SUM(b.breakdown_minutes), 0)::float8
+            FROM breakdown b
+            JOIN breakdown_category c ON c.id = b.breakdown_category_id
+            WHERE b.p_date >= %s AND b.p_date <= %s
+            GROUP BY b.p_date, b.line_no, c.name
+            ORDER BY b.p_date, b.line_no, c.name
+        """, [start_date, end_date])
+        return cursor.fetchall()
+
+
+def _ranked_stats(grouped, key_name, total_time_all):
+    stats = []
+    for key, (count, total_time) in grouped.items():
+        stats.append({
+            key_name: key,
+            'count': count,
+            'total_time': total_time,
+            'avg_time': total_time / count if count > 0 else 0,
+            'percentage': round(total_time / total_time_all * 100, 1) if total_time_all > 0 else 0.0,
+        })
+    stats.sort(key=lambda x: x['total_time'], reverse=True)
+    return stats
+
+
+def _trend_datasets(trend, dates, labels, label_format, extra):
+    datasets = []
+    for label in labels:
+        color = CHART_COLORS[len(datasets) % len(CHART_COLORS)]
+        datasets.append({
+            'label': label_format.format(label),
+            'data': [trend[day].get(label, 0) for day in dates],
+            'borderColor': color,
+            'backgroundColor': color.replace('1)', '0.1)'),
+            'fill': False,
+            'tension': 0.1,
+            **extra(color),
+        })
+    return datasets
+
+
+def get_breakdown_dashboard_context(start_date, end_date):
+    """Template context shared by both breakdown dashboards: stats, pie charts and trends"""
+    by_category = defaultdict(lambda: [0, 0])
+    by_line = defaultdict(lambda: [0, 0])
+    line_trend = defaultdict(lambda: defaultdict(float))
+    category_trend = defaultdict(lambda: defaultdict(float))
+    total_breakdowns = 0
+    total_time = 0
+
+    for p_date, line_no, category, count, minutes in _grouped_breakdowns(start_date, end_date):
+        day = p_date.isoformat()
+        total_breakdowns += count
+        total_time += minutes
+        by_category[category][0] += count
+        by_category[category][1] += minutes
+        by_line[line_no][0] += count
+        by_line[line_no][1] += minutes
+        line_trend[day][line_no] += minutes
+        category_trend[day][category] += minutes
+
+    total_stats = {
+        'total_breakdowns': total_breakdowns,
+        'total_time': total_time,
+        'avg_time': total_time / total_breakdowns if total_breakdowns > 0 else 0
+    }
+    category_stats = _ranked_stats(by_category, 'breakdown_category__name', total_time)
+    line_stats = _ranked_stats(by_line, 'line_no', total_time)
+
+    dates = sorted(line_trend)
+    trend_chart_data = _trend_datasets(line_trend, dates, sorted(by_line), 'Line {}', lambda color: {})
+    category_trend_chart_data = _trend_datasets(
+        category_trend, dates, sorted(by_category), '{}',
+        lambda color: {
+            'borderWidth': 2,
+            'pointBackgroundColor': color,
+            'pointBorderColor': '#fff',
+            'pointBorderWidth': 1,
+            'pointRadius': 4
+        },
+    )
+
+    total_trend_chart_data = [{
+        'label': 'Total Downtime',
+        'data': [sum(line_trend[day].values()) for day in dates],
+        'borderColor': '#dc3545',
+        'backgroundColor': 'rgba(220, 53, 69, 0.1)',
+        'fill': False,
+        'tension': 0.1,
+        'borderWidth': 3,
+        'pointBackgroundColor': '#dc3545',
+        'pointBorderColor': '#fff',
+        'pointBorderWidth': 2,
+        'pointRadius': 5
+    }]
+
+    return {
+        'total_stats': total_stats,
+        'category_stats': category_stats,
+        'line_stats': line_stats,
+        'category_chart_labels': json.dumps([stat['breakdown_category__name'] for stat in category_stats]),
+        'category_chart_data': json.dumps([stat['total_time'] for stat in category_stats]),
+        'line_chart_labels': json.dumps([stat['line_no'] for stat in line_stats]),
+        'line_chart_data': json.dumps([stat['total_time'] for stat in line_stats]),
+        'trend_dates': json.dumps(dates),
+        'trend_chart_data': json.dumps(trend_chart_data),
+        'total_trend_chart_data': json.dumps(total_trend_chart_data),
+        'category_trend_chart_data': json.dumps(category_trend_chart_data),
+        'chart_colors': json.dumps(CHART_COLORS),
+    }
+
+
+def breakdown_minutes_by_category(start_date, end_date, line_filter=None, shift_filter=None):
+    """[(category, minutes)] for the filters, largest first"""
+    conditions = ["b.p_date >= %s", "b.p_date <= %s"]
+    params = [start_date, end_date]
+    if line_filter:
+        conditions.append("b.line_no = %s")
+        params.append(line_filter)
+    if shift_filter:
+        conditions.append("b.shift = %s")
+        params.append(shift_filter)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT c.name, COALESCE(SUM(b.breakdown_minutes), 0)::float8 AS minutes
+            FROM breakdown b
+            JOIN breakdown_category c ON c.id = b.breakdown_category_id
+            WHERE {' AND '.join(conditions)}
+            GROUP BY c.name
+            ORDER BY minutes DESC
+        """, params)
+        return cursor.fetchall()
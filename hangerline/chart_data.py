@@ -0,0 +1,319 @@
+"""
+Chart.js series for the hangerline production charts.
+
+All production charts are built from one grouped scan of
+daily_production_rollup per request, (line, shift, operation) totals for the
+filtered dates. Target charts add one grouped line_target query. The batch
+endpoint (/hangerline/api/chart/batch/) returns several charts from the same
+scan, and the per-chart endpoints reuse the same builders.
+"""
+
+import calendar
+from datetime import date, datetime, timedelta
+
+from django.db import connection
+
+from .production_categories import CATEGORY_BITS, add_to_categories
+from .rollups import maybe_refresh_rollups
+from .trend_store import get_daily_trend
+
+BAR_BACKGROUND_COLORS = [
+    'rgba(52, 152, 219, 0.8)',
+    'rgba(231, 76, 60, 0.8)',
+    'rgba(46, 204, 113, 0.8)',
+    'rgba(155, 89, 182, 0.8)',
+    'rgba(243, 156, 18, 0.8)',
+    'rgba(26, 188, 156, 0.8)',
+    'rgba(149, 165, 166, 0.8)',
+    'rgba(44, 62, 80, 0.8)',
+]
+
+BAR_BORDER_COLORS = [
+    'rgba(52, 152, 219, 1)',
+    'rgba(231, 76, 60, 1)',
+    'rgba(46, 204, 113, 1)',
+    'rgba(155, 89, 182, 1)',
+    'rgba(243, 156, 18, 1)',
+    'rgba(26, 188, 156, 1)',
+    'rgba(149, 165, 166, 1)',
+    'rgba(44, 62, 80, 1)',
+]
+
+
+class ChartFilters:
+    """Shared filters for every chart in a request"""
+
+    def __init__(self, start_date=None, end_date=None, line=None, shift=None):
+        self.start_date = start_date or None
+        self.end_date = end_date or None
+        self.line = line if line and line != 'All' else None
+        self.shift = shift if shift and shift != 'All' else None
+
+    @classmethod
+    def from_request(cls, request):
+        return cls(
+            request.GET.get('start_date'),
+            request.GET.get('end_date'),
+            request.GET.get('line'),
+            request.GET.get('shift'),
+        )
+
+    def date_conditions(self, column):
+        """SQL conditions and params for the date range; no end date means the current month"""
+        conditions, params = [], []
+        if self.start_date:
+            conditions.append(f"{column} >= %s")
+            params.append(self.start_date)
+        if self.end_date:
+            conditions.append(f"{column} <= %s")
+            params.append(self.end_date)
+        else:
+            today = datetime.now().date()
+            conditions.append(f"{column} BETWEEN %s AND %s")
+            params += [
+                date(today.year, today.month, 1),
+                date(today.year, today.month, calendar.monthrange(today.year, today.month)[1]),
+            ]
+        return conditions, params
+
+
+class ChartContext:
+    """Lazily runs the shared production scan and target query for one set of filters"""
+
+    def __init__(self, filters):
+        self.filters = filters
+        self._production = None
+        self._targets = None
+
+    @property
+    def production(self):
+        """[(line, shift, oc_description, loading, unloading, odpd_quantity)] for the filters"""
+        if self._production is None:
+            maybe_refresh_rollups()
+            conditions, params = self.filters.date_conditions('odp_date')
+            if self.filters.line:
+                conditions.append("source_connection = %s")
+                params.append(self.filters.line)
+            if self.filters.shift:
+                conditions.append("shift = %s")
+                params.append(self.filters.shift)
+
+            with connection.cursor() as cursor:
+                cursor.execute(f"""
+                    SELECT
+                        source_connection,
+                        shift,
+                        oc_description,
+                        COALESCE(SUM(loading_qty), 0)::bigint,
+                        COALESCE(SUM(unloading_qty), 0)::bigint,
+                        COALESCE(SUM(odpd_quantity), 0)::bigint
+                    FROM daily_production_rollup
+                    WHERE {' AND '.join(conditions)}
+                    GROUP BY source_connection, shift, oc_description
+                """, params)
+                self._production = cursor.fetchall()
+        return self._production
+
+    @property
+    def targets(self):
+        """[(line, target_qty, target_rows)] for the filters, ordered by line"""
+        if self._targets is None:
+            conditions, params = self.filters.date_conditions('target_date')
+            if self.filters.line:
+                conditions.append("source_connection = %s")
+                params.append(self.filters.line)
+
+            with connection.cursor() as cursor:
+                cursor.execute(f"""
+                    SELECT source_connection, COALESCE(SUM(total_target_qty), 0)::bigint, COUNT(*)
+                    FROM line_target
+                    WHERE {' AND '.join(conditions)}
+                    GROUP BY source_connection
+                    ORDER BY source_connection
+                """, params)
+                self._targets = cursor.fetchall()
+        return self._targets
+
+    def totals_by(self, index):
+        """{key: [loading, unloading]} summed over the production rows, keyed on column index"""
+        totals = {}
+        for row in self.production:
+            key = row[index]
+            if not key:
+                continue
+            total = totals.setdefault(key, [0, 0])
+            total[0] += row[3]
+            total[1] += row[4]
+        return totals
+
+
+def _stacked_datasets(totals):
+    labels = sorted(totals)
+    loading = [totals[label][0] for label in labels]
+    unloading = [totals[label][1] for label in labels]
+    wip = [totals[label][0] - totals[label][1] for label in labels]
+    return {
+        'labels': labels,
+        'datasets': [
+            {'label': 'Loading', 'data': loading, 'backgroundColor': 'rgba(54, 162, 235, 0.8)', 'stack': 'Stack 0'},
+            {'label': 'Offloading', 'data': unloading, 'backgroundColor': 'rgba(255, 99, 132, 0.8)', 'stack': 'Stack 0'},
+            {'label': 'WIP', 'data': wip, 'backgroundColor': 'rgba(255, 206, 86, 0.8)', 'stack': 'Stack 0'},
+        ]
+    }
+
+
+def shift_chart(context):
+    """Loading/offloading/WIP per shift"""
+    return _stacked_datasets(context.totals_by(1))
+
+
+def source_chart(context):
+    """Loading/offloading/WIP per line"""
+    return _stacked_datasets(context.totals_by(0))
+
+
+def production_chart(context):
+    """odpd_quantity per production category"""
+    totals = dict.fromkeys(CATEGORY_BITS, 0)
+    for _, _, description, _, _, quantity in context.production:
+        add_to_categories(totals, description, quantity)
+
+    return {
+        'labels': ['Loading', 'Offloading', 'QC(midline)', 'QC(endline)', 'QC(final)'],
+        'datasets': [{
+            'label': 'Quantity',
+            'data': [totals['loading'], totals['offline'], totals['midline'], totals['endline'], totals['final']],
+            'backgroundColor': [
+                'rgba(102, 126, 234, 0.8)',  # Purple for Loading (matches Total Loading stat card)
+                'rgba(240, 147, 251, 0.8)',  # Pink/Red for Offloading (matches Total Offloading stat card)
+                'rgba(255, 206, 86, 0.7)',   # Yellow for QC(midline)
+                'rgba(75, 192, 192, 0.7)',   # Teal for QC(endline)
+                'rgba(153, 102, 255, 0.7)',  # Purple variant for QC(final)
+            ],
+        }]
+    }
+
+
+def trend_chart(context):
+    """Daily loading/offloading/WIP for the last 30 days"""
+    end = datetime.now().date()
+    start = end - timedelta(days=30)
+    filters = context.filters
+
+    # Closed days are served from the per-day trend store, only recent days are queried
+    data = get_daily_trend(
+        start, end,
+        [filters.line] if filters.line else None,
+        [filters.shift] if filters.shift else None,
+    )
+
+    return {
+        'labels': [day.strftime('%Y-%m-%d') for day in data],
+        'datasets': [
+            {'label': 'Loading', 'data': [int(point['loading']) for point in data.values()], 'borderColor': 'rgba(54, 162, 235, 1)', 'fill': False},
+            {'label': 'Offloading', 'data': [int(point['offloading']) for point in data.values()], 'borderColor': 'rgba(255, 99, 132, 1)', 'fill': False},
+            {'label': 'WIP', 'data': [int(point['wip']) for point in data.values()], 'borderColor': 'rgba(255, 206, 86, 1)', 'fill': False},
+        ]
+    }
+
+
+def _line_share_chart(context, index, label, total_key):
+    totals = context.totals_by(0)
+    ranked = sorted(totals.items(), key=lambda item: item[1][index], reverse=True)
+    values = [total[index] for _, total in ranked]
+    total = sum(values)
+
+    return {
+        'labels': [line for line, _ in ranked],
+        'datasets': [{
+            'label': label,
+            'data': values,
+            'backgroundColor': BAR_BACKGROUND_COLORS,
+            'borderColor': BAR_BORDER_COLORS,
+            'borderWidth': 2,
+            'borderRadius': 8,
+            'borderSkipped': False,
+        }],
+        'percentages': [(value / total * 100) if total > 0 else 0 for value in values],
+        total_key: total
+    }
+
+
+def line_offloading_chart(context):
+    """Offloading per line with each line's share"""
+    return _line_share_chart(context, 1, 'Offloading Sum', 'total_offloading')
+
+
+def line_loading_chart(context):
+    """Loading per line with each line's share"""
+    return _line_share_chart(context, 0, 'Loading Sum', 'total_loading')
+
+
+def line_target_summary_chart(context):
+    """Total target against total offloading"""
+    target_qty = sum(row[1] for row in context.targets)
+    target_lines = sum(row[2] for row in context.targets)
+    offloading_qty = sum(row[4] for row in context.production)
+    achievement_rate = (offloading_qty / target_qty * 100) if target_qty > 0 else 0
+
+    return {
+        'total_targets': target_qty,
+        'total_offloading': offloading_qty,
+        'variance': target_qty - offloading_qty,
+        'achievement_rate': round(achievement_rate, 1),
+        'target_lines': target_lines,
+    }
+
+
+def line_wise_targets_chart(context):
+    """Target and offloading per line with target share and achievement rate"""
+    offloading_map = {}
+    for row in context.production:
+        offloading_map[row[0]] = offloading_map.get(row[0], 0) + row[4]
+
+    total_target_qty = sum(row[1] for row in context.targets)
+
+    result_data = []
+    for line, target_qty, _ in context.targets:
+        actual_qty = offloading_map.get(line, 0)
+        target_percentage = (target_qty / total_target_qty * 100) if total_target_qty > 0 else 0
+        achievement_rate = (actual_qty / target_qty * 100) if target_qty > 0 else 0
+
+        result_data.append({
+            'line': line,
+            'target_qty': target_qty,
+            'actual_qty': actual_qty,
+            'target_percentage': round(target_percentage, 1),
+            'achievement_rate': round(achievement_rate, 1)
+        })
+
+    return {
+        'data': result_data,
+        'total_target_qty': total_target_qty
+    }
+
+
+CHART_BUILDERS = {
+    'shift': shift_chart,
+    'source': source_chart,
+    'production': production_chart,
+    'line': trend_chart,
+    'line-offloading': line_offloading_chart,
+    'line-loading': line_loading_chart,
+    'line-target-summary': line_target_summary_chart,
+    'line-wise-targets': line_wise_targets_chart,
+}
+
+
+def get_chart_data(chart_ids, filters):
+    """
+    Return {chart_id: chart payload} for the requested charts, all computed
+    from one shared production scan (and one target query if needed).
+    Raises ValueError for an unknown chart id.
+    """
+    unknown = [chart_id for chart_id in chart_ids if chart_id not in CHART_BUILDERS]
+    if unknown:
+        raise ValueError(f"Unknown chart ids: {', '.join(unknown)}")
+
+    context = ChartContext(filters)
+    return {chart_id: CHART_BUILDERS[chart_id](context) for chart_id in chart_ids}
@@ -0,0 +1,89 @@
+"""
+Conditional GET for the dashboard and chart endpoints.
+
+Every payload is derived from the ETL tables (etl_extract_log /
+etl_qcr_extract_log), the rollup tables built from them (rollup_watermark
+records each refresh), LineTarget and Breakdown, plus today's date for the
+trailing trends. get_data_version() reads all of these in one small query,
+after giving the throttled rollup refresh its chance to run, so the version
+describes the same state the response body is built from. It is also the key
+of the dashboard payload cache (hangerline.dashboard_cache). data_condition
+wraps a view with Django's condition() so a client sending If-None-Match /
+If-Modified-Since gets a 304 before any aggregation runs.
+"""
+
+from datetime import datetime, time
+import hashlib
+
+from django.db import connection
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from .rollups import DASHBOARD_ROLLUPS, maybe_refresh_rollups
+
+# Attribute caching the version on the request, etag_func and last_modified_func both need it
+_REQUEST_ATTR = '_hangerline_data_version'
+
+
+def get_data_version():
+    """
+    Return (version, last_modified) for the dashboard data: version is a
+    short hash of the latest successful extract ids, the latest rollup refresh,
+    the latest LineTarget and Breakdown change and their row counts (so
+    deletes change it too) and today's date; last_modified is the latest of
+    those timestamps, and never earlier than the start of today.
+    """
+    # Rollups first, so the version never names ETL data the rollups do not hold yet
+    maybe_refresh_rollups()
+
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT
+                (SELECT MAX(extractlogid) FROM etl_extract_log WHERE success),
+                (SELECT MAX(extractlogid) FROM etl_qcr_extract_log WHERE success),
+                (SELECT MAX(endtime) FROM etl_extract_log WHERE success),
+                (SELECT MAX(endtime) FROM etl_qcr_extract_log WHERE success),
+                (SELECT MAX(updated_at) FROM line_target),
+                (SELECT COUNT(*) FROM line_target),
+                (SELECT MAX(updated_at) FROM breakdown),
+                (SELECT COUNT(*) FROM breakdown),
+                (SELECT MAX(refreshed_at) FROM rollup_watermark WHERE rollup = ANY(%s))
+        """, [list(DASHBOARD_ROLLUPS)])
+        (production_id, qcr_id, production_end, qcr_end,
+         target_updated, target_count, breakdown_updated, breakdown_count, rollup_refreshed) = cursor.fetchone()
+
+    today = timezone.localdate()
+    parts = [production_id, qcr_id, rollup_refreshed, target_updated, target_count,
+             breakdown_updated, breakdown_count, today]
+    version = hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+    start_of_today = timezone.make_aware(datetime.combine(today, time.min))
+    timestamps = [start_of_today]
+    for value in (production_end, qcr_end, rollup_refreshed, target_updated, breakdown_updated):
+        if value is None:
+            continue
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        timestamps.append(value)
+
+    return version, max(timestamps)
+
+
+def _request_data_version(request):
+    version = getattr(request, _REQUEST_ATTR, None)
+    if version is None:
+        version = get_data_version()
+        setattr(request, _REQUEST_ATTR, version)
+    return version
+
+
+def data_etag(request, *args, **kwargs):
+    return _request_data_version(request)[0]
+
+
+def data_last_modified(request, *args, **kwargs):
+    return _request_data_version(request)[1]
+
+
+# Decorator for function views; wrap with method_decorator for APIView.get
+data_condition = condition(etag_func=data_etag, last_modified_func=data_last_modified)
@@ -0,0 +1,105 @@
+"""
+Result cache for the assembled dashboard payload.
+
+Entries are keyed on the normalized (start_date, end_date, line, shift) filter
+tuple plus the data version from hangerline.conditional.get_data_version(),
+the same one the ETag is built from: the latest successful extracts, the
+latest rollup refresh, LineTarget / Breakdown changes and today's date. A new
+ETL run, a rollup refresh or a target or breakdown edit changes the version,
+so stale entries are never read again and simply expire.
+"""
+
+from datetime import date
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .conditional import get_data_version
+from .dashboard_utils import get_dashboard_data
+
+CACHE_PREFIX = 'hangerline:dashboard'
+
+# {key: {'event': Event, 'result'/'error': ...}} for computations currently running
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def single_flight(key, func):
+    """
+    Call func() once for concurrent callers with the same key: the first
+    caller computes, the others wait for it and share its result (or error).
+    """
+    with _in_flight_lock:
+        call = _in_flight.get(key)
+        leader = call is None
+        if leader:
+            call = _in_flight[key] = {'event': threading.Event()}
+
+    if not leader:
+        call['event'].wait()
+        if 'error' in call:
+            raise call['error']
+        return call['result']
+
+    try:
+        call['result'] = func()
+        return call['result']
+    except Exception as e:
+        call['error'] = e
+        raise
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+        call['event'].set()
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+
+def normalize_dashboard_filters(start_date, end_date, line_filter=None, shift_filter=None):
+    """
+    Return (start_date, end_date, line, shift) in the form get_dashboard_data
+    expects, so equivalent requests share one cache entry. Dates may be given
+    as date objects or ISO strings; a half-open range means no date filter.
+    """
+    start_date = _parse_date(start_date)
+    end_date = _parse_date(end_date)
+    if not start_date or not end_date:
+        start_date = end_date = None
+
+    line_filter = line_filter if line_filter and line_filter != 'All' else None
+    shift_filter = shift_filter if shift_filter and shift_filter != 'All' else None
+    return start_date, end_date, line_filter, shift_filter
+
+
+def get_cached_dashboard_data(start_date, end_date, line_filter=None, shift_filter=None):
+    """Cached get_dashboard_data: identical filters at the same data version are served from memory"""
+    filters = normalize_dashboard_filters(start_date, end_date, line_filter, shift_filter)
+    # The version includes today's date, as the payload has a trailing 30-day trend
+    version, _ = get_data_version()
+
+    key = ':'.join([
+        CACHE_PREFIX,
+        version,
+        *[value.isoformat() if isinstance(value, date) else (value or 'All') for value in filters],
+    ])
+
+    dashboard_data = cache.get(key)
+    if dashboard_data is not None:
+        return dashboard_data
+
+    def compute():
+        # get_data_version() has already given the dashboard rollups their throttled
+        # refresh, and the key names the rollup state the payload is built from
+        dashboard_data = get_dashboard_data(*filters)
+        cache.set(key, dashboard_data, getattr(settings, 'HANGERLINE_DASHBOARD_CACHE_SECONDS', 3600))
+        return dashboard_data
+
+    # Identical requests arriving while this one computes wait for it instead
+    return single_flight(key, compute)
@@ -2,83 +2,145 @@
 Shared utilities for dashboard data processing
 """
 
-from django.db import connection
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections, connection
 from datetime import date, timedelta
+import base64
+import json
 import logging
+import threading
 
-logger = logging.getLogger(__name__)
-
-def convert_decimals(obj):
-    """Recursively convert Decimal objects to float/int for JSON serialization"""
-    from decimal import Decimal
-    import datetime
-
-    if isinstance(obj, Decimal):
-        return float(obj)
-    elif isinstance(obj, dict):
-        return {key: convert_decimals(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_decimals(item) for item in obj]
-    elif isinstance(obj, tuple):
-        return tuple(convert_decimals(item) for item in obj)
-    elif isinstance(obj, datetime.date):
-        return obj.isoformat()
-    else:
-        return obj
+from .attendance import get_line_attendance, summarize_attendance
+from .rollups import maybe_refresh_rollups
+from .trend_store import get_daily_trend
 
-def get_dashboard_data(start_date, end_date, line_filter=None, shift_filter=None):
-    """Helper function to get dashboard data with advanced efficiency calculations"""
+logger = logging.getLogger(__name__)
 
+LOADING_OPERATIONS = ['Loading/Panel Segregation', 'Garment Insert in Poly Bag & Close']
+
+# Sortable dateWiseEfficiency columns and their SQL expressions (NULLs mapped so keyset comparisons work)
+EFFICIENCY_SORT_COLUMNS = {
+    'odp_date': 'odp_date',
+    'source_connection': 'source_connection',
+    'st_id': "COALESCE(st_id, '')",
+    'ondate_loading': 'ondate_loading',
+    'ondate_unloading': 'ondate_unloading',
+    'line_wip': 'COALESCE(line_wip, 0)',
+    'emp_count': 'emp_count',
+    'total_produced_minutes': 'COALESCE(total_produced_minutes, 0)',
+    'efficiency_percent': 'COALESCE(efficiency_percent, 0)',
+}
+DEFAULT_EFFICIENCY_SORT = '-odp_date'
+
+
+def _normalize_filters(line_filter, shift_filter):
+    """Expand 'All'/empty line and shift filters into the lists the queries expect"""
     # Set default filters if not provided
     if not line_filter or line_filter == 'All':
         line_filter = ['line-21', 'line-22', 'line-23', 'line-24', 'line-25', 'line-26', 'line-27', 'line-28', 'line-29', 'line-30', 'line-31', 'line-32']
-    else:
+    elif isinstance(line_filter, str):
         line_filter = [line_filter]
 
     if not shift_filter or shift_filter == 'All':
         shift_filter = ['Day', 'Night']
-    else:
+    elif isinstance(shift_filter, str):
         shift_filter = [shift_filter]
+    return line_filter, shift_filter
+
 
+_query_executor = None
+_query_executor_lock = threading.Lock()
+
+
+def _get_query_executor():
+    global _query_executor
+    with _query_executor_lock:
+        if _query_executor is None:
+            _query_executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'HANGERLINE_DASHBOARD_QUERY_WORKERS', 5),
+                thread_name_prefix='dashboard-query',
+            )
+    return _query_executor
+
+
+def _run_with_connection(func, args):
+    """Run func on a pool thread; the thread keeps its own connection between calls (CONN_MAX_AGE)"""
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+def run_concurrently(queries):
+    """
+    Run independent {name: (func, args)} queries in parallel, each on its own
+    database connection, and return {name: result}. The dashboard then waits
+    for the slowest query rather than the sum of all of them. Set
+    HANGERLINE_DASHBOARD_CONCURRENT_QUERIES = False to run them in order.
+    """
+    if not getattr(settings, 'HANGERLINE_DASHBOARD_CONCURRENT_QUERIES', True):
+        return {name: func(*args) for name, (func, args) in queries.items()}
+
+    executor = _get_query_executor()
+    futures = {name: executor.submit(_run_with_connection, func, args) for name, (func, args) in queries.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
+def _efficiency_cte(start_date, end_date, line_filter, shift_filter):
+    """
+    Return (sql, params) for a WITH clause defining `efficiency`: one row per
+    (odp_date, source_connection, st_id) for the loading operations.
+    """
     # Convert dates to strings for SQL
     start_date_str = start_date.strftime('%Y-%m-%d') if start_date else None
     end_date_str = end_date.strftime('%Y-%m-%d') if end_date else None
 
-    # If no date range provided, use last 7 days
-    if not start_date_str or not end_date_str:
-        try:
-            # Use raw SQL query similar to the provided one
-            query = """
+    # Without a date range every date is included
+    if start_date_str and end_date_str:
+        date_params = [start_date_str, end_date_str]
+        rollup_date_condition = "odp_date >= %s AND odp_date <= %s AND"
+        emp_date_condition = "sub.odp_date >= %s AND sub.odp_date <= %s AND"
+        main_date_condition = "r.odp_date >= %s AND r.odp_date <= %s AND"
+    else:
+        date_params = []
+        rollup_date_condition = emp_date_condition = main_date_condition = ""
+
+    # Loading/offloading come from the pre-aggregated daily_production_rollup;
+    # operator headcount is a distinct count and still needs the raw table.
+    sql = f"""
+        WITH efficiency AS (
             SELECT
-                odp.odp_date,
-                odp.source_connection,
-                odp.st_id,
-                REGEXP_REPLACE(odp.st_id, '[-_].*', '') as style_prefix,
-                SUM(odp.loading_qty) AS ondate_loading,
-                SUM(odp.unloading_qty) AS ondate_unloading,
+                r.odp_date,
+                r.source_connection,
+                r.st_id,
+                r.style_prefix,
+                SUM(r.loading_qty) AS ondate_loading,
+                SUM(r.unloading_qty) AS ondate_unloading,
                 wip.line_wip,
                 smv.totalsmv,
                 smv.conversionfactor,
-                (smv.totalsmv * smv.conversionfactor * SUM(odp.unloading_qty)) AS total_produced_minutes,
+                (smv.totalsmv * smv.conversionfactor * SUM(r.unloading_qty)) AS total_produced_minutes,
                 COALESCE(emp.emp_count, 0) AS emp_count,
                 ROUND(
                     CAST(
-                        100.0 * (smv.totalsmv * smv.conversionfactor) * SUM(odp.unloading_qty)
+                        100.0 * (smv.totalsmv * smv.conversionfactor) * SUM(r.unloading_qty)
                         / NULLIF(COALESCE(emp.emp_count, 0) * 480, 0) AS numeric
                     ),
                     2
                 ) AS efficiency_percent
-            FROM operator_daily_performance odp
+            FROM daily_production_rollup r
             LEFT JOIN (
                 SELECT source_connection,
                        st_id,
-                       SUM(COALESCE(loading_qty, 0)) - SUM(COALESCE(unloading_qty, 0)) as line_wip
-                FROM operator_daily_performance
-                WHERE source_connection = ANY(%s)
+                       SUM(loading_qty) - SUM(unloading_qty) as line_wip
+                FROM daily_production_rollup
+                WHERE {rollup_date_condition} source_connection = ANY(%s)
                   AND shift = ANY(%s)
                   AND oc_description IN ('Loading/Panel Segregation', 'Garment Insert in Poly Bag & Close')
                 GROUP BY source_connection, st_id
-            ) as wip ON odp.source_connection = wip.source_connection AND odp.st_id = wip.st_id
+            ) as wip ON r.source_connection = wip.source_connection AND r.st_id = wip.st_id
             LEFT JOIN (
                 SELECT
                     sub.odp_date,
@@ -86,172 +148,366 @@ def get_dashboard_data(start_date, end_date, line_filter=None, shift_filter=None
                     sub.st_id,
                     COUNT(DISTINCT sub.odp_em_key) AS emp_count
                 FROM operator_daily_performance sub
-                WHERE LEFT(sub.odp_em_key::TEXT, 5) = '10613'
+                WHERE {emp_date_condition} LEFT(sub.odp_em_key::TEXT, 5) = '10613'
                   AND sub.source_connection = ANY(%s)
                   AND sub.shift = ANY(%s)
                 GROUP BY sub.odp_date, sub.source_connection, sub.st_id
-            ) AS emp ON odp.odp_date = emp.odp_date
-                    AND odp.source_connection = emp.source_connection
-                    AND odp.st_id = emp.st_id
-            LEFT JOIN (
-                SELECT
-                    articleno,
-                    totalsmv,
-                    conversionfactor
-                FROM (
-                    SELECT
-                        articleno,
-                        totalsmv,
-                        conversionfactor,
-                        ROW_NUMBER() OVER (PARTITION BY articleno ORDER BY applicabledate DESC) AS rn
-                    FROM operationinformation
-                    WHERE applicabledate IS NOT NULL
-                ) ranked
-                WHERE rn = 1
-            ) AS smv ON REGEXP_REPLACE(odp.st_id, '[-_].*', '') = smv.articleno
-            WHERE odp.source_connection = ANY(%s)
-              AND odp.shift = ANY(%s)
-              AND odp.oc_description IN ('Loading/Panel Segregation', 'Garment Insert in Poly Bag & Close')
-            GROUP BY odp.odp_date, odp.source_connection, odp.st_id, smv.totalsmv, smv.conversionfactor, emp.emp_count, wip.line_wip
-            ORDER BY odp.odp_date DESC, odp.source_connection
-            """
-
-            with connection.cursor() as cursor:
-                cursor.execute(query, [line_filter, shift_filter, line_filter, shift_filter, line_filter, shift_filter])
-                efficiency_data = cursor.fetchall()
-
-                # Process the results - convert Decimal objects to float/int
-                date_wise_data = []
-                for row in efficiency_data:
-                    date_wise_data.append({
-                        'odp_date': row[0],
-                        'source_connection': row[1],
-                        'st_id': row[2],
-                        'style_prefix': row[3],
-                        'ondate_loading': float(row[4] or 0),
-                        'ondate_unloading': float(row[5] or 0),
-                        'line_wip': float(row[6] or 0),
-                        'totalsmv': float(row[7] or 0),
-                        'conversionfactor': float(row[8] or 1),
-                        'total_produced_minutes': float(row[9] or 0),
-                        'emp_count': int(row[10] or 0),
-                        'efficiency_percent': float(row[11] or 0),
-                    })
-        except Exception as e:
-            logger.error(f"Main query failed: {e}")
-            # Fallback to empty data - will be handled by mock generation below
-            date_wise_data = []
+            ) AS emp ON r.odp_date = emp.odp_date
+                    AND r.source_connection = emp.source_connection
+                    AND r.st_id = emp.st_id
+            LEFT JOIN article_smv smv ON smv.articleno = r.style_prefix
+            WHERE {main_date_condition} r.source_connection = ANY(%s)
+              AND r.shift = ANY(%s)
+              AND r.oc_description IN ('Loading/Panel Segregation', 'Garment Insert in Poly Bag & Close')
+            GROUP BY r.odp_date, r.source_connection, r.st_id, r.style_prefix, smv.totalsmv, smv.conversionfactor, emp.emp_count, wip.line_wip
+        )
+    """
+    params = [*date_params, line_filter, shift_filter,
+              *date_params, line_filter, shift_filter,
+              *date_params, line_filter, shift_filter]
+    return sql, params
+
+
+def _fetch_efficiency_summary(start_date, end_date, line_filter, shift_filter):
+    """
+    Per-line and overall efficiency aggregates in one GROUPING SETS pass.
+
+    Returns {'lines': {line: {...}}, 'totals': {...} or None}.
+    """
+    summary = {'lines': {}, 'totals': None}
+    try:
+        cte, params = _efficiency_cte(start_date, end_date, line_filter, shift_filter)
+        # level 0 = one row per line, 1 = grand total
+        query = cte + """
+        SELECT
+            GROUPING(source_connection) AS level,
+            source_connection,
+            COALESCE(SUM(ondate_loading), 0)::float8,
+            COALESCE(SUM(ondate_unloading), 0)::float8,
+            COALESCE(SUM(line_wip), 0)::float8,
+            COALESCE(SUM(emp_count), 0)::int,
+            COALESCE(AVG(COALESCE(efficiency_percent, 0)), 0)::float8,
+            COUNT(DISTINCT source_connection)::int
+        FROM efficiency
+        GROUP BY GROUPING SETS ((source_connection), ())
+        ORDER BY level, source_connection
+        """
+
+        with connection.cursor() as cursor:
+            cursor.execute(query, params)
+            summary_rows = cursor.fetchall()
+
+        for level, line, loading, offloading, wip, employees, avg_efficiency, active_lines in summary_rows:
+            aggregate = {
+                'loading': loading,
+                'offloading': offloading,
+                'wip': wip,
+                'employees': employees,
+                'efficiency': avg_efficiency,
+            }
+            if level == 0:
+                summary['lines'][line] = aggregate
+            elif active_lines:
+                # The grand total row exists even when nothing matched
+                aggregate['active_lines'] = active_lines
+                summary['totals'] = aggregate
+    except Exception as e:
+        logger.error(f"Efficiency query failed: {e}")
+        summary = {'lines': {}, 'totals': None}
+    return summary
+
+
+def _encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
 
+
+def _decode_cursor(cursor, sort_column):
+    """[sort value, odp_date, source_connection, st_id] typed for the query; ValueError if malformed"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        sort_value, odp_date, source_connection, st_id = values
+        if not all(isinstance(value, str) for value in values):
+            raise TypeError("cursor values must be strings")
+        # The sort value is compared with the sort column, so it must parse as that column's type
+        if sort_column == 'odp_date':
+            sort_value = date.fromisoformat(sort_value)
+        elif sort_column not in ('source_connection', 'st_id'):
+            sort_value = float(sort_value)
+        return [sort_value, date.fromisoformat(odp_date), source_connection, st_id]
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def get_date_wise_efficiency_page(start_date, end_date, line_filter=None, shift_filter=None,
+                                  sort=DEFAULT_EFFICIENCY_SORT, cursor=None, limit=None):
+    """
+    One page of the date-wise efficiency rows, sorted on the server and
+    paginated with an opaque keyset cursor (the last row's sort key).
+
+    sort is one of EFFICIENCY_SORT_COLUMNS, prefixed with '-' for descending.
+    limit defaults to HANGERLINE_EFFICIENCY_PAGE_SIZE and is capped at
+    HANGERLINE_EFFICIENCY_MAX_PAGE_SIZE.
+    Returns {'results': [...], 'nextCursor': str or None, 'sort': sort, 'limit': limit}.
+    Raises ValueError for an unknown sort column, a bad limit or a malformed cursor.
+    """
+    line_filter, shift_filter = _normalize_filters(line_filter, shift_filter)
+
+    sort = sort or DEFAULT_EFFICIENCY_SORT
+    descending = sort.startswith('-')
+    sort_column = sort.lstrip('-')
+    sort_expression = EFFICIENCY_SORT_COLUMNS.get(sort_column)
+    if sort_expression is None:
+        raise ValueError(f"Invalid sort column: {sort}")
+
+    page_size = getattr(settings, 'HANGERLINE_EFFICIENCY_PAGE_SIZE', 100)
+    max_page_size = getattr(settings, 'HANGERLINE_EFFICIENCY_MAX_PAGE_SIZE', 1000)
+    limit = max(1, min(int(limit or page_size), max_page_size))
+
+    # The row key breaks ties so the keyset is unique; all parts share the sort direction
+    row_key = [f"({sort_expression})", 'odp_date', 'source_connection', "COALESCE(st_id, '')"]
+    direction = 'DESC' if descending else 'ASC'
+
+    cte, params = _efficiency_cte(start_date, end_date, line_filter, shift_filter)
+    cursor_condition = ""
+    if cursor:
+        cursor_condition = f"WHERE ({', '.join(row_key)}) {'<' if descending else '>'} (%s, %s, %s, %s)"
+        params = params + _decode_cursor(cursor, sort_column)
+
+    query = cte + f"""
+    SELECT
+        odp_date,
+        source_connection,
+        st_id,
+        style_prefix,
+        ondate_loading::float8,
+        ondate_unloading::float8,
+        COALESCE(line_wip, 0)::float8,
+        COALESCE(totalsmv, 0)::float8,
+        COALESCE(conversionfactor, 1)::float8,
+        COALESCE(total_produced_minutes, 0)::float8,
+        emp_count::int,
+        COALESCE(efficiency_percent, 0)::float8,
+        ({sort_expression})::text
+    FROM efficiency
+    {cursor_condition}
+    ORDER BY {', '.join(f'{part} {direction}' for part in row_key)}
+    LIMIT %s
+    """
+
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(query, params + [limit + 1])
+        rows = db_cursor.fetchall()
+
+    results = [
+        {
+            'odp_date': row[0].isoformat(),
+            'source_connection': row[1],
+            'st_id': row[2],
+            'style_prefix': row[3],
+            'ondate_loading': row[4],
+            'ondate_unloading': row[5],
+            'line_wip': row[6],
+            'totalsmv': row[7],
+            'conversionfactor': row[8],
+            'total_produced_minutes': row[9],
+            'emp_count': row[10],
+            'efficiency_percent': row[11],
+        }
+        for row in rows[:limit]
+    ]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = _encode_cursor([last[12], last[0].isoformat(), last[1], last[2] or ''])
+
+    return {'results': results, 'nextCursor': next_cursor, 'sort': sort, 'limit': limit}
+
+
+def _fetch_first_efficiency_page(start_date, end_date, line_filter, shift_filter):
+    try:
+        return get_date_wise_efficiency_page(start_date, end_date, line_filter, shift_filter)
+    except Exception as e:
+        logger.error(f"Date-wise efficiency query failed: {e}")
+        return {'results': [], 'nextCursor': None, 'sort': DEFAULT_EFFICIENCY_SORT, 'limit': 0}
+
+
+def _fetch_trend(start_date, end_date, line_filter, shift_filter):
+    """{iso date: point} for the trend chart; empty on failure so mock points are used"""
+    try:
+        # Closed days come from the per-day trend store; only the open days are queried
+        trend = get_daily_trend(start_date, end_date, line_filter, shift_filter, LOADING_OPERATIONS)
+        return {day.isoformat(): point for day, point in trend.items()}
+    except Exception as e:
+        logger.error(f"Trend query failed: {e}")
+        return {}
+
+
+def _fetch_defects(start_date, end_date, line_filter, shift_filter):
+    """
+    Defect quantities per shift, employee, reason and line (only for a date
+    range), plus the by-reason, by-line and overall totals in the same query.
+
+    Returns {'records': [...], 'by_reason': [(reason, qty)], 'by_line': [(line, qty)], 'total': qty}.
+    """
+    defects = {'records': [], 'by_reason': [], 'by_line': [], 'total': 0}
+    if not (start_date and end_date):
+        return defects
+
+    # level = GROUPING(shift, reason_key, line_key):
+    # 3 = detail record, 5 = per reason, 6 = per line, 7 = total
+    defect_query = """
+    SELECT
+        GROUPING(shift, reason_key, line_key) AS level,
+        shift,
+        em_description,
+        defect_reason,
+        line,
+        COALESCE(reason_key, line_key),
+        COALESCE(sum(qcr_defect_quantity), 0)::int as qcr_defect_quantity
+    FROM (
+        SELECT
+            shift,
+            (qcr_defect_em_key || '-' || ' ' || COALESCE(defect_em_firstname, '-') || ' ' || COALESCE(defect_em_lastname, '-')) AS em_description,
+            qcsc_description as defect_reason,
+            COALESCE(qcsc_description, 'Unknown') AS reason_key,
+            source_connection as line,
+            COALESCE(source_connection, 'Unknown') AS line_key,
+            qcr_defect_quantity
+        FROM quality_control_repair
+        WHERE qcr_date >= %s AND qcr_date <= %s
+          AND source_connection = ANY(%s)
+          AND shift = ANY(%s)
+    ) qcr
+    GROUP BY GROUPING SETS ((shift, em_description, defect_reason, line), (reason_key), (line_key), ())
+    ORDER BY level, line, qcr_defect_quantity DESC
+    """
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(defect_query, [start_date, end_date, line_filter, shift_filter])
+            defect_results = cursor.fetchall()
+            logger.info(f"Defect query returned {len(defect_results)} rows")
+
+        for level, shift, employee, reason, line, key, quantity in defect_results:
+            if level == 3:
+                defects['records'].append({
+                    'shift': shift,
+                    'employee': employee,
+                    'defect_reason': reason,
+                    'line': line,
+                    'quantity': quantity
+                })
+            elif level == 5:
+                defects['by_reason'].append((key, quantity))
+            elif level == 6:
+                defects['by_line'].append((key, quantity))
+            else:
+                defects['total'] = quantity
+    except Exception as e:
+        logger.error(f"Defect query error: {e}")
+        return {'records': [], 'by_reason': [], 'by_line': [], 'total': 0}
+    return defects
+
+
+def _fetch_line_targets(start_date, end_date, line_filter):
+    """{line: planned quantity} from LineTarget"""
+    from .models import LineTarget
+    from django.db.models import Sum
+
+    try:
+        targets = LineTarget.objects.filter(source_connection__in=line_filter)
+        if start_date and end_date:
+            targets = targets.filter(target_date__gte=start_date, target_date__lte=end_date)
+        return {
+            row['source_connection']: row['total'] or 0
+            for row in targets.order_by().values('source_connection').annotate(total=Sum('total_target_qty'))
+        }
+    except Exception as e:
+        logger.error(f"Line target query failed: {e}")
+        return {}
+
+
+def _fetch_line_breakdowns(start_date, end_date, line_filter, shift_filter):
+    """{line: breakdown minutes} from the breakdown log"""
+    if start_date and end_date:
+        date_condition = "AND p_date >= %s AND p_date <= %s"
+        params = [line_filter, shift_filter, start_date, end_date]
     else:
-        # Use filtered date range
-        try:
-            query = """
-            SELECT
-                odp.odp_date,
-                odp.source_connection,
-                odp.st_id,
-                REGEXP_REPLACE(odp.st_id, '[-_].*', '') as style_prefix,
-                SUM(odp.loading_qty) AS ondate_loading,
-                SUM(odp.unloading_qty) AS ondate_unloading,
-                wip.line_wip,
-                smv.totalsmv,
-                smv.conversionfactor,
-                (smv.totalsmv * smv.conversionfactor * SUM(odp.unloading_qty)) AS total_produced_minutes,
-                COALESCE(emp.emp_count, 0) AS emp_count,
-                ROUND(
-                    CAST(
-                        100.0 * (smv.totalsmv * smv.conversionfactor) * SUM(odp.unloading_qty)
-                        / NULLIF(COALESCE(emp.emp_count, 0) * 480, 0) AS numeric
-                    ),
-                    2
-                ) AS efficiency_percent
-            FROM operator_daily_performance odp
-            LEFT JOIN (
-                SELECT source_connection,
-                       st_id,
-                       SUM(COALESCE(loading_qty, 0)) - SUM(COALESCE(unloading_qty, 0)) as line_wip
-                FROM operator_daily_performance
-                WHERE odp_date >= %s AND odp_date <= %s
-                  AND source_connection = ANY(%s)
+        date_condition = ""
+        params = [line_filter, shift_filter]
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT line_no, SUM(breakdown_minutes)::float8
+                FROM breakdown
+                WHERE line_no = ANY(%s)
                   AND shift = ANY(%s)
-                  AND oc_description IN ('Loading/Panel Segregation', 'Garment Insert in Poly Bag & Close')
-                GROUP BY source_connection, st_id
-            ) as wip ON odp.source_connection = wip.source_connection AND odp.st_id = wip.st_id
-            LEFT JOIN (
-                SELECT
-                    sub.odp_date,
-                    sub.source_connection,
-                    sub.st_id,
-                    COUNT(DISTINCT sub.odp_em_key) AS emp_count
-                FROM operator_daily_performance sub
-                WHERE sub.odp_date >= %s AND sub.odp_date <= %s
-                  AND LEFT(sub.odp_em_key::TEXT, 5) = '10613'
-                  AND sub.source_connection = ANY(%s)
-                  AND sub.shift = ANY(%s)
-                GROUP BY sub.odp_date, sub.source_connection, sub.st_id
-            ) AS emp ON odp.odp_date = emp.odp_date
-                    AND odp.source_connection = emp.source_connection
-                    AND odp.st_id = emp.st_id
-            LEFT JOIN (
-                SELECT
-                    articleno,
-                    totalsmv,
-                    conversionfactor
-                FROM (
-                    SELECT
-                        articleno,
-                        totalsmv,
-                        conversionfactor,
-                        ROW_NUMBER() OVER (PARTITION BY articleno ORDER BY applicabledate DESC) AS rn
-                    FROM operationinformation
-                    WHERE applicabledate IS NOT NULL
-                ) ranked
-                WHERE rn = 1
-            ) AS smv ON REGEXP_REPLACE(odp.st_id, '[-_].*', '') = smv.articleno
-            WHERE odp.odp_date >= %s AND odp.odp_date <= %s
-              AND odp.source_connection = ANY(%s)
-              AND odp.shift = ANY(%s)
-              AND odp.oc_description IN ('Loading/Panel Segregation', 'Garment Insert in Poly Bag & Close')
-            GROUP BY odp.odp_date, odp.source_connection, odp.st_id, smv.totalsmv, smv.conversionfactor, emp.emp_count, wip.line_wip
-            ORDER BY odp.odp_date DESC, odp.source_connection
-            """
-
-            with connection.cursor() as cursor:
-                cursor.execute(query, [start_date_str, end_date_str, line_filter, shift_filter,
-                                     start_date_str, end_date_str, line_filter, shift_filter,
-                                     start_date_str, end_date_str, line_filter, shift_filter])
-                efficiency_data = cursor.fetchall()
-
-                # Process the results - convert Decimal objects to float/int
-                date_wise_data = []
-                for row in efficiency_data:
-                    date_wise_data.append({
-                        'odp_date': row[0],
-                        'source_connection': row[1],
-                        'st_id': row[2],
-                        'style_prefix': row[3],
-                        'ondate_loading': float(row[4] or 0),
-                        'ondate_unloading': float(row[5] or 0),
-                        'line_wip': float(row[6] or 0),
-                        'totalsmv': float(row[7] or 0),
-                        'conversionfactor': float(row[8] or 1),
-                        'total_produced_minutes': float(row[9] or 0),
-                        'emp_count': int(row[10] or 0),
-                        'efficiency_percent': float(row[11] or 0),
-                    })
-        except Exception as e:
-            logger.error(f"Filtered query failed: {e}")
-            # Fallback to empty data - will be handled by mock generation below
-            date_wise_data = []
-
-    # Calculate summary statistics from the date-wise data
-    if date_wise_data:
-        total_loading = sum(item['ondate_loading'] for item in date_wise_data)
-        total_offloading = sum(item['ondate_unloading'] for item in date_wise_data)
-        total_wip = sum(item['line_wip'] for item in date_wise_data if item['line_wip'])
-        avg_efficiency = sum(item['efficiency_percent'] for item in date_wise_data) / len(date_wise_data) if date_wise_data else 0
-        total_employees = sum(item['emp_count'] for item in date_wise_data)
-        active_lines = len(set(item['source_connection'] for item in date_wise_data))
+                  {date_condition}
+                GROUP BY line_no
+            """, params)
+            return {line: minutes or 0 for line, minutes in cursor.fetchall()}
+    except Exception as e:
+        logger.error(f"Breakdown query failed: {e}")
+        return {}
+
+
+def _fetch_line_attendance(start_date, end_date, line_filter, shift_filter):
+    """{line: attendance row} for the employees of the filtered lines/shifts, today when no dates are given"""
+    if not start_date or not end_date:
+        start_date = end_date = date.today()
+
+    try:
+        return {row['line']: row for row in get_line_attendance(start_date, end_date, line_filter, shift_filter)}
+    except Exception as e:
+        logger.error(f"Attendance query failed: {e}")
+        return {}
+
+
+def get_dashboard_data(start_date, end_date, line_filter=None, shift_filter=None):
+    """Helper function to get dashboard data with advanced efficiency calculations"""
+
+    line_filter, shift_filter = _normalize_filters(line_filter, shift_filter)
+
+    # Pick up any ETL loads that landed since the rollups were last refreshed
+    maybe_refresh_rollups()
+
+    # Trend always covers the last 30 days regardless of the date filter
+    today = date.today()
+    trend_start_date = today - timedelta(days=30)
+    trend_end_date = today
+
+    # The queries are independent of each other, so they run side by side
+    results = run_concurrently({
+        'summary': (_fetch_efficiency_summary, (start_date, end_date, line_filter, shift_filter)),
+        'efficiency_page': (_fetch_first_efficiency_page, (start_date, end_date, line_filter, shift_filter)),
+        'trend': (_fetch_trend, (trend_start_date, trend_end_date, line_filter, shift_filter)),
+        'defects': (_fetch_defects, (start_date, end_date, line_filter, shift_filter)),
+        'targets': (_fetch_line_targets, (start_date, end_date, line_filter)),
+        'breakdowns': (_fetch_line_breakdowns, (start_date, end_date, line_filter, shift_filter)),
+        'attendance': (_fetch_line_attendance, (start_date, end_date, line_filter, shift_filter)),
+    })
+    efficiency_page = results['efficiency_page']
+    date_wise_data = efficiency_page['results']
+    line_data = results['summary']['lines']
+    totals = results['summary']['totals']
+    trend_dict = results['trend']
+    defects = results['defects']
+    defect_data = defects['records']
+    total_defects = defects['total']
+    line_targets = results['targets']
+    line_breakdowns = results['breakdowns']
+    line_attendance = results['attendance']
+
+    # Summary statistics come from the efficiency summary's grand total row
+    if totals:
+        total_loading = totals['loading']
+        total_offloading = totals['offloading']
+        total_wip = totals['wip']
+        avg_efficiency = totals['efficiency']
+        total_employees = totals['employees']
+        active_lines = totals['active_lines']
     else:
         # No data found - return mock data instead of empty data
         logger.info("No data found for filters, returning mock data")
@@ -290,6 +546,7 @@ def get_dashboard_data(start_date, end_date, line_filter=None, shift_filter=None
                 {'line': 'Line-23', 'loading': 2380, 'offloading': 2330, 'wip': 50, 'target': 1180, 'achievementPct': 197.5, 'variance': 1150, 'variancePct': 97.5, 'efficiency': 98, 'defects': 4, 'defectsPct': 0.2, 'breakdownMin': 18, 'activeEmployees': 82, 'presentEmployees': 77, 'attendancePct': 93.9},
             ],
             'dateWiseEfficiency': [],
+            'dateWiseEfficiencyNextCursor': None,
             'pieCharts': {
                 'productionDistribution': [
                     {'label': 'Target Achieved', 'value': 18500, 'color': '#22c55e'},
@@ -332,102 +589,48 @@ def get_dashboard_data(start_date, end_date, line_filter=None, shift_filter=None
                 'defectRecords': []
             }
         }
-        return convert_decimals(mock_data)
-
-    # Get line-wise aggregations
-    line_data = {}
-    for item in date_wise_data:
-        line = item['source_connection']
-        if line not in line_data:
-            line_data[line] = {
-                'loading': 0,
-                'offloading': 0,
-                'efficiency': 0,
-                'employees': 0,
-                'count': 0
-            }
-        line_data[line]['loading'] += item['ondate_loading']
-        line_data[line]['offloading'] += item['ondate_unloading']
-        line_data[line]['efficiency'] += item['efficiency_percent']
-        line_data[line]['employees'] += item['emp_count']
-        line_data[line]['count'] += 1
+        return mock_data
 
-    # Calculate averages
+    # Per-line aggregates come from the efficiency summary's line grouping set
     line_comparison_rows = []
     for line, data in line_data.items():
-        if data['count'] > 0:
-            avg_efficiency = data['efficiency'] / data['count']
+        if line_targets:
+            target = line_targets.get(line, 0)
         else:
-            avg_efficiency = 0
+            target = round(data['offloading'] * 1.1) if data['offloading'] else 0
+        attendance = line_attendance.get(line)
 
         line_comparison_rows.append({
             'line': line,
             'loading': data['loading'],
             'offloading': data['offloading'],
             'wip': data['loading'] - data['offloading'],
-            'target': round(data['offloading'] * 1.1) if data['offloading'] else 0,
-            'achievementPct': round((data['offloading'] / (data['offloading'] * 1.1)) * 100) if data['offloading'] else 0,
-            'variance': round(data['offloading'] - (data['offloading'] * 1.1)) if data['offloading'] else 0,
-            'variancePct': round(((data['offloading'] - (data['offloading'] * 1.1)) / (data['offloading'] * 1.1)) * 100) if data['offloading'] else 0,
-            'efficiency': round(avg_efficiency),
+            'target': target,
+            'achievementPct': round(data['offloading'] / target * 100) if target else 0,
+            'variance': round(data['offloading'] - target),
+            'variancePct': round((data['offloading'] - target) / target * 100) if target else 0,
+            'efficiency': round(data['efficiency']),
             'defects': round(data['offloading'] * 0.02) if data['offloading'] else 0,
             'defectsPct': 2.0,
-            'breakdownMin': round(line.count('line-') * 5),
-            'activeEmployees': data['employees'],
-            'presentEmployees': round(data['employees'] * 0.94) if data['employees'] else 0,
-            'attendancePct': 94.1
+            'breakdownMin': round(line_breakdowns.get(line, 0)),
+            'activeEmployees': attendance['total'] if attendance else data['employees'],
+            'presentEmployees': attendance['present'] if attendance else 0,
+            'attendancePct': attendance['present_percent'] if attendance else 0
         })
 
     line_comparison_rows.sort(key=lambda x: x['offloading'])  # Ascending order
 
-    # Calculate target data (placeholder - would need LineTarget integration)
-    total_target = round(total_offloading * 1.1) if total_offloading else 0
+    # Planned output from LineTarget; without any targets keep the old 110% placeholder
+    if line_targets:
+        total_target = sum(line_targets.values())
+    else:
+        total_target = round(total_offloading * 1.1) if total_offloading else 0
+    breakdown_minutes = round(sum(line_breakdowns.values()))
+    _, _, _, attendance_pct = summarize_attendance(line_attendance.values())
 
     # Create line trend data for last 30 days - always show last 30 days regardless of filters
-    today = date.today()
     last_30_days = [(today - timedelta(days=i)).isoformat() for i in range(29, -1, -1)]
 
-    # Query last 30 days of data specifically for trends
-    trend_start_date = today - timedelta(days=30)
-    trend_end_date = today
-
-    # Initialize trend data with fallback
-    trend_dict = {}
-
-    try:
-        trend_query = """
-        SELECT
-            DATE(odp_date) as trend_date,
-            SUM(loading_qty) AS total_loading,
-            SUM(unloading_qty) AS total_offloading,
-            AVG(efficiency) AS avg_efficiency,
-            SUM(loading_qty) - SUM(unloading_qty) AS total_wip
-        FROM operator_daily_performance
-        WHERE odp_date >= %s AND odp_date <= %s
-          AND source_connection = ANY(%s)
-          AND shift = ANY(%s)
-          AND oc_description IN ('Loading/Panel Segregation', 'Garment Insert in Poly Bag & Close')
-        GROUP BY DATE(odp_date)
-        ORDER BY DATE(odp_date)
-        """
-
-        with connection.cursor() as cursor:
-            cursor.execute(trend_query, [trend_start_date, trend_end_date, line_filter, shift_filter])
-            trend_results = cursor.fetchall()
-
-        # Convert to dictionary for easy lookup
-        for row in trend_results:
-            date_key = row[0].isoformat() if hasattr(row[0], 'isoformat') else str(row[0])
-            trend_dict[date_key] = {
-                'loading': float(row[1] or 0),
-                'offloading': float(row[2] or 0),
-                'efficiency': float(row[3] or 0),
-                'wip': float(row[4] or 0)
-            }
-    except Exception as e:
-        logger.error(f"Trend query failed: {e}")
-        # Use empty dict - will fallback to mock data below
-
     # Create trend data points for all 30 days with fallback mock data
     line_trend_data = []
     for i, date_str in enumerate(last_30_days):
@@ -457,77 +660,16 @@ def get_dashboard_data(start_date, end_date, line_filter=None, shift_filter=None
     logger.info(f"Trend dict has {len(trend_dict)} entries")
     logger.info(f"Sample trend data: {line_trend_data[:3] if line_trend_data else 'No data'}")
 
-    # Initialize defect variables
-    defect_data = []
-    defect_by_reason = {}
-    defect_by_reason_list = []
-    defect_by_line_list = []
-
-    # Get defect analysis data only if date filters are provided
-    if start_date and end_date:
-        defect_query = """
-        SELECT
-            shift,
-            (qcr_defect_em_key || '-' || ' ' || COALESCE(defect_em_firstname, '-') || ' ' || COALESCE(defect_em_lastname, '-')) AS em_description,
-            qcsc_description as defect_reason,
-            source_connection as line,
-            sum(qcr_defect_quantity) as qcr_defect_quantity
-        FROM quality_control_repair
-        WHERE qcr_date >= %s AND qcr_date <= %s
-          AND source_connection = ANY(%s)
-          AND shift = ANY(%s)
-        GROUP BY shift, em_description, qcsc_description, source_connection
-        ORDER BY source_connection
-        """
+    # Defect totals by reason and line come from the defect query's grouping sets
+    defect_by_reason_list = [
+        {'reason': reason, 'quantity': qty, 'percentage': round(qty / total_defects * 100, 1) if total_defects else 0}
+        for reason, qty in defects['by_reason']
+    ]
 
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute(defect_query, [start_date, end_date, line_filter, shift_filter])
-                defect_results = cursor.fetchall()
-                logger.info(f"Defect query returned {len(defect_results)} records")
-
-                for row in defect_results:
-                    defect_data.append({
-                        'shift': row[0],
-                        'employee': row[1],
-                        'defect_reason': row[2],
-                        'line': row[3],
-                        'quantity': int(row[4] or 0)
-                    })
-
-            # Aggregate defect data by reason and line
-            defect_by_reason = {}
-            defect_by_line = {}
-
-            for defect in defect_data:
-                # By reason
-                reason = defect['defect_reason'] or 'Unknown'
-                if reason not in defect_by_reason:
-                    defect_by_reason[reason] = 0
-                defect_by_reason[reason] += defect['quantity']
-
-                # By line
-                line = defect['line'] or 'Unknown'
-                if line not in defect_by_line:
-                    defect_by_line[line] = 0
-                defect_by_line[line] += defect['quantity']
-
-            # Convert to lists for frontend
-            defect_by_reason_list = [
-                {'reason': reason, 'quantity': qty, 'percentage': round(qty / sum(defect_by_reason.values()) * 100, 1) if defect_by_reason else 0}
-                for reason, qty in sorted(defect_by_reason.items(), key=lambda x: x[1], reverse=True)
-            ]
-
-            defect_by_line_list = [
-                {'line': line, 'quantity': qty}
-                for line, qty in sorted(defect_by_line.items(), key=lambda x: x[1], reverse=True)
-            ]
-
-        except Exception as e:
-            logger.error(f"Defect query error: {e}")
-            defect_data = []
-            defect_by_reason_list = []
-            defect_by_line_list = []
+    defect_by_line_list = [
+        {'line': line, 'quantity': qty}
+        for line, qty in defects['by_line']
+    ]
 
     # Create pie chart data with fallbacks
     # Production Distribution
@@ -610,10 +752,10 @@ def get_dashboard_data(start_date, end_date, line_filter=None, shift_filter=None
             'variance': total_offloading - total_target,
             'variancePct': round(((total_offloading - total_target) / total_target * 100) if total_target else 0, 2),
             'achievementPct': round((total_offloading / total_target * 100) if total_target else 0, 2),
-            'breakdownTimeMin': 0,  # Would need Breakdown model integration
+            'breakdownTimeMin': breakdown_minutes,
             'efficiency': round(avg_efficiency, 1),
             'activeLines': active_lines,
-            'attendancePct': 94.1,
+            'attendancePct': attendance_pct,
         },
         'summaryCards': [
             {'key': 'loading', 'title': 'Total Loading', 'value': "{:,}".format(total_loading), 'iconClass': 'icon-boxes', 'tone': 'neutral', 'footnote': 'Pieces loaded'},
@@ -623,23 +765,23 @@ def get_dashboard_data(start_date, end_date, line_filter=None, shift_filter=None
             {'key': 'variance', 'title': 'Variance', 'value': "{:+,}/{:+.1f}%".format(total_offloading - total_target, ((total_offloading - total_target) / total_target * 100) if total_target else 0), 'iconClass': 'icon-trending-up', 'tone': 'positive' if total_offloading >= total_target else 'negative', 'footnote': 'Actual vs target'},
             {'key': 'achievement', 'title': 'Achievement %', 'value': "{:.1f}%".format((total_offloading / total_target * 100) if total_target else 0), 'iconClass': 'icon-award', 'tone': 'positive' if total_offloading >= total_target else 'negative', 'footnote': 'Attainment'},
             {'key': 'efficiency', 'title': 'Efficiency', 'value': "{:.1f}%".format(avg_efficiency), 'iconClass': 'icon-gauge', 'tone': 'positive', 'footnote': 'Average line efficiency'},
-            {'key': 'attendance', 'title': 'Attendance %', 'value': '94.1%', 'iconClass': 'icon-users', 'tone': 'positive', 'footnote': 'Present vs active'},
-            {'key': 'breakdown', 'title': 'Breakdown Time', 'value': "0 min", 'iconClass': 'icon-clock-alert', 'tone': 'neutral', 'footnote': 'Downtime minutes'},
-            {'key': 'defects', 'title': 'Total Defects', 'value': "{}".format(sum(defect_by_reason.values()) if defect_by_reason else 0), 'iconClass': 'icon-bug', 'tone': 'neutral', 'footnote': 'Quality issues'},
+            {'key': 'attendance', 'title': 'Attendance %', 'value': "{:.1f}%".format(attendance_pct), 'iconClass': 'icon-users', 'tone': 'positive', 'footnote': 'Present vs active'},
+            {'key': 'breakdown', 'title': 'Breakdown Time', 'value': "{:,} min".format(breakdown_minutes), 'iconClass': 'icon-clock-alert', 'tone': 'neutral', 'footnote': 'Downtime minutes'},
+            {'key': 'defects', 'title': 'Total Defects', 'value': "{}".format(total_defects), 'iconClass': 'icon-bug', 'tone': 'neutral', 'footnote': 'Quality issues'},
             {'key': 'lines', 'title': 'Active Lines', 'value': "{}".format(active_lines), 'iconClass': 'icon-factory', 'tone': 'neutral', 'footnote': 'Running lines'},
             {'key': 'workforce', 'title': 'Total Workforce', 'value': "{:,}".format(total_employees), 'iconClass': 'icon-users', 'tone': 'neutral', 'footnote': 'Active employees'},
         ],
         'lineComparisonRows': line_comparison_rows,
-        'dateWiseEfficiency': date_wise_data,  # Add the detailed date-wise data
+        'dateWiseEfficiency': date_wise_data,  # First page of the detailed date-wise data
+        'dateWiseEfficiencyNextCursor': efficiency_page['nextCursor'],  # see get_date_wise_efficiency_page
         'pieCharts': pie_charts,  # Add pie chart data
         'lineTrendData': line_trend_data,  # Add 30-day trend data
         'defectAnalysis': {
             'defectsByReason': defect_by_reason_list,
             'defectsByLine': defect_by_line_list,
-            'totalDefects': sum(defect_by_reason.values()) if defect_by_reason else 0,
+            'totalDefects': total_defects,
             'defectRecords': defect_data[:50]  # Top 50 defect records
         }
     }
 
-    # Convert all Decimal objects to JSON-serializable types
-    return convert_decimals(result)
+    return result
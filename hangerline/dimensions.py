@@ -0,0 +1,123 @@
+"""
+Process-local cache of the small dimension tables: Color, Size and Style.
+
+Each table is loaded whole on first use and kept as {key: instance}.
+get_or_create() only touches the database on a miss, and
+get_or_create_many() resolves a set of keys with at most one bulk_create,
+for the bulk paths (line_targets.fetch_loading_details, the import commands).
+
+The version of a table is a checksum of its rows computed by the database,
+so every process sees the same version whatever the cache backend, and
+changes made without signals (bulk_create, admin actions, the ETL) count too.
+Each process compares it at most every HANGERLINE_DIMENSION_CACHE_CHECK_SECONDS
+and reloads the table when it differs. Saves and deletes in this process
+(signals.py) are applied to the local copy straight away.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Color, Size, Style
+
+
+class DimensionCache:
+    """{key: instance} for one dimension model, reloaded when its version changes"""
+
+    def __init__(self, model, defaults):
+        self.model = model
+        self.key_field = model._meta.pk.name
+        self.defaults = defaults
+        self._rows = None
+        self._version = None
+        self._checked_at = 0
+        self._lock = threading.RLock()
+
+    def _table_version(self):
+        """Checksum of the table's rows; the tables are small enough to hash whole"""
+        quote = connection.ops.quote_name
+        table, key = quote(self.model._meta.db_table), quote(self.model._meta.pk.column)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT COUNT(*), md5(COALESCE(string_agg(t::text, '|' ORDER BY t.{key}), '')) FROM {table} t"
+            )
+            return cursor.fetchone()
+
+    def _current_rows(self):
+        with self._lock:
+            now = time.monotonic()
+            check_seconds = getattr(settings, 'HANGERLINE_DIMENSION_CACHE_CHECK_SECONDS', 5)
+            if self._rows is not None and now - self._checked_at < check_seconds:
+                return self._rows
+
+            version = self._table_version()
+            if self._rows is None or version != self._version:
+                self._rows = self.model.objects.in_bulk()
+                self._version = version
+            self._checked_at = now
+            return self._rows
+
+    def get(self, key):
+        """Instance for key, None if it does not exist"""
+        if not key:
+            return None
+        return self._current_rows().get(key)
+
+    def all(self):
+        """{key: instance} for the whole table"""
+        return dict(self._current_rows())
+
+    def get_or_create(self, key, defaults=None):
+        """(instance, created) like QuerySet.get_or_create, querying only when key is not cached"""
+        instance = self.get(key)
+        if instance is not None:
+            return instance, False
+        instance, created = self.model.objects.get_or_create(
+            **{self.key_field: key},
+            defaults=self.defaults(key) if defaults is None else defaults,
+        )
+        if not created:
+            # Created rows arrive through the post_save signal
+            self.put(instance)
+        return instance, created
+
+    def get_or_create_many(self, keys):
+        """{key: instance} for keys, creating the missing ones with one bulk_create"""
+        keys = {key for key in keys if key}
+        rows = self._current_rows()
+        missing = keys - rows.keys()
+        if missing:
+            self.model.objects.bulk_create(
+                [self.model(**{self.key_field: key, **self.defaults(key)}) for key in missing],
+                ignore_conflicts=True,
+            )
+            # bulk_create sends no signals, and conflicting rows may come from another process
+            self.invalidate()
+            rows = self._current_rows()
+        return {key: rows[key] for key in keys if key in rows}
+
+    def put(self, instance):
+        """Store a saved instance locally; other processes reload on their next version check"""
+        with self._lock:
+            if self._rows is not None:
+                self._rows[instance.pk] = instance
+
+    def discard(self, instance):
+        """Drop a deleted instance locally; other processes reload on their next version check"""
+        with self._lock:
+            if self._rows is not None:
+                self._rows.pop(instance.pk, None)
+
+    def invalidate(self):
+        """Reload on next use in this process"""
+        with self._lock:
+            self._rows = None
+
+
+colors = DimensionCache(Color, lambda key: {'cm_description': key, 'cm_short_description': key})
+sizes = DimensionCache(Size, lambda key: {'sm_description': key})
+styles = DimensionCache(Style, lambda key: {'style_description': key})
+
+DIMENSION_CACHES = {dimension.model: dimension for dimension in (colors, sizes, styles)}
@@ -0,0 +1,99 @@
+"""
+Fast JSON encoding for the dashboard payloads.
+
+Uses msgspec when it is installed and falls back to the standard library with
+DjangoJSONEncoder otherwise. Payloads are expected to hold plain Python types
+(the dashboard queries cast to float8/int in SQL), so no recursive clean-up
+pass is needed before encoding.
+
+dashboard_json_response() streams a large page the client asked for with
+?limit= (the efficiency endpoint's results) in chunks once it grows past the
+stream threshold. Responses are always bounded by the page size cap.
+"""
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Rows per chunk when streaming a large page
+STREAM_CHUNK_SIZE = 250
+# Pages longer than this are streamed by dashboard_json_response(); below
+# HANGERLINE_EFFICIENCY_MAX_PAGE_SIZE so a requested large page can reach it
+STREAM_THRESHOLD = 500
+
+if msgspec is not None:
+    _encoder = msgspec.json.Encoder(decimal_format='number')
+
+    def dumps(data):
+        """Encode data to JSON bytes"""
+        return _encoder.encode(data)
+else:
+    def dumps(data):
+        """Encode data to JSON bytes"""
+        return json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+
+
+class FastJsonResponse(HttpResponse):
+    """JsonResponse equivalent that encodes with dumps()"""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
+
+
+def _stream_dict(data, stream_key):
+    items = list(data.items())
+    yield b'{'
+    for index, (key, value) in enumerate(items):
+        if index:
+            yield b','
+        yield dumps(key) + b':'
+        if key != stream_key or not isinstance(value, list):
+            yield dumps(value)
+            continue
+
+        yield b'['
+        for start in range(0, len(value), STREAM_CHUNK_SIZE):
+            if start:
+                yield b','
+            # Strip the brackets of each encoded chunk so the chunks form one list
+            yield dumps(value[start:start + STREAM_CHUNK_SIZE])[1:-1]
+        yield b']'
+    yield b'}'
+
+
+class StreamingJsonResponse(StreamingHttpResponse):
+    """
+    Stream a dict as JSON, encoding the (large) list under stream_key in
+    chunks so the whole document is never held as one string.
+    """
+
+    def __init__(self, data, stream_key, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(streaming_content=_stream_dict(data, stream_key), **kwargs)
+
+
+def dashboard_json_response(data, stream_key='results', stream_threshold=STREAM_THRESHOLD, **kwargs):
+    """FastJsonResponse, or StreamingJsonResponse when data[stream_key] has more than stream_threshold rows"""
+    rows = data.get(stream_key) if isinstance(data, dict) else None
+    if isinstance(rows, list) and len(rows) > stream_threshold:
+        return StreamingJsonResponse(data, stream_key, **kwargs)
+    return FastJsonResponse(data, **kwargs)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """DRF renderer using dumps() for plain (non-indented) responses"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
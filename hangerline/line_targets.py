@@ -0,0 +1,219 @@
+"""
+Line target maintenance.
+
+LineTarget.total_target_qty follows its details' target_qty. The
+LineTargetDetail signals hand each change to record_detail_change(), which
+applies it as a delta (old vs new target_qty) with a single UPDATE instead of
+re-summing the details. Inside deferred_line_target_totals() (admin inline
+saves, bulk deletes) the deltas are coalesced per LineTarget and applied once
+on commit.
+
+fetch_loading_details() replaces a LineTarget's details with the day's
+Loadinginformation rows in bulk: client POs are loaded once into a dict,
+colors and sizes come from the dimension cache, the details are inserted with
+one bulk_create and the target totals are recomputed once at the end.
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager
+import threading
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .dimensions import colors, sizes
+from .models import ClientPurchaseOrder, LineTarget, LineTargetDetail, Loadinginformation
+
+SHIFTS = ['Day', 'Night']
+
+_local = threading.local()
+
+# Snapshot value of a target_qty that was deferred when the detail was loaded
+UNKNOWN_QTY = object()
+
+
+class _TotalsBatch:
+    """Line target total changes collected by deferred_line_target_totals()"""
+
+    def __init__(self):
+        self.deltas = defaultdict(int)
+        self.recompute = set()
+        self.skipped = set()
+
+    def add(self, line_target_id, delta):
+        if line_target_id is not None and delta:
+            self.deltas[line_target_id] += delta
+
+    def mark_dirty(self, line_target_id):
+        if line_target_id is not None:
+            self.recompute.add(line_target_id)
+
+    def skip(self, line_target_id):
+        """Leave line_target_id alone, the caller sets its totals itself"""
+        self.skipped.add(line_target_id)
+
+    def apply(self):
+        recompute = self.recompute - self.skipped
+        if recompute:
+            _recompute_totals(recompute)
+        for line_target_id, delta in self.deltas.items():
+            if delta and line_target_id not in recompute and line_target_id not in self.skipped:
+                _apply_delta(line_target_id, delta)
+
+
+def _recompute_totals(line_target_ids):
+    """Re-sum target_qty for the given line targets in one UPDATE"""
+    detail_total = LineTargetDetail.objects.filter(
+        linetarget=OuterRef('pk'),
+    ).order_by().values('linetarget').annotate(total=Sum('target_qty')).values('total')
+    LineTarget.objects.filter(pk__in=line_target_ids).update(
+        total_target_qty=Coalesce(Subquery(detail_total), 0),
+        updated_at=timezone.now(),
+    )
+
+
+def _apply_delta(line_target_id, delta):
+    LineTarget.objects.filter(pk=line_target_id).update(
+        total_target_qty=F('total_target_qty') + delta,
+        updated_at=timezone.now(),
+    )
+
+
+@contextmanager
+def deferred_line_target_totals():
+    """
+    Collect LineTargetDetail changes made inside the block and update each
+    affected LineTarget once when the transaction commits (immediately in
+    autocommit). Nested blocks join the outermost one; an exception discards
+    the collected changes. Also usable as a view/method decorator.
+    """
+    batch = getattr(_local, 'batch', None)
+    if batch is not None:
+        yield batch
+        return
+
+    batch = _local.batch = _TotalsBatch()
+    try:
+        yield batch
+    finally:
+        _local.batch = None
+    transaction.on_commit(batch.apply)
+
+
+def record_detail_change(instance, deleted=False):
+    """
+    Account for a saved or deleted LineTargetDetail: the target_qty change is
+    applied as a delta to its LineTarget (and to the previous one if the
+    detail moved), or a full re-sum when the previous value is unknown.
+    Deferred to the enclosing deferred_line_target_totals() block, if any.
+    """
+    batch = getattr(_local, 'batch', None)
+    immediate = batch is None
+    if immediate:
+        batch = _TotalsBatch()
+
+    original = getattr(instance, '_original_totals', None)
+    known = original is not None and original[1] is not UNKNOWN_QTY and 'target_qty' in instance.__dict__
+    if deleted and known:
+        batch.add(original[0], -(original[1] or 0))
+    elif deleted:
+        batch.mark_dirty(original[0] if original is not None else instance.linetarget_id)
+    elif not known:
+        batch.mark_dirty(instance.linetarget_id)
+        if original is not None:
+            batch.mark_dirty(original[0])
+    else:
+        batch.add(original[0], -(original[1] or 0))
+        batch.add(instance.linetarget_id, instance.target_qty or 0)
+        remember_detail_totals(instance)
+
+    if immediate:
+        batch.apply()
+
+
+def remember_detail_totals(instance, created=False):
+    """
+    Snapshot (linetarget_id, target_qty) so the next save can be applied as a
+    delta; target_qty is UNKNOWN_QTY when it was not loaded.
+    """
+    if created:
+        instance._original_totals = (instance.linetarget_id, 0)
+    elif 'linetarget_id' in instance.__dict__:
+        instance._original_totals = (instance.linetarget_id, instance.__dict__.get('target_qty', UNKNOWN_QTY))
+
+
+def update_line_target_totals(line_target, include_loading=False):
+    """Set total_target_qty (and loading_qty if include_loading) to the sum of the details' target_qty"""
+    total_qty = LineTargetDetail.objects.filter(linetarget=line_target).aggregate(
+        total=Sum('target_qty')
+    )['total'] or 0
+
+    line_target.total_target_qty = total_qty
+    update_fields = ['total_target_qty', 'updated_at']
+    if include_loading:
+        line_target.loading_qty = total_qty
+        update_fields.append('loading_qty')
+    line_target.save(update_fields=update_fields)
+    return total_qty
+
+
+def fetch_loading_details(line_target):
+    """
+    Replace line_target's details with one detail per shift for each of the
+    day's Loadinginformation rows on its line. Returns (loading rows, details created).
+    """
+    loading_rows = list(
+        Loadinginformation.objects.filter(
+            dated__date=line_target.target_date,
+            line_desc=line_target.source_connection,
+        ).exclude(pono__isnull=True).exclude(pono='')
+    )
+
+    # Client PO lines matching the loading rows, keyed like LineTargetDetail.save() looks them up
+    purchase_orders = {}
+    for cpo in ClientPurchaseOrder.objects.filter(pono__in={row.pono for row in loading_rows}):
+        purchase_orders.setdefault((cpo.pono, cpo.item_id), cpo)
+
+    matched = [purchase_orders.get((row.pono, row.item_id)) for row in loading_rows]
+    color_map = colors.get_or_create_many({cpo.mcolour for cpo in matched if cpo})
+    size_map = sizes.get_or_create_many({cpo.itemsize for cpo in matched if cpo})
+
+    details = []
+    for row, cpo in zip(loading_rows, matched):
+        values = {
+            'linetarget': line_target,
+            'cpo_id': cpo,
+            'pono': row.pono,
+            'articleno': row.fg_articleno or '',
+            'item_id': row.item_id or '',
+            'item_title': row.title or '',
+            'model': row.model,
+            'barcode': row.barcode,
+            'scrvoucher_no': row.id,
+            'bundleno': row.bundleno or 0,
+            'target_qty': int(row.qty or 0),
+        }
+        # Same derivation as LineTargetDetail.save(), which bulk_create bypasses
+        if cpo:
+            values.update({
+                'articleno': cpo.articleno,
+                'item_id': cpo.item_id,
+                'item_title': cpo.item_title,
+                'pono': cpo.pono,
+                'color': color_map.get(cpo.mcolour),
+                'size': size_map.get(cpo.itemsize),
+            })
+        if values['articleno'] and values.get('color') and values.get('size'):
+            values['item_id'] = f"{values['articleno']} - {values['color'].cm_key} - {values['size'].sm_key}"
+
+        details.extend(LineTargetDetail(shift=shift, **values) for shift in SHIFTS)
+
+    with transaction.atomic(), deferred_line_target_totals() as batch:
+        batch.skip(line_target.pk)
+        LineTargetDetail.objects.filter(linetarget=line_target).delete()
+        LineTargetDetail.objects.bulk_create(details)
+        update_line_target_totals(line_target, include_loading=True)
+
+    return len(loading_rows), len(details)
@@ -3,7 +3,7 @@ Django management command to import colors data.
 Usage: python manage.py import_colors
 """
 from django.core.management.base import BaseCommand
-from hangerline.models import Color
+from hangerline.dimensions import colors
 
 
 class Command(BaseCommand):
@@ -153,8 +153,8 @@ class Command(BaseCommand):
             cm_description = cm_description.strip() if cm_description else ''
 
             # Try to get or create the color
-            obj, created = Color.objects.get_or_create(
-                cm_key=cm_key,
+            obj, created = colors.get_or_create(
+                cm_key,
                 defaults={
                     'cm_short_description': cm_short_description,
                     'cm_description': cm_description
@@ -3,7 +3,7 @@ Django management command to import sizes data.
 Usage: python manage.py import_sizes
 """
 from django.core.management.base import BaseCommand
-from hangerline.models import Size
+from hangerline.dimensions import sizes
 
 
 class Command(BaseCommand):
@@ -80,8 +80,8 @@ class Command(BaseCommand):
             sm_description = sm_description.strip() if sm_description else ''
 
             # Try to get or create the size
-            obj, created = Size.objects.get_or_create(
-                sm_key=sm_key,
+            obj, created = sizes.get_or_create(
+                sm_key,
                 defaults={'sm_description': sm_description}
             )
 
@@ -3,7 +3,7 @@ Django management command to import styles data.
 Usage: python manage.py import_styles
 """
 from django.core.management.base import BaseCommand
-from hangerline.models import Style
+from hangerline.dimensions import styles
 
 
 class Command(BaseCommand):
@@ -137,8 +137,8 @@ class Command(BaseCommand):
             style_description = style_description.strip() if style_description else ''
 
             # Try to get or create the style
-            obj, created = Style.objects.get_or_create(
-                style_key=style_key,
+            obj, created = styles.get_or_create(
+                style_key,
                 defaults={'style_description': style_description}
             )
 
@@ -0,0 +1,45 @@
+"""
+Django management command to refresh the dashboard rollup tables.
+Usage: python manage.py refresh_rollups [--full] [--line line-21 ...]
+
+Run it right after each ETL load (the dashboard also triggers it lazily), and
+once after deploying: the dashboard only refreshes lines that already have a
+watermark, the first full build of a line happens here.
+"""
+from django.core.management.base import BaseCommand
+from hangerline.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = 'Refresh rollup tables for the days touched since the last ETL extract'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Rebuild every day instead of only the days touched since the last refresh'
+        )
+        parser.add_argument(
+            '--line',
+            action='append',
+            dest='lines',
+            help='Only refresh the given source connection (can be repeated)'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Refreshing rollup tables...")
+
+        refreshed = refresh_rollups(full=options['full'], lines=options['lines'])
+
+        if refreshed is None:
+            self.stdout.write(self.style.WARNING("Another refresh is already running, nothing done"))
+            return
+
+        if not refreshed:
+            self.stdout.write("Rollups already up to date")
+            return
+
+        for line, days in sorted(refreshed.items()):
+            self.stdout.write(self.style.SUCCESS(
+                f"Refreshed {line}: {'all days' if days is None else ', '.join(day.isoformat() for day in days) or 'no days'}"
+            ))
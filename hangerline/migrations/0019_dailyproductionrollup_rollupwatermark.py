@@ -0,0 +1,58 @@
+# Generated by Django 4.2.27 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hangerline', '0018_transfertopacking_alter_linetarget_remarks_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyProductionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('odp_date', models.DateField(verbose_name='Production Date')),
+                ('source_connection', models.CharField(max_length=50, verbose_name='Line')),
+                ('shift', models.CharField(blank=True, max_length=10, null=True)),
+                ('st_id', models.CharField(blank=True, max_length=50, null=True, verbose_name='Style ID')),
+                ('oc_description', models.CharField(blank=True, max_length=100, null=True, verbose_name='Operation')),
+                ('loading_qty', models.BigIntegerField(default=0)),
+                ('unloading_qty', models.BigIntegerField(default=0)),
+                ('odpd_quantity', models.BigIntegerField(default=0)),
+                ('efficiency_sum', models.FloatField(default=0)),
+                ('efficiency_count', models.IntegerField(default=0)),
+                ('record_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Daily Production Rollup',
+                'verbose_name_plural': 'Daily Production Rollups',
+                'db_table': 'daily_production_rollup',
+                'managed': True,
+                'unique_together': {('odp_date', 'source_connection', 'shift', 'st_id', 'oc_description')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='dailyproductionrollup',
+            index=models.Index(fields=['odp_date', 'source_connection'], name='dpr_date_line_idx'),
+        ),
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rollup', models.CharField(max_length=50)),
+                ('source_connection', models.CharField(max_length=255)),
+                ('last_extract_datetime', models.DateTimeField(blank=True, null=True)),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Rollup Watermark',
+                'verbose_name_plural': 'Rollup Watermarks',
+                'db_table': 'rollup_watermark',
+                'managed': True,
+                'unique_together': {('rollup', 'source_connection')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.27 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hangerline', '0019_dailyproductionrollup_rollupwatermark'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rollupwatermark',
+            name='source_signature',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.CreateModel(
+            name='ArticleSmv',
+            fields=[
+                ('articleno', models.TextField(primary_key=True, serialize=False, verbose_name='Article No')),
+                ('totalsmv', models.FloatField(blank=True, null=True, verbose_name='Total SMV')),
+                ('conversionfactor', models.FloatField(blank=True, null=True, verbose_name='Conversion Factor')),
+                ('applicabledate', models.DateTimeField(blank=True, null=True, verbose_name='Applicable Date')),
+            ],
+            options={
+                'verbose_name': 'Article SMV',
+                'verbose_name_plural': 'Article SMVs',
+                'db_table': 'article_smv',
+                'managed': True,
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.27 on 2026-10-18 10:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hangerline', '0020_rollupwatermark_source_signature_articlesmv'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyproductionrollup',
+            name='style_prefix',
+            field=models.CharField(blank=True, max_length=50, null=True, verbose_name='Article No'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyproductionrollup',
+            index=models.Index(fields=['style_prefix'], name='dpr_style_prefix_idx'),
+        ),
+        migrations.RunSQL(
+            """
+            -- Backfill style_prefix for rows rolled up before the column existed
+            UPDATE daily_production_rollup
+            SET style_prefix = REGEXP_REPLACE(st_id, '[-_].*', '')
+            WHERE st_id IS NOT NULL AND style_prefix IS NULL;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
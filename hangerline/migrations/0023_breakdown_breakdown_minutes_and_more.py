@@ -0,0 +1,47 @@
+# Generated by Django 4.2.27 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hangerline', '0022_linetarget_updated_at_breakdown_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='breakdown',
+            name='breakdown_minutes',
+            field=models.FloatField(default=0, editable=False, verbose_name='Breakdown Time (mins)'),
+        ),
+        migrations.AddIndex(
+            model_name='breakdown',
+            index=models.Index(fields=['p_date', 'line_no'], name='breakdown_date_line_idx'),
+        ),
+        migrations.RunSQL(
+            """
+            -- Keep the stored duration in step with time_start / time_end for every
+            -- write, including QuerySet.update(), bulk_create() and raw SQL.
+            CREATE OR REPLACE FUNCTION breakdown_set_minutes() RETURNS trigger AS $$
+            BEGIN
+                NEW.breakdown_minutes := COALESCE(EXTRACT(EPOCH FROM (NEW.time_end - NEW.time_start)) / 60, 0);
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER breakdown_set_minutes
+                BEFORE INSERT OR UPDATE ON breakdown
+                FOR EACH ROW EXECUTE FUNCTION breakdown_set_minutes();
+
+            -- Backfill the stored duration for existing breakdowns
+            UPDATE breakdown
+            SET breakdown_minutes = EXTRACT(EPOCH FROM (time_end - time_start)) / 60
+            WHERE time_start IS NOT NULL AND time_end IS NOT NULL;
+            """,
+            reverse_sql="""
+            DROP TRIGGER IF EXISTS breakdown_set_minutes ON breakdown;
+            DROP FUNCTION IF EXISTS breakdown_set_minutes();
+            """,
+        ),
+    ]
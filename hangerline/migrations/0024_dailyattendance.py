@@ -0,0 +1,38 @@
+# Generated by Django 4.2.27 on 2026-10-18 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hangerline', '0023_breakdown_breakdown_minutes_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('odp_date', models.DateField(verbose_name='Date')),
+                ('source_connection', models.CharField(max_length=50, verbose_name='Line')),
+                ('odp_em_key', models.IntegerField(verbose_name='Employee')),
+                ('shift', models.CharField(blank=True, max_length=10, null=True)),
+                ('first_hanger_time', models.DateTimeField(blank=True, null=True)),
+                ('last_hanger_time', models.DateTimeField(blank=True, null=True)),
+                ('worked_minutes', models.FloatField(default=0, verbose_name='Minutes')),
+                ('record_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Daily Attendance',
+                'verbose_name_plural': 'Daily Attendance',
+                'db_table': 'daily_attendance',
+                'managed': True,
+                'unique_together': {('odp_date', 'source_connection', 'odp_em_key')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='dailyattendance',
+            index=models.Index(fields=['odp_date', 'odp_em_key'], name='da_date_employee_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.27 on 2026-10-18 13:55
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and keeps the
+    # ETL able to write to the tables while the indexes build.
+    atomic = False
+
+    dependencies = [
+        ('hangerline', '0024_dailyattendance'),
+    ]
+
+    operations = [
+        # Lookup indexes for the PO progress query on the ETL-loaded tables
+        migrations.RunSQL(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS odp_lot_date_offloaded_idx
+                ON operator_daily_performance (odpd_lot_number, odp_date)
+                WHERE unloading_qty > 0;
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS odp_lot_date_offloaded_idx;",
+        ),
+        migrations.RunSQL(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ttp_pono_proddate_idx
+                ON transfertopacking (pono, proddate);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS ttp_pono_proddate_idx;",
+        ),
+        migrations.RunSQL(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS cpo_pono_idx
+                ON clientpurchaseorder (pono);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS cpo_pono_idx;",
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.27 on 2026-10-18 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hangerline', '0025_po_progress_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rollupwatermark',
+            name='last_seen_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='PoProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pono', models.CharField(max_length=100, unique=True, verbose_name='PO No')),
+                ('po_start_date', models.DateTimeField(blank=True, null=True, verbose_name='PO Start Date')),
+                ('since_date', models.DateField(verbose_name='Counted Since')),
+                ('po_qty', models.BigIntegerField(default=0, verbose_name='PO Qty')),
+                ('produced_qty', models.BigIntegerField(default=0, verbose_name='Produced')),
+                ('transferred_qty', models.BigIntegerField(default=0, verbose_name='Transferred')),
+                ('in_hand_qty', models.BigIntegerField(default=0, verbose_name='In Hand Sewing')),
+                ('last_activity_date', models.DateField(blank=True, null=True, verbose_name='Last Activity')),
+                ('updated_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'PO Progress',
+                'verbose_name_plural': 'PO Progress',
+                'db_table': 'po_progress',
+                'ordering': ['pono'],
+                'managed': True,
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.27 on 2026-10-18 15:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and keeps the
+    # ETL able to write to the tables while the indexes build.
+    atomic = False
+
+    dependencies = [
+        ('hangerline', '0026_rollupwatermark_last_seen_id_poprogress'),
+    ]
+
+    operations = [
+        # (date, id) indexes backing the keyset pagination of the production and QC admins
+        migrations.RunSQL(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS odp_date_id_idx
+                ON operator_daily_performance (odp_date, id);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS odp_date_id_idx;",
+        ),
+        migrations.RunSQL(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS qcr_date_id_idx
+                ON quality_control_repair (qcr_date, id);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS qcr_date_id_idx;",
+        ),
+    ]
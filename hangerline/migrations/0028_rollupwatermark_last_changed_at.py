@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hangerline', '0027_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rollupwatermark',
+            name='last_changed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
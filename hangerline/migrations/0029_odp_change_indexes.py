@@ -0,0 +1,31 @@
+# Generated by Django 4.2.27 on 2026-10-18 16:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and keeps the
+    # ETL able to write to the tables while the indexes build.
+    atomic = False
+
+    dependencies = [
+        ('hangerline', '0028_rollupwatermark_last_changed_at'),
+    ]
+
+    operations = [
+        # Change detection for the rollup refresh (hangerline.rollups.ODP_CHANGED_AT)
+        migrations.RunSQL(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS odp_line_id_idx
+                ON operator_daily_performance (source_connection, id);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS odp_line_id_idx;",
+        ),
+        migrations.RunSQL(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS odp_line_changed_at_idx
+                ON operator_daily_performance (source_connection, (GREATEST(created_at, odpd_edited_date)));
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS odp_line_changed_at_idx;",
+        ),
+    ]
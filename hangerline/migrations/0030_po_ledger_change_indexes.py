@@ -0,0 +1,31 @@
+# Generated by Django 4.2.27 on 2026-10-18 16:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and keeps the
+    # ETL able to write to the tables while the indexes build.
+    atomic = False
+
+    dependencies = [
+        ('hangerline', '0029_odp_change_indexes'),
+    ]
+
+    operations = [
+        # Touched-PO detection for the PO ledger (hangerline.rollups.refresh_po_ledger)
+        migrations.RunSQL(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS odp_changed_at_idx
+                ON operator_daily_performance ((GREATEST(created_at, odpd_edited_date)));
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS odp_changed_at_idx;",
+        ),
+        migrations.RunSQL(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ttp_dated_idx
+                ON transfertopacking (dated);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS ttp_dated_idx;",
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.27 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hangerline', '0030_po_ledger_change_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupDayStamp',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rollup', models.CharField(max_length=50)),
+                ('source_connection', models.CharField(max_length=255)),
+                ('day', models.DateField()),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Rollup Day Stamp',
+                'verbose_name_plural': 'Rollup Day Stamps',
+                'db_table': 'rollup_day_stamp',
+                'managed': True,
+                'unique_together': {('rollup', 'source_connection', 'day')},
+            },
+        ),
+    ]
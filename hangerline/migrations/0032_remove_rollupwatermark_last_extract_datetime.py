@@ -0,0 +1,17 @@
+# Generated by Django 4.2.27 on 2026-10-18 18:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hangerline', '0031_rollupdaystamp'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='rollupwatermark',
+            name='last_extract_datetime',
+        ),
+    ]
@@ -362,6 +362,7 @@ class LineTarget(models.Model):
     total_target_qty = models.IntegerField(default=0, verbose_name='Total Target Quantity')
     loading_qty = models.IntegerField(default=0, verbose_name='DTS Quantity')
     remarks = models.CharField(max_length=500, blank=True, null=True, verbose_name='Remarks')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated At')
 
     class Meta:
         managed = True
@@ -404,6 +405,15 @@ class LineTargetDetail(models.Model):
         verbose_name_plural = 'Line Target Details'
         ordering = ['linetarget', 'pono', 'articleno', 'color__cm_key', 'size__sm_key']
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Keep the stored linetarget and target_qty so a later save can be applied as a delta;
+        # instances built in Python have no stored values, so their changes are re-summed
+        from .line_targets import remember_detail_totals
+        remember_detail_totals(instance)
+        return instance
+
     def save(self, *args, **kwargs):
         if self.cpo_id:
             self.articleno = self.cpo_id.articleno
@@ -411,18 +421,11 @@ class LineTargetDetail(models.Model):
             self.item_title = self.cpo_id.item_title
             self.pono = self.cpo_id.pono
             # Set color and size from ClientPurchaseOrder
+            from .dimensions import colors, sizes
             if self.cpo_id.mcolour:
-                color_obj, created = Color.objects.get_or_create(
-                    cm_key=self.cpo_id.mcolour,
-                    defaults={'cm_description': self.cpo_id.mcolour, 'cm_short_description': self.cpo_id.mcolour}
-                )
-                self.color = color_obj
+                self.color, created = colors.get_or_create(self.cpo_id.mcolour)
             if self.cpo_id.itemsize:
-                size_obj, created = Size.objects.get_or_create(
-                    sm_key=self.cpo_id.itemsize,
-                    defaults={'sm_description': self.cpo_id.itemsize}
-                )
-                self.size = size_obj
+                self.size, created = sizes.get_or_create(self.cpo_id.itemsize)
         if self.articleno and self.color and self.size:
             self.item_id = f"{self.articleno} - {self.color.cm_key} - {self.size.sm_key}"
         super().save(*args, **kwargs)
@@ -518,6 +521,10 @@ class Breakdown(models.Model):
     time_end = models.DateTimeField(verbose_name='End Time')
     operator_effected = models.IntegerField(default=0, verbose_name='Operators Affected')
     loss_minutes = models.IntegerField(default=0, verbose_name='Loss Minutes')
+    # Stored so the database can aggregate and sort on the duration; set from
+    # time_start / time_end by the breakdown_set_minutes trigger (migration 0023)
+    breakdown_minutes = models.FloatField(default=0, editable=False, verbose_name='Breakdown Time (mins)')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated At')
 
     class Meta:
         managed = True
@@ -525,6 +532,9 @@ class Breakdown(models.Model):
         verbose_name = 'Breakdown'
         verbose_name_plural = 'Breakdowns'
         ordering = ['-p_date', '-time_start']
+        indexes = [
+            models.Index(fields=['p_date', 'line_no'], name='breakdown_date_line_idx'),
+        ]
 
     def __str__(self):
         return f"{self.line_no} - {self.p_date} - {self.breakdown_category}"
@@ -536,3 +546,159 @@ class Breakdown(models.Model):
             diff = self.time_end - self.time_start
             return diff.total_seconds() / 60
         return 0
+
+    def save(self, *args, **kwargs):
+        # The trigger writes the stored value; mirror it on the instance
+        self.breakdown_minutes = self.breakdown_time_minutes
+        super().save(*args, **kwargs)
+
+
+class DailyProductionRollup(models.Model):
+    """Pre-aggregated operator_daily_performance totals, one row per
+    (odp_date, source_connection, shift, st_id, oc_description).
+    style_prefix is the st_id article part, stored so SMV lookups are an indexed equi-join.
+    Maintained by hangerline.rollups.refresh_rollups()."""
+    odp_date = models.DateField(verbose_name='Production Date')
+    source_connection = models.CharField(max_length=50, verbose_name='Line')
+    shift = models.CharField(max_length=10, blank=True, null=True)
+    st_id = models.CharField(max_length=50, blank=True, null=True, verbose_name='Style ID')
+    style_prefix = models.CharField(max_length=50, blank=True, null=True, verbose_name='Article No')
+    oc_description = models.CharField(max_length=100, blank=True, null=True, verbose_name='Operation')
+    loading_qty = models.BigIntegerField(default=0)
+    unloading_qty = models.BigIntegerField(default=0)
+    odpd_quantity = models.BigIntegerField(default=0)
+    efficiency_sum = models.FloatField(default=0)
+    efficiency_count = models.IntegerField(default=0)
+    record_count = models.IntegerField(default=0)
+
+    class Meta:
+        managed = True
+        db_table = 'daily_production_rollup'
+        verbose_name = 'Daily Production Rollup'
+        verbose_name_plural = 'Daily Production Rollups'
+        unique_together = (('odp_date', 'source_connection', 'shift', 'st_id', 'oc_description'),)
+        indexes = [
+            models.Index(fields=['odp_date', 'source_connection'], name='dpr_date_line_idx'),
+            models.Index(fields=['style_prefix'], name='dpr_style_prefix_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.source_connection} - {self.odp_date} - {self.shift} - {self.st_id}"
+
+
+class DailyAttendance(models.Model):
+    """Daily presence snapshot from operator_daily_performance, one row per
+    (odp_date, source_connection, employee) with the first/last hanger times.
+    Maintained by hangerline.rollups.refresh_rollups()."""
+    odp_date = models.DateField(verbose_name='Date')
+    source_connection = models.CharField(max_length=50, verbose_name='Line')
+    odp_em_key = models.IntegerField(verbose_name='Employee')
+    shift = models.CharField(max_length=10, blank=True, null=True)
+    first_hanger_time = models.DateTimeField(blank=True, null=True)
+    last_hanger_time = models.DateTimeField(blank=True, null=True)
+    worked_minutes = models.FloatField(default=0, verbose_name='Minutes')
+    record_count = models.IntegerField(default=0)
+
+    class Meta:
+        managed = True
+        db_table = 'daily_attendance'
+        verbose_name = 'Daily Attendance'
+        verbose_name_plural = 'Daily Attendance'
+        unique_together = (('odp_date', 'source_connection', 'odp_em_key'),)
+        indexes = [
+            models.Index(fields=['odp_date', 'odp_em_key'], name='da_date_employee_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.odp_em_key} - {self.odp_date} - {self.source_connection}"
+
+
+class RollupWatermark(models.Model):
+    """Source rows each rollup has absorbed (highest id, latest change time), per source connection."""
+    rollup = models.CharField(max_length=50)
+    source_connection = models.CharField(max_length=255)
+    source_signature = models.CharField(max_length=100, blank=True, null=True)
+    last_seen_id = models.BigIntegerField(blank=True, null=True)
+    last_changed_at = models.DateTimeField(blank=True, null=True)
+    refreshed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        managed = True
+        db_table = 'rollup_watermark'
+        verbose_name = 'Rollup Watermark'
+        verbose_name_plural = 'Rollup Watermarks'
+        unique_together = (('rollup', 'source_connection'),)
+
+    def __str__(self):
+        return f"{self.rollup} - {self.source_connection} - {self.last_seen_id}"
+
+
+class RollupDayStamp(models.Model):
+    """When each day of a per-line rollup was last rebuilt, so caches of closed
+    days (hangerline.trend_store) drop only the days a refresh touched.
+    Written by hangerline.rollups.refresh_rollups()."""
+    rollup = models.CharField(max_length=50)
+    source_connection = models.CharField(max_length=255)
+    day = models.DateField()
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        managed = True
+        db_table = 'rollup_day_stamp'
+        verbose_name = 'Rollup Day Stamp'
+        verbose_name_plural = 'Rollup Day Stamps'
+        unique_together = (('rollup', 'source_connection', 'day'),)
+
+    def __str__(self):
+        return f"{self.rollup} - {self.source_connection} - {self.day}"
+
+
+class PoProgress(models.Model):
+    """Cumulative progress per PO since its start date (earliest clientpodate).
+    Re-summed for the POs with new or changed operator_daily_performance /
+    transfertopacking rows by hangerline.rollups.refresh_po_ledger()."""
+    pono = models.CharField(max_length=100, unique=True, verbose_name='PO No')
+    po_start_date = models.DateTimeField(blank=True, null=True, verbose_name='PO Start Date')
+    since_date = models.DateField(verbose_name='Counted Since')
+    po_qty = models.BigIntegerField(default=0, verbose_name='PO Qty')
+    produced_qty = models.BigIntegerField(default=0, verbose_name='Produced')
+    transferred_qty = models.BigIntegerField(default=0, verbose_name='Transferred')
+    in_hand_qty = models.BigIntegerField(default=0, verbose_name='In Hand Sewing')
+    last_activity_date = models.DateField(blank=True, null=True, verbose_name='Last Activity')
+    updated_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        managed = True
+        db_table = 'po_progress'
+        verbose_name = 'PO Progress'
+        verbose_name_plural = 'PO Progress'
+        ordering = ['pono']
+
+    def __str__(self):
+        return f"{self.pono} - {self.produced_qty}/{self.po_qty}"
+
+    @property
+    def pending_qty(self):
+        return max(0, self.po_qty - self.produced_qty)
+
+    @property
+    def completion_percent(self):
+        return round((self.produced_qty / self.po_qty * 100), 1) if self.po_qty > 0 else 0
+
+
+class ArticleSmv(models.Model):
+    """Latest operationinformation SMV per article, keyed by the st_id prefix.
+    Rebuilt by hangerline.rollups.refresh_article_smv() when operationinformation changes."""
+    articleno = models.TextField(primary_key=True, verbose_name='Article No')
+    totalsmv = models.FloatField(blank=True, null=True, verbose_name='Total SMV')
+    conversionfactor = models.FloatField(blank=True, null=True, verbose_name='Conversion Factor')
+    applicabledate = models.DateTimeField(blank=True, null=True, verbose_name='Applicable Date')
+
+    class Meta:
+        managed = True
+        db_table = 'article_smv'
+        verbose_name = 'Article SMV'
+        verbose_name_plural = 'Article SMVs'
+
+    def __str__(self):
+        return f"{self.articleno} - {self.totalsmv}"
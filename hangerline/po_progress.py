@@ -0,0 +1,87 @@
+"""
+PO progress for the PO Progress Summary page, the PO admin and the PO API.
+
+Cumulative produced and transferred quantities per PO are kept in the
+po_progress ledger (see hangerline.rollups.refresh_po_ledger), which is
+reconciled for the POs touched by each load. Reading progress is a join of
+the ledger with the POs that had offloading in the selected range; no PO
+history is rescanned back to its clientpodate.
+"""
+
+from datetime import date
+
+from django.db import connection
+
+from .models import PoProgress
+from .rollups import ROLLUP_PO_LEDGER, maybe_refresh_rollups
+
+# Start date shown for POs without a clientpodate
+FALLBACK_START_DATE = date(2000, 1, 1)
+
+
+def _po_row(pono, po_start_date, po_qty, produced, transferred, in_hand, last_activity_date):
+    return {
+        'pono': pono,
+        'po_start_date': po_start_date or FALLBACK_START_DATE,
+        'po_qty': po_qty,
+        'todate_produced': produced,
+        'todate_transfer': transferred,
+        'pending_po_qty': max(0, po_qty - produced),
+        'in_hand_sewing': in_hand,
+        'completion_percent': round((produced / po_qty * 100), 1) if po_qty > 0 else 0,
+        'last_activity_date': last_activity_date,
+    }
+
+
+def get_po_progress(start_date, end_date):
+    """
+    [{'pono', 'po_start_date', 'po_qty', 'todate_produced', 'todate_transfer',
+    'pending_po_qty', 'in_hand_sewing', 'completion_percent',
+    'last_activity_date'}] ordered by pono, for the POs with offloading between
+    start_date and end_date.
+    """
+    maybe_refresh_rollups((ROLLUP_PO_LEDGER,))
+
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            WITH active AS (
+                SELECT DISTINCT odpd_lot_number AS pono
+                FROM operator_daily_performance
+                WHERE odp_date >= %s AND odp_date <= %s
+                  AND unloading_qty > 0
+            )
+            SELECT
+                l.pono, l.po_start_date, l.po_qty, l.produced_qty,
+                l.transferred_qty, l.in_hand_qty, l.last_activity_date
+            FROM po_progress l
+            JOIN active a ON a.pono = l.pono
+            ORDER BY l.pono
+        """, [start_date, end_date])
+        return [_po_row(*row) for row in cursor.fetchall()]
+
+
+def get_po_ledger(ponos):
+    """Progress rows (as get_po_progress) for the given ponos regardless of recent activity"""
+    maybe_refresh_rollups((ROLLUP_PO_LEDGER,))
+    return [
+        _po_row(*row)
+        for row in PoProgress.objects.filter(pono__in=ponos).values_list(
+            'pono', 'po_start_date', 'po_qty', 'produced_qty',
+            'transferred_qty', 'in_hand_qty', 'last_activity_date',
+        )
+    ]
+
+
+def summarize_po_progress(po_data):
+    """Summary card totals over get_po_progress() rows"""
+    total_po_qty = sum(po['po_qty'] for po in po_data)
+    total_produced = sum(po['todate_produced'] for po in po_data)
+    return {
+        'total_pos': len(po_data),
+        'total_po_qty': total_po_qty,
+        'total_produced': total_produced,
+        'total_transferred': sum(po['todate_transfer'] for po in po_data),
+        'total_pending': sum(po['pending_po_qty'] for po in po_data),
+        'total_in_hand': sum(po['in_hand_sewing'] for po in po_data),
+        'overall_completion': round((total_produced / total_po_qty * 100), 1) if total_po_qty > 0 else 0
+    }
@@ -0,0 +1,83 @@
+"""
+Production categories of an operation (oc_description).
+
+The rules are defined once in PRODUCTION_CATEGORIES. category_mask() turns an
+oc_description into a bitmask of the categories it belongs to (an operation
+such as 'QC Final' is in several), memoized per description. category_totals()
+runs one query grouped by oc_description and adds each group to its
+categories in Python, instead of one LIKE-filtered aggregate per category.
+"""
+
+from functools import lru_cache
+
+from django.db.models import Q, Sum
+from django.utils.translation import gettext_lazy as _
+
+LOADING_OPERATION = 'Loading/Panel Segregation'
+OFFLINE_OPERATION = 'Garment Insert in Poly Bag & Close'
+
+# (key, translatable label, lookup, value); lookup is the Django lookup used on oc_description
+PRODUCTION_CATEGORIES = [
+    ('offline', _('Offline'), 'exact', OFFLINE_OPERATION),
+    ('loading', _('Loading'), 'exact', LOADING_OPERATION),
+    ('midline', _('QC(midline)'), 'icontains', 'midline'),
+    ('endline', _('QC(endline)'), 'icontains', 'endline'),
+    ('final', _('QC(final)'), 'icontains', 'final'),
+    ('qc', _('QC'), 'startswith', 'QC'),
+]
+
+CATEGORY_BITS = {key: 1 << index for index, (key, _label, _lookup, _value) in enumerate(PRODUCTION_CATEGORIES)}
+
+
+def _matches(oc_description, lookup, value):
+    if lookup == 'exact':
+        return oc_description == value
+    if lookup == 'icontains':
+        return value.lower() in oc_description.lower()
+    if lookup == 'startswith':
+        return oc_description.startswith(value)
+    raise ValueError(f"Unsupported lookup: {lookup}")
+
+
+@lru_cache(maxsize=4096)
+def category_mask(oc_description):
+    """Bitmask (see CATEGORY_BITS) of the categories oc_description belongs to"""
+    if not oc_description:
+        return 0
+    mask = 0
+    for key, _label, lookup, value in PRODUCTION_CATEGORIES:
+        if _matches(oc_description, lookup, value):
+            mask |= CATEGORY_BITS[key]
+    return mask
+
+
+def category_q(key):
+    """Q object selecting the rows of one category"""
+    for category_key, _label, lookup, value in PRODUCTION_CATEGORIES:
+        if category_key == key:
+            return Q(**{f'oc_description__{lookup}': value})
+    raise ValueError(f"Unknown production category: {key}")
+
+
+def add_to_categories(totals, oc_description, quantity):
+    """Add quantity to every category of oc_description in totals ({key: total})"""
+    mask = category_mask(oc_description)
+    for key, bit in CATEGORY_BITS.items():
+        if mask & bit:
+            totals[key] += quantity
+
+
+def category_totals(queryset, field='odpd_quantity'):
+    """
+    {key: total of field} for every category, plus 'selected' for the whole
+    queryset, from a single query grouped by oc_description.
+    """
+    totals = dict.fromkeys(CATEGORY_BITS, 0)
+    totals['selected'] = 0
+
+    grouped = queryset.order_by().values_list('oc_description').annotate(total=Sum(field))
+    for oc_description, total in grouped:
+        total = total or 0
+        totals['selected'] += total
+        add_to_categories(totals, oc_description, total)
+    return totals
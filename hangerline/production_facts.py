@@ -0,0 +1,197 @@
+"""
+Production facts for the Django production dashboard.
+
+All measures the page needs (totals, line and shift counts, per-line loading,
+offloading, WIP, targets and breakdown minutes with their percentages) come
+from one query over daily_production_rollup, line_target and breakdown. It uses FILTER aggregates and window
+totals. Identical requests arriving together are computed once and the result
+is kept for HANGERLINE_PRODUCTION_FACTS_CACHE_SECONDS.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from .dashboard_cache import single_flight
+from .rollups import maybe_refresh_rollups
+
+CACHE_PREFIX = 'hangerline:production_facts'
+
+
+def _query_facts(start_date, end_date, line_filter, shift_filter):
+    production_conditions = ["odp_date >= %s", "odp_date <= %s"]
+    production_params = [start_date, end_date]
+    target_conditions = ["target_date >= %s", "target_date <= %s"]
+    target_params = [start_date, end_date]
+    breakdown_conditions = ["p_date >= %s", "p_date <= %s"]
+    breakdown_params = [start_date, end_date]
+    if line_filter:
+        production_conditions.append("source_connection = %s")
+        production_params.append(line_filter)
+        target_conditions.append("source_connection = %s")
+        target_params.append(line_filter)
+        breakdown_conditions.append("line_no = %s")
+        breakdown_params.append(line_filter)
+    if shift_filter:
+        production_conditions.append("shift = %s")
+        production_params.append(shift_filter)
+        breakdown_conditions.append("shift = %s")
+        breakdown_params.append(shift_filter)
+
+    # One row per line plus a grand total row (is_total), with the totals
+    # repeated on every row through window aggregates for the percentages.
+    query = f"""
+    WITH production AS (
+        SELECT
+            GROUPING(source_connection) = 1 AS is_total,
+            source_connection AS line,
+            COALESCE(SUM(loading_qty), 0) AS loading,
+            COALESCE(SUM(unloading_qty), 0) AS offloading,
+            COALESCE(SUM(odpd_quantity), 0) AS quantity,
+            COUNT(DISTINCT source_connection) AS line_count,
+            COUNT(DISTINCT shift) FILTER (WHERE shift <> '') AS shift_count
+        FROM daily_production_rollup
+        WHERE {' AND '.join(production_conditions)}
+        GROUP BY GROUPING SETS ((source_connection), ())
+    ),
+    targets AS (
+        SELECT source_connection AS line, SUM(total_target_qty) AS target
+        FROM line_target
+        WHERE {' AND '.join(target_conditions)}
+        GROUP BY source_connection
+    ),
+    breakdowns AS (
+        SELECT line_no AS line, SUM(breakdown_minutes) AS breakdown
+        FROM breakdown
+        WHERE {' AND '.join(breakdown_conditions)}
+        GROUP BY line_no
+    ),
+    facts AS (
+        SELECT
+            COALESCE(p.is_total, FALSE) AS is_total,
+            COALESCE(p.line, t.line, b.line) AS line,
+            COALESCE(p.loading, 0) AS loading,
+            COALESCE(p.offloading, 0) AS offloading,
+            COALESCE(p.quantity, 0) AS quantity,
+            COALESCE(p.line_count, 0) AS line_count,
+            COALESCE(p.shift_count, 0) AS shift_count,
+            t.target,
+            b.breakdown
+        FROM production p
+        FULL JOIN targets t ON t.line = p.line
+        FULL JOIN breakdowns b ON b.line = COALESCE(p.line, t.line)
+    ),
+    totals AS (
+        SELECT
+            *,
+            MAX(loading) FILTER (WHERE is_total) OVER () AS total_loading,
+            MAX(offloading) FILTER (WHERE is_total) OVER () AS total_offloading,
+            MAX(loading - offloading) FILTER (WHERE is_total) OVER () AS total_wip,
+            SUM(target) OVER () AS total_target,
+            SUM(breakdown) OVER () AS total_breakdown
+        FROM facts
+    )
+    SELECT
+        is_total,
+        line,
+        loading::bigint,
+        offloading::bigint,
+        (loading - offloading)::bigint AS wip,
+        quantity::bigint,
+        line_count::int,
+        shift_count::int,
+        target::bigint,
+        COALESCE(total_target, 0)::bigint,
+        COALESCE(breakdown, 0)::float8 AS breakdown,
+        COALESCE(total_breakdown, 0)::float8 AS total_breakdown,
+        COALESCE(ROUND(100.0 * loading / NULLIF(total_loading, 0), 1), 0)::float8 AS loading_percent,
+        COALESCE(ROUND(100.0 * offloading / NULLIF(total_offloading, 0), 1), 0)::float8 AS offloading_percent,
+        COALESCE(ROUND(100.0 * offloading / NULLIF(loading, 0), 1), 0)::float8 AS efficiency,
+        CASE WHEN total_wip = 0 THEN 0
+             ELSE LEAST(ROUND(100.0 * ABS(loading - offloading) / ABS(GREATEST(total_wip, 1)), 1), 100)
+        END::float8 AS wip_percent,
+        COALESCE(ROUND(100.0 * offloading / NULLIF(target, 0), 1), 0)::float8 AS achievement_percent
+    FROM totals
+    """
+
+    with connection.cursor() as cursor:
+        cursor.execute(query, production_params + target_params + breakdown_params)
+        columns = [col[0] for col in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _build_facts(rows):
+    total = next((row for row in rows if row['is_total']), None)
+    line_rows = [row for row in rows if not row['is_total'] and row['line']]
+
+    total_loading = total['loading'] if total else 0
+    total_offloading = total['offloading'] if total else 0
+    total_target = rows[0]['total_target'] if rows else 0
+    total_breakdown = rows[0]['total_breakdown'] if rows else 0
+    variance = total_offloading - total_target
+
+    production_lines = [row for row in line_rows if row['line_count']]
+    return {
+        'total_loading': total_loading,
+        'total_offloading': total_offloading,
+        'total_wip': total_loading - total_offloading,
+        'total_quantity': total['quantity'] if total else 0,
+        'line_count': total['line_count'] if total else 0,
+        'shift_count': total['shift_count'] if total else 0,
+        'total_target': total_target,
+        'total_breakdown': round(total_breakdown),
+        'variance': variance,
+        'variance_percent': round((variance / total_target * 100), 1) if total_target > 0 else 0,
+        'achievement_percent': round((total_offloading / total_target * 100), 1) if total_target > 0 else 0,
+        'efficiency': round((total_offloading / total_loading * 100), 1) if total_loading > 0 else 0,
+        'line_loading': [
+            {'line': row['line'], 'qty': row['loading'], 'percent': row['loading_percent']}
+            for row in sorted(production_lines, key=lambda row: row['loading'], reverse=True)
+        ],
+        'line_offloading': [
+            {'line': row['line'], 'qty': row['offloading'], 'percent': row['offloading_percent'], 'efficiency': row['efficiency']}
+            for row in sorted(production_lines, key=lambda row: row['offloading'], reverse=True)
+        ],
+        'line_wip': [
+            {'line': row['line'], 'qty': row['wip'], 'percent': row['wip_percent']}
+            for row in sorted(production_lines, key=lambda row: row['line'])
+        ],
+        'line_targets': [
+            {
+                'line': row['line'],
+                'target': row['target'],
+                'achieved': row['offloading'],
+                'variance': row['offloading'] - row['target'],
+                'percent': row['achievement_percent'],
+            }
+            for row in sorted(line_rows, key=lambda row: row['line'])
+            if row['target'] is not None
+        ],
+        'line_breakdowns': [
+            {'line': row['line'], 'minutes': round(row['breakdown'], 1)}
+            for row in sorted(line_rows, key=lambda row: row['breakdown'], reverse=True)
+            if row['breakdown']
+        ],
+    }
+
+
+def get_production_facts(start_date, end_date, line_filter=None, shift_filter=None):
+    """
+    Return every measure shown on the production dashboard for the filters:
+    totals, line/shift counts, target variance, breakdown minutes and the
+    line_loading, line_offloading, line_wip, line_targets and line_breakdowns
+    lists.
+    """
+    maybe_refresh_rollups()
+
+    key = ':'.join([CACHE_PREFIX, start_date.isoformat(), end_date.isoformat(), line_filter or 'All', shift_filter or 'All'])
+    facts = cache.get(key)
+    if facts is not None:
+        return facts
+
+    def compute():
+        facts = _build_facts(_query_facts(start_date, end_date, line_filter, shift_filter))
+        cache.set(key, facts, getattr(settings, 'HANGERLINE_PRODUCTION_FACTS_CACHE_SECONDS', 30))
+        return facts
+
+    return single_flight(key, compute)
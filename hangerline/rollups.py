@@ -0,0 +1,602 @@
+"""
+Incrementally maintained rollup and lookup tables built from the ETL-loaded tables.
+
+Each per-line rollup (daily_production_rollup, and the daily_attendance
+presence snapshot) keeps a per-line watermark of the operator_daily_performance
+rows it has absorbed: the highest id and the latest change time
+(GREATEST(created_at, odpd_edited_date)). A refresh rebuilds only the days of
+the rows inserted or changed since then, whatever their odp_date, so its cost
+depends on what the latest ETL run touched, not on how much history is stored.
+A line without a watermark is built in full by `manage.py refresh_rollups`,
+never from the request path. Every rebuilt (line, day) is stamped in
+rollup_day_stamp, so caches of closed days drop only the days that changed.
+
+article_smv is a small dimension with the latest SMV per article. It is rebuilt
+only when the operationinformation signature (row count and latest dates) changes.
+
+po_progress is a per-PO ledger of cumulative produced and transferred
+quantities. A refresh re-sums only the POs whose operator_daily_performance /
+transfertopacking rows were inserted or changed since the ledger's watermark,
+so untouched POs' history is never rescanned.
+"""
+
+from datetime import timedelta
+import logging
+import re
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ArticleSmv, RollupWatermark
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_DAILY_PRODUCTION = 'daily_production'
+ROLLUP_DAILY_ATTENDANCE = 'daily_attendance'
+ROLLUP_ARTICLE_SMV = 'article_smv'
+ROLLUP_PO_LEDGER = 'po_ledger'
+
+ALL_ROLLUPS = (ROLLUP_DAILY_PRODUCTION, ROLLUP_DAILY_ATTENDANCE, ROLLUP_ARTICLE_SMV, ROLLUP_PO_LEDGER)
+# What the dashboards, charts and attendance views read; the PO pages refresh ROLLUP_PO_LEDGER themselves
+DASHBOARD_ROLLUPS = (ROLLUP_DAILY_PRODUCTION, ROLLUP_DAILY_ATTENDANCE, ROLLUP_ARTICLE_SMV)
+
+# Arbitrary key for pg_try_advisory_xact_lock so that concurrent workers don't
+# rebuild the same days at the same time.
+ROLLUP_LOCK_KEY = 74210001
+
+# {rollups: monotonic time of the last request-path refresh check}
+_last_auto_refresh = {}
+
+# In-process copy of article_smv: {'version': refreshed_at, 'lookup': {articleno: (totalsmv, conversionfactor)}}
+_smv_cache = {'version': None, 'lookup': {}}
+
+
+# Change time of an operator_daily_performance row: the ETL upserts rows in place,
+# so an update keeps its id and only moves this forward (indexed in migration 0029)
+ODP_CHANGED_AT = "GREATEST(created_at, odpd_edited_date)"
+
+
+def _aware(value):
+    if value is not None and timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def _change_lag():
+    """Overlap for rows committed after rows with a later change time"""
+    return timedelta(seconds=getattr(settings, 'HANGERLINE_ROLLUP_CHANGE_LAG_SECONDS', 600))
+
+
+def _odp_line_states():
+    """
+    {source_connection: (max id, max change time)} for every line in
+    operator_daily_performance, read from the (source_connection, ...) indexes.
+    Lines are found with a loose index scan, so lines without any successful
+    etl_extract_log row are included too.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            WITH RECURSIVE lines AS (
+                (SELECT source_connection FROM operator_daily_performance
+                 WHERE source_connection IS NOT NULL
+                 ORDER BY source_connection LIMIT 1)
+                UNION ALL
+                SELECT (SELECT o.source_connection FROM operator_daily_performance o
+                        WHERE o.source_connection > l.source_connection
+                        ORDER BY o.source_connection LIMIT 1)
+                FROM lines l
+                WHERE l.source_connection IS NOT NULL
+            )
+            SELECT
+                l.source_connection,
+                (SELECT MAX(o.id) FROM operator_daily_performance o
+                 WHERE o.source_connection = l.source_connection),
+                (SELECT MAX({ODP_CHANGED_AT}) FROM operator_daily_performance o
+                 WHERE o.source_connection = l.source_connection)
+            FROM lines l
+            WHERE l.source_connection IS NOT NULL AND l.source_connection <> ''
+        """)
+        return {line: (max_id, _aware(max_changed)) for line, max_id, max_changed in cursor.fetchall()}
+
+
+def _changed_days(source_connection, last_seen_id, last_changed_at):
+    """Distinct odp_dates of the line's rows inserted past last_seen_id or changed since last_changed_at"""
+    changed_since = last_changed_at - _change_lag() if last_changed_at else None
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT DISTINCT odp_date
+            FROM operator_daily_performance
+            WHERE source_connection = %s
+              AND odp_date IS NOT NULL
+              AND (id > %s OR {ODP_CHANGED_AT} > %s)
+            ORDER BY odp_date
+        """, [source_connection, last_seen_id or 0, changed_since])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _pending_refreshes(rollup, line_states, full=False, initial_build=False):
+    """
+    Return {source_connection: days} for every line with rows the rollup has not
+    absorbed yet; days is the list of odp_dates to rebuild, or None to rebuild
+    the line in full (full=True, or a line never rolled up when initial_build).
+    """
+    watermarks = {
+        wm.source_connection: wm
+        for wm in RollupWatermark.objects.filter(rollup=rollup)
+    }
+
+    pending = {}
+    for line, (max_id, max_changed) in line_states.items():
+        watermark = watermarks.get(line)
+        if full:
+            pending[line] = None
+        elif watermark is None or watermark.last_seen_id is None:
+            if initial_build:
+                pending[line] = None
+            else:
+                logger.warning(f"{rollup} has not been built for {line}; run `manage.py refresh_rollups`")
+        elif (max_id or 0) > watermark.last_seen_id or (
+            max_changed is not None
+            and (watermark.last_changed_at is None or max_changed > watermark.last_changed_at)
+        ):
+            pending[line] = _changed_days(line, watermark.last_seen_id, watermark.last_changed_at)
+    return pending
+
+
+def _day_condition(days):
+    """(SQL condition, params) restricting odp_date to days, or no restriction if days is None"""
+    if days is None:
+        return "", []
+    return "AND odp_date = ANY(%s)", [list(days)]
+
+
+def refresh_daily_production_rollup(source_connection, days=None):
+    """Rebuild daily_production_rollup rows for one line on the given days (all days if None)"""
+    day_condition, day_params = _day_condition(days)
+    params = [source_connection, *day_params]
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            DELETE FROM daily_production_rollup
+            WHERE source_connection = %s {day_condition}
+        """, params)
+        cursor.execute(f"""
+            INSERT INTO daily_production_rollup (
+                odp_date, source_connection, shift, st_id, style_prefix, oc_description,
+                loading_qty, unloading_qty, odpd_quantity,
+                efficiency_sum, efficiency_count, record_count
+            )
+            SELECT
+                odp_date,
+                source_connection,
+                shift,
+                st_id,
+                REGEXP_REPLACE(st_id, '[-_].*', ''),
+                oc_description,
+                COALESCE(SUM(loading_qty), 0),
+                COALESCE(SUM(unloading_qty), 0),
+                COALESCE(SUM(odpd_quantity), 0),
+                COALESCE(SUM(efficiency), 0),
+                COUNT(efficiency),
+                COUNT(*)
+            FROM operator_daily_performance
+            WHERE source_connection = %s {day_condition}
+              AND odp_date IS NOT NULL
+            GROUP BY odp_date, source_connection, shift, st_id, oc_description
+        """, params)
+        return cursor.rowcount
+
+
+def _stamp_days(rollup, source_connection, days):
+    """Record that the given days of rollup for one line (all its days if None) were rebuilt now"""
+    if days is None:
+        days_query = """
+            SELECT DISTINCT odp_date FROM operator_daily_performance
+            WHERE source_connection = %s AND odp_date IS NOT NULL
+        """
+        days_params = [source_connection]
+    else:
+        days_query = "SELECT UNNEST(%s::date[])"
+        days_params = [list(days)]
+
+    with connection.cursor() as cursor:
+        if days is None:
+            cursor.execute(
+                "DELETE FROM rollup_day_stamp WHERE rollup = %s AND source_connection = %s",
+                [rollup, source_connection],
+            )
+        cursor.execute(f"""
+            INSERT INTO rollup_day_stamp (rollup, source_connection, day, refreshed_at)
+            SELECT %s, %s, rebuilt.day, NOW()
+            FROM ({days_query}) AS rebuilt(day)
+            ON CONFLICT (rollup, source_connection, day) DO UPDATE SET refreshed_at = EXCLUDED.refreshed_at
+        """, [rollup, source_connection, *days_params])
+
+
+def refresh_daily_attendance(source_connection, days=None):
+    """Rebuild daily_attendance rows for one line on the given days (all days if None)"""
+    day_condition, day_params = _day_condition(days)
+    params = [source_connection, *day_params]
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            DELETE FROM daily_attendance
+            WHERE source_connection = %s {day_condition}
+        """, params)
+        cursor.execute(f"""
+            INSERT INTO daily_attendance (
+                odp_date, source_connection, odp_em_key, shift,
+                first_hanger_time, last_hanger_time, worked_minutes, record_count
+            )
+            SELECT
+                odp_date,
+                source_connection,
+                odp_em_key,
+                MAX(shift),
+                MIN(odp_first_hanger_time),
+                MAX(odp_last_hanger_time),
+                COALESCE(EXTRACT(EPOCH FROM (MAX(odp_last_hanger_time) - MIN(odp_first_hanger_time))) / 60, 0),
+                COUNT(*)
+            FROM operator_daily_performance
+            WHERE source_connection = %s {day_condition}
+              AND odp_date IS NOT NULL
+              AND odp_em_key IS NOT NULL
+            GROUP BY odp_date, source_connection, odp_em_key
+        """, params)
+        return cursor.rowcount
+
+
+# Rollups refreshed per line from the change watermark: {rollup: refresh(source_connection, days)}
+LINE_ROLLUPS = {
+    ROLLUP_DAILY_PRODUCTION: refresh_daily_production_rollup,
+    ROLLUP_DAILY_ATTENDANCE: refresh_daily_attendance,
+}
+
+
+def _operationinformation_signature():
+    """Cheap fingerprint of operationinformation used to detect SMV changes"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT COUNT(*), MAX(applicabledate), MAX(dated), MAX(vno)
+            FROM operationinformation
+        """)
+        row_count, max_applicable, max_dated, max_vno = cursor.fetchone()
+    return f"{row_count}|{max_applicable}|{max_dated}|{max_vno}"[:100]
+
+
+def refresh_article_smv(force=False):
+    """
+    Rebuild article_smv (latest totalsmv/conversionfactor per articleno) if
+    operationinformation has changed since the last build. Returns True if rebuilt.
+    """
+    signature = _operationinformation_signature()
+    watermark = RollupWatermark.objects.filter(
+        rollup=ROLLUP_ARTICLE_SMV, source_connection='operationinformation'
+    ).first()
+    if not force and watermark and watermark.source_signature == signature:
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM article_smv")
+        cursor.execute("""
+            INSERT INTO article_smv (articleno, totalsmv, conversionfactor, applicabledate)
+            SELECT DISTINCT ON (articleno)
+                articleno,
+                totalsmv,
+                conversionfactor,
+                applicabledate
+            FROM operationinformation
+            WHERE applicabledate IS NOT NULL
+              AND articleno IS NOT NULL
+            ORDER BY articleno, applicabledate DESC
+        """)
+        row_count = cursor.rowcount
+
+    RollupWatermark.objects.update_or_create(
+        rollup=ROLLUP_ARTICLE_SMV,
+        source_connection='operationinformation',
+        defaults={'source_signature': signature, 'refreshed_at': timezone.now()},
+    )
+    logger.info(f"Rebuilt article_smv with {row_count} articles")
+    return True
+
+
+# PO ledger sources: {table: (pono column, date column, quantity column, row condition, change time)}
+PO_LEDGER_SOURCES = {
+    'operator_daily_performance': ('odpd_lot_number', 'odp_date', 'unloading_qty', 'src.unloading_qty > 0', ODP_CHANGED_AT),
+    'transfertopacking': ('pono', 'proddate', 'qtytransferred', 'TRUE', 'dated'),
+}
+
+# One row per PO: quantity, start date and the date its progress is counted from
+PO_HEADER_SQL = """
+    SELECT
+        pono,
+        MIN(clientpodate) AS po_start_date,
+        COALESCE(MIN(clientpodate)::date, DATE '2000-01-01') AS since_date,
+        COALESCE(SUM(po_qty), 0) AS po_qty
+    FROM clientpurchaseorder
+    WHERE pono IS NOT NULL AND pono <> ''
+    GROUP BY pono
+"""
+
+
+def _po_ledger_source_sql(source, ledger):
+    """Grouped (pono, qty, last_date) of the source rows counted for the POs in ledger"""
+    pono_column, date_column, qty_column, condition, _ = PO_LEDGER_SOURCES[source]
+    return f"""
+        SELECT l.pono, SUM(src.{qty_column}) AS qty, MAX(src.{date_column}) AS last_date
+        FROM {source} src
+        JOIN {ledger} l ON l.pono = src.{pono_column} AND src.{date_column} >= l.since_date
+        WHERE {condition}
+        GROUP BY l.pono
+    """
+
+
+def _clientpurchaseorder_signature():
+    """Cheap fingerprint of clientpurchaseorder used to detect PO header changes"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT COUNT(*), MAX(id), SUM(po_qty), MIN(clientpodate), MAX(clientpodate)
+            FROM clientpurchaseorder
+        """)
+        return '|'.join(str(value) for value in cursor.fetchone())[:100]
+
+
+def _touched_ponos(cursor, source, last_seen_id, last_changed_at):
+    """POs of the source rows inserted past last_seen_id or changed since last_changed_at"""
+    pono_column, _, _, _, changed_at = PO_LEDGER_SOURCES[source]
+    changed_since = last_changed_at - _change_lag() if last_changed_at else None
+    cursor.execute(f"""
+        SELECT DISTINCT {pono_column}
+        FROM {source}
+        WHERE {pono_column} IS NOT NULL
+          AND (id > %s OR {changed_at} > %s)
+    """, [last_seen_id or 0, changed_since])
+    return {row[0] for row in cursor.fetchall()}
+
+
+def refresh_po_ledger(full=False, initial_build=True):
+    """
+    Bring po_progress up to date and return the number of POs built from history.
+
+    PO headers are re-read when clientpurchaseorder changes; a PO whose start
+    date changed is dropped and rebuilt. The source rows inserted or changed
+    since the last refresh (by id and change time, the ETL upserts
+    operator_daily_performance in place) mark their POs as touched, and the
+    touched POs are re-summed from their history, so updated quantities and
+    re-inserted rows are reconciled rather than added on top. New POs are
+    summed once from history. The ledger is only built from scratch when
+    initial_build is set (the management command), never from the request path.
+    """
+    watermarks = {
+        wm.source_connection: wm
+        for wm in RollupWatermark.objects.filter(rollup=ROLLUP_PO_LEDGER)
+    }
+    built_before = all(
+        source in watermarks and watermarks[source].last_seen_id is not None
+        for source in PO_LEDGER_SOURCES
+    )
+    if not built_before and not full and not initial_build:
+        logger.warning("po_progress has not been built; run `manage.py refresh_rollups`")
+        return 0
+
+    rebuild = full or not built_before
+    signature = _clientpurchaseorder_signature()
+    header = watermarks.get('clientpurchaseorder')
+    headers_changed = rebuild or header is None or header.source_signature != signature
+
+    with connection.cursor() as cursor:
+        upto = {}
+        for source, (_, _, _, _, changed_at) in PO_LEDGER_SOURCES.items():
+            cursor.execute(f"SELECT COALESCE(MAX(id), 0), MAX({changed_at}) FROM {source}")
+            max_id, max_changed = cursor.fetchone()
+            upto[source] = (max_id, _aware(max_changed))
+
+        touched = set()
+        advanced = False
+        if not rebuild:
+            for source, (max_id, max_changed) in upto.items():
+                watermark = watermarks[source]
+                if max_id > watermark.last_seen_id or (
+                    max_changed is not None
+                    and (watermark.last_changed_at is None or max_changed > watermark.last_changed_at)
+                ):
+                    advanced = True
+                    touched |= _touched_ponos(cursor, source, watermark.last_seen_id, watermark.last_changed_at)
+            if not headers_changed and not advanced:
+                return 0
+
+        if rebuild:
+            cursor.execute("DELETE FROM po_progress")
+
+        if headers_changed:
+            cursor.execute(f"""
+                UPDATE po_progress l
+                SET po_qty = p.po_qty, po_start_date = p.po_start_date, updated_at = NOW()
+                FROM ({PO_HEADER_SQL}) p
+                WHERE l.pono = p.pono AND l.since_date = p.since_date
+                  AND (l.po_qty <> p.po_qty OR l.po_start_date IS DISTINCT FROM p.po_start_date)
+            """)
+            cursor.execute(f"""
+                DELETE FROM po_progress l
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM ({PO_HEADER_SQL}) p
+                    WHERE p.pono = l.pono AND p.since_date = l.since_date
+                )
+            """)
+
+        # Re-sum the POs in the ledger whose source rows were inserted or changed
+        if touched:
+            cursor.execute(f"""
+                WITH touched AS (
+                    SELECT pono, since_date FROM po_progress WHERE pono = ANY(%s)
+                ),
+                produced AS ({_po_ledger_source_sql('operator_daily_performance', 'touched')}),
+                transferred AS ({_po_ledger_source_sql('transfertopacking', 'touched')})
+                UPDATE po_progress l
+                SET produced_qty = COALESCE(pr.qty, 0),
+                    transferred_qty = COALESCE(tr.qty, 0),
+                    last_activity_date = GREATEST(pr.last_date, tr.last_date),
+                    updated_at = NOW()
+                FROM touched t
+                LEFT JOIN produced pr ON pr.pono = t.pono
+                LEFT JOIN transferred tr ON tr.pono = t.pono
+                WHERE l.pono = t.pono
+            """, [list(touched)])
+
+        # POs not in the ledger yet (new, or with a changed start date) are summed from history
+        built = 0
+        if headers_changed:
+            cursor.execute(f"""
+                WITH new_pos AS (
+                    SELECT p.*
+                    FROM ({PO_HEADER_SQL}) p
+                    WHERE NOT EXISTS (SELECT 1 FROM po_progress l WHERE l.pono = p.pono)
+                ),
+                produced AS ({_po_ledger_source_sql('operator_daily_performance', 'new_pos')}),
+                transferred AS ({_po_ledger_source_sql('transfertopacking', 'new_pos')})
+                INSERT INTO po_progress (
+                    pono, po_start_date, since_date, po_qty,
+                    produced_qty, transferred_qty, in_hand_qty, last_activity_date, updated_at
+                )
+                SELECT
+                    n.pono, n.po_start_date, n.since_date, n.po_qty,
+                    COALESCE(pr.qty, 0), COALESCE(tr.qty, 0), 0,
+                    GREATEST(pr.last_date, tr.last_date), NOW()
+                FROM new_pos n
+                LEFT JOIN produced pr ON pr.pono = n.pono
+                LEFT JOIN transferred tr ON tr.pono = n.pono
+            """)
+            built = cursor.rowcount
+
+        cursor.execute("""
+            UPDATE po_progress
+            SET in_hand_qty = GREATEST(produced_qty - transferred_qty, 0)
+            WHERE in_hand_qty <> GREATEST(produced_qty - transferred_qty, 0)
+        """)
+
+    now = timezone.now()
+    for source, (max_id, max_changed) in upto.items():
+        RollupWatermark.objects.update_or_create(
+            rollup=ROLLUP_PO_LEDGER,
+            source_connection=source,
+            defaults={'last_seen_id': max_id, 'last_changed_at': max_changed, 'refreshed_at': now},
+        )
+    RollupWatermark.objects.update_or_create(
+        rollup=ROLLUP_PO_LEDGER,
+        source_connection='clientpurchaseorder',
+        defaults={'source_signature': signature, 'refreshed_at': now},
+    )
+    if built:
+        logger.info(f"Built PO progress for {built} POs from history")
+    if touched:
+        logger.info(f"Reconciled PO progress for {len(touched)} touched POs")
+    return built
+
+
+def get_smv_lookup():
+    """
+    Return {articleno: (totalsmv, conversionfactor)} from article_smv, reloaded
+    only when the table has been rebuilt since this process last read it.
+    """
+    version = (
+        RollupWatermark.objects
+        .filter(rollup=ROLLUP_ARTICLE_SMV, source_connection='operationinformation')
+        .values_list('refreshed_at', flat=True)
+        .first()
+    )
+    if version is None or version != _smv_cache['version']:
+        _smv_cache['lookup'] = {
+            articleno: (totalsmv or 0, conversionfactor if conversionfactor is not None else 1)
+            for articleno, totalsmv, conversionfactor in
+            ArticleSmv.objects.values_list('articleno', 'totalsmv', 'conversionfactor')
+        }
+        _smv_cache['version'] = version
+    return _smv_cache['lookup']
+
+
+def style_prefix(st_id):
+    """Article part of an st_id (everything before the first '-' or '_'), matching the SQL REGEXP_REPLACE"""
+    return re.sub(r'[-_].*', '', st_id or '', flags=re.S)
+
+
+def refresh_rollups(full=False, lines=None, initial_build=True, rollups=ALL_ROLLUPS):
+    """
+    Bring the per-line rollup tables up to date with operator_daily_performance,
+    rebuild article_smv if operationinformation has changed and advance the PO ledger.
+    Lines never rolled up are built in full only when initial_build is set
+    (the management command); the request path leaves them to it. rollups
+    limits the refresh to some of ALL_ROLLUPS.
+
+    Returns {source_connection: days} for the lines that were refreshed (the
+    days rebuilt in any rollup, None for a full rebuild), or None if another
+    worker is already refreshing.
+    """
+    refreshed = {}
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", [ROLLUP_LOCK_KEY])
+            if not cursor.fetchone()[0]:
+                logger.info("Rollup refresh already running in another worker, skipping")
+                return None
+
+        # Taken before rebuilding, so rows loaded meanwhile are picked up next time
+        line_states = _odp_line_states()
+        if lines:
+            line_states = {line: state for line, state in line_states.items() if line in lines}
+
+        for rollup, refresh in LINE_ROLLUPS.items():
+            if rollup not in rollups:
+                continue
+            pending = _pending_refreshes(rollup, line_states, full=full, initial_build=initial_build)
+            for line, days in pending.items():
+                if days == []:
+                    row_count = 0
+                else:
+                    row_count = refresh(line, days)
+                    _stamp_days(rollup, line, days)
+                max_id, max_changed = line_states[line]
+                RollupWatermark.objects.update_or_create(
+                    rollup=rollup,
+                    source_connection=line,
+                    defaults={'last_seen_id': max_id, 'last_changed_at': max_changed, 'refreshed_at': timezone.now()},
+                )
+                if days is None or refreshed.get(line, ()) is None:
+                    refreshed[line] = None
+                else:
+                    refreshed[line] = sorted(set(refreshed.get(line, [])) | set(days))
+                logger.info(
+                    f"Rolled up {row_count} {rollup} rows for {line} "
+                    f"({'all days' if days is None else f'{len(days)} days'})"
+                )
+
+        if ROLLUP_ARTICLE_SMV in rollups:
+            refresh_article_smv(force=full)
+        if ROLLUP_PO_LEDGER in rollups:
+            refresh_po_ledger(full=full, initial_build=initial_build)
+
+    return refreshed
+
+
+def maybe_refresh_rollups(rollups=DASHBOARD_ROLLUPS):
+    """
+    Cheap request-path hook: check for new ETL rows at most once every
+    HANGERLINE_ROLLUP_AUTO_REFRESH_SECONDS (0 disables) and refresh the given
+    rollups if needed. Lines that were never rolled up are left to
+    `manage.py refresh_rollups`.
+    """
+    interval = getattr(settings, 'HANGERLINE_ROLLUP_AUTO_REFRESH_SECONDS', 60)
+    if not interval:
+        return
+
+    now = time.monotonic()
+    if now - _last_auto_refresh.get(rollups, float('-inf')) < interval:
+        return
+    _last_auto_refresh[rollups] = now
+
+    try:
+        refresh_rollups(initial_build=False, rollups=rollups)
+    except Exception as e:
+        logger.error(f"Rollup refresh failed: {e}")
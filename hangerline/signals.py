@@ -1,23 +1,41 @@
 from django.db.models.signals import post_save, post_delete
+from django.db import transaction
 from django.dispatch import receiver
-from django.db.models import Sum
-from .models import LineTarget, LineTargetDetail
+from .models import Color, LineTargetDetail, Size, Style
+from .dimensions import DIMENSION_CACHES
+from .line_targets import record_detail_change, remember_detail_totals
 
 
-@receiver([post_save, post_delete], sender=LineTargetDetail)
-def update_line_target_total(sender, instance, **kwargs):
+@receiver(post_save, sender=LineTargetDetail)
+def update_line_target_total(sender, instance, created=False, update_fields=None, **kwargs):
     """
     Signal handler to update total_target_qty in LineTarget whenever
-    LineTargetDetail records are created, updated, or deleted.
+    LineTargetDetail records are created or updated.
     """
-    # Get the related LineTarget
-    line_target = instance.linetarget
+    # Saves of a deferred instance list attnames (linetarget_id) rather than field names
+    if update_fields is not None and not {'target_qty', 'linetarget', 'linetarget_id'} & set(update_fields):
+        return
+    if created:
+        remember_detail_totals(instance, created=True)
+    record_detail_change(instance)
 
-    # Calculate the sum of all target_qty from related LineTargetDetail instances
-    total_qty = LineTargetDetail.objects.filter(linetarget=line_target).aggregate(
-        total=Sum('target_qty')
-    )['total'] or 0
 
-    # Update the total_target_qty field
-    line_target.total_target_qty = total_qty
-    line_target.save(update_fields=['total_target_qty'])
+@receiver(post_delete, sender=LineTargetDetail)
+def update_line_target_total_on_delete(sender, instance, **kwargs):
+    """Signal handler to update total_target_qty in LineTarget when a LineTargetDetail is deleted"""
+    record_detail_change(instance, deleted=True)
+
+
+@receiver(post_save, sender=Color)
+@receiver(post_save, sender=Size)
+@receiver(post_save, sender=Style)
+def cache_saved_dimension(sender, instance, **kwargs):
+    """Keep this process's dimension cache in step with saved colors, sizes and styles"""
+    transaction.on_commit(lambda: DIMENSION_CACHES[sender].put(instance))
+
+
+@receiver(post_delete, sender=Color)
+@receiver(post_delete, sender=Size)
+@receiver(post_delete, sender=Style)
+def uncache_deleted_dimension(sender, instance, **kwargs):
+    transaction.on_commit(lambda: DIMENSION_CACHES[sender].discard(instance))
@@ -0,0 +1,31 @@
+"""
+Test runner for the hangerline app.
+
+The ETL tables (operator_daily_performance, loadinginformation,
+clientpurchaseorder, ...) are unmanaged, and several migrations index or
+alter them, so the migrations cannot run on an empty test database.
+UnmanagedModelTestRunner builds the hangerline tables from the models instead,
+creating the unmanaged ones as ordinary tables for the duration of the run.
+"""
+
+from django.apps import apps
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class UnmanagedModelTestRunner(DiscoverRunner):
+    """DiscoverRunner creating every hangerline table, managed or not, without migrations"""
+
+    def setup_databases(self, **kwargs):
+        self.unmanaged_models = [
+            model for model in apps.get_app_config('hangerline').get_models() if not model._meta.managed
+        ]
+        for model in self.unmanaged_models:
+            model._meta.managed = True
+        with override_settings(MIGRATION_MODULES={'hangerline': None}):
+            return super().setup_databases(**kwargs)
+
+    def teardown_databases(self, old_config, **kwargs):
+        super().teardown_databases(old_config, **kwargs)
+        for model in self.unmanaged_models:
+            model._meta.managed = False
@@ -1,3 +1,271 @@
-from django.test import TestCase
+from datetime import date, datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .admin_pagination import KeysetPaginator, format_cursor, parse_cursor
+from .dimensions import colors, sizes
+from .line_targets import deferred_line_target_totals, fetch_loading_details
+from .models import (
+    ClientPurchaseOrder, LineTarget, LineTargetDetail, Loadinginformation, QualityControlRepair,
+)
+
+
+class LineTargetTotalsTests(TestCase):
+    """LineTarget.total_target_qty stays equal to the sum of its details' target_qty"""
+
+    def setUp(self):
+        # The dimension caches are process-wide and would outlive each test's rollback
+        colors.invalidate()
+        sizes.invalidate()
+        self.target = LineTarget.objects.create(source_connection='line-21', target_date=date(2026, 10, 1))
+        self.other_target = LineTarget.objects.create(source_connection='line-22', target_date=date(2026, 10, 1))
+
+    def add_detail(self, line_target, target_qty, shift='Day'):
+        return LineTargetDetail.objects.create(linetarget=line_target, target_qty=target_qty, shift=shift)
+
+    def assertTotalMatchesDetails(self, line_target):
+        line_target.refresh_from_db()
+        expected = LineTargetDetail.objects.filter(linetarget=line_target).aggregate(
+            total=Sum('target_qty')
+        )['total'] or 0
+        self.assertEqual(line_target.total_target_qty, expected)
+        return line_target.total_target_qty
+
+    def test_create_edit_and_delete(self):
+        detail = self.add_detail(self.target, 10)
+        self.add_detail(self.target, 5, shift='Night')
+        self.assertEqual(self.assertTotalMatchesDetails(self.target), 15)
+
+        detail.target_qty = 7
+        detail.save()
+        self.assertEqual(self.assertTotalMatchesDetails(self.target), 12)
+
+        detail.delete()
+        self.assertEqual(self.assertTotalMatchesDetails(self.target), 5)
+
+    def test_edit_of_loaded_detail(self):
+        detail = self.add_detail(self.target, 10)
+        loaded = LineTargetDetail.objects.get(pk=detail.pk)
+        loaded.target_qty = 3
+        loaded.save()
+        self.assertEqual(self.assertTotalMatchesDetails(self.target), 3)
+
+    def test_move_between_targets(self):
+        detail = self.add_detail(self.target, 10)
+        self.add_detail(self.other_target, 4)
+
+        detail = LineTargetDetail.objects.get(pk=detail.pk)
+        detail.linetarget = self.other_target
+        detail.target_qty = 6
+        detail.save()
+        self.assertEqual(self.assertTotalMatchesDetails(self.target), 0)
+        self.assertEqual(self.assertTotalMatchesDetails(self.other_target), 10)
+
+    def test_save_with_deferred_target_qty(self):
+        detail = self.add_detail(self.target, 10)
+
+        deferred = LineTargetDetail.objects.defer('target_qty').get(pk=detail.pk)
+        deferred.target_qty = 4
+        deferred.save()
+        self.assertEqual(self.assertTotalMatchesDetails(self.target), 4)
+
+    def test_move_with_deferred_target_qty(self):
+        detail = self.add_detail(self.target, 10)
+
+        deferred = LineTargetDetail.objects.defer('target_qty').get(pk=detail.pk)
+        deferred.linetarget = self.other_target
+        deferred.save()
+        self.assertEqual(self.assertTotalMatchesDetails(self.target), 0)
+        self.assertEqual(self.assertTotalMatchesDetails(self.other_target), 10)
+
+    def test_delete_without_snapshot(self):
+        detail = self.add_detail(self.target, 10)
+        self.add_detail(self.target, 2, shift='Night')
+
+        # Built in Python, so the stored target_qty is unknown to it
+        LineTargetDetail(pk=detail.pk, linetarget=self.target).delete()
+        self.assertEqual(self.assertTotalMatchesDetails(self.target), 2)
+
+    def test_bulk_queryset_delete(self):
+        self.add_detail(self.target, 10)
+        self.add_detail(self.target, 2, shift='Night')
+        self.add_detail(self.other_target, 4)
+
+        LineTargetDetail.objects.filter(shift='Day').delete()
+        self.assertEqual(self.assertTotalMatchesDetails(self.target), 2)
+        self.assertEqual(self.assertTotalMatchesDetails(self.other_target), 0)
+
+    def test_deferred_block_applies_once_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with deferred_line_target_totals():
+                detail = self.add_detail(self.target, 10)
+                with deferred_line_target_totals():
+                    self.add_detail(self.target, 5, shift='Night')
+                    detail.linetarget = self.other_target
+                    detail.save()
+                self.target.refresh_from_db()
+                self.assertEqual(self.target.total_target_qty, 0)
+
+        # The nested block joined the outer one
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.assertTotalMatchesDetails(self.target), 5)
+        self.assertEqual(self.assertTotalMatchesDetails(self.other_target), 10)
+
+    def test_deferred_block_discards_changes_on_error(self):
+        self.add_detail(self.target, 3)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic(), deferred_line_target_totals():
+                    self.add_detail(self.target, 10, shift='Night')
+                    raise RuntimeError
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.assertTotalMatchesDetails(self.target), 3)
+
+    def test_fetch_loading_details(self):
+        self.add_detail(self.target, 99)
+        ClientPurchaseOrder.objects.create(
+            id=1, pono='PO-1', item_id='ITEM-1', articleno='ART-1', mcolour='BLK', itemsize='M',
+            item_title='Shirt',
+        )
+        loaded_at = timezone.make_aware(datetime(2026, 10, 1, 8, 0))
+        for barcode, qty in ((1001, 12), (1002, 8)):
+            Loadinginformation.objects.create(
+                barcode=barcode, id=f'SCR-{barcode}', dated=loaded_at, line_desc='line-21',
+                pono='PO-1', item_id='ITEM-1', fg_articleno='ART-1', qty=qty,
+            )
+        # Another line's loading is not picked up
+        Loadinginformation.objects.create(
+            barcode=2001, id='SCR-2001', dated=loaded_at, line_desc='line-22', pono='PO-1', qty=50,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            loading_rows, created = fetch_loading_details(self.target)
+
+        self.assertEqual((loading_rows, created), (2, 4))
+        # Two shifts per loading row; the replaced detail no longer counts
+        self.assertEqual(self.assertTotalMatchesDetails(self.target), 40)
+        self.assertEqual(self.target.loading_qty, 40)
+        detail = LineTargetDetail.objects.filter(linetarget=self.target).first()
+        self.assertEqual(detail.item_id, 'ART-1 - BLK - M')
+
+
+def create_qc_rows():
+    """Eight QC rows of the current year (the QC changelist only lists it), newest first"""
+    first_day = date(date.today().year, 1, 1)
+    for offset in (0, 0, 1, 2, 3, 4, 5, 6):
+        QualityControlRepair.objects.create(qcr_key=f'qcr-{offset}', qcr_date=first_day + timedelta(days=offset))
+    return list(QualityControlRepair.objects.order_by('-qcr_date', '-id'))
+
+
+@override_settings(HANGERLINE_ADMIN_EXACT_COUNT_LIMIT=2)
+class KeysetPaginationTests(TestCase):
+    """Seek paging once the count is estimated"""
+
+    def setUp(self):
+        self.rows = create_qc_rows()
+
+    def queryset(self):
+        return QualityControlRepair.objects.order_by('-qcr_date', '-id')
+
+    def key(self, row):
+        return row.qcr_date, row.pk
+
+    def page(self, number, cursor=None):
+        return KeysetPaginator(self.queryset(), 3, keyset=('qcr_date', 'id'), cursor=cursor).page(number)
+
+    def test_cursor_round_trip(self):
+        cursor = format_cursor('after', self.key(self.rows[2]))
+        self.assertEqual(parse_cursor(cursor), ('after', self.key(self.rows[2])))
+        self.assertEqual(parse_cursor(format_cursor('before', self.key(self.rows[0])))[0], 'before')
+
+    def test_malformed_cursor_is_rejected(self):
+        for value in (None, '', 'x.2026-01-01.1', 'a.not-a-date.1', 'a.2026-01-01.id', 'a.2026-01-01'):
+            self.assertIsNone(parse_cursor(value), value)
+
+    def test_seek_after_and_before(self):
+        first = self.page(1)
+        self.assertTrue(first.paginator.estimated)
+        self.assertEqual(list(first.object_list), self.rows[:3])
+        self.assertFalse(first.has_previous())
+        self.assertTrue(first.has_next())
+
+        second = self.page(2, ('after', self.key(self.rows[2])))
+        self.assertEqual(list(second.object_list), self.rows[3:6])
+        self.assertTrue(second.has_previous())
+        self.assertTrue(second.has_next())
+
+        last = self.page(3, ('after', self.key(self.rows[5])))
+        self.assertEqual(list(last.object_list), self.rows[6:])
+        self.assertTrue(last.has_previous())
+        self.assertFalse(last.has_next())
+
+        # Seeking backwards fetches in reverse and returns the rows in changelist order
+        back = self.page(2, ('before', self.key(self.rows[6])))
+        self.assertEqual(list(back.object_list), self.rows[3:6])
+        self.assertTrue(back.has_previous())
+        self.assertTrue(back.has_next())
+
+        back_to_first = self.page(1, ('before', self.key(self.rows[3])))
+        self.assertEqual(list(back_to_first.object_list), self.rows[:3])
+        self.assertFalse(back_to_first.has_previous())
+
+    def test_plain_page_number_uses_offset(self):
+        page = self.page(2)
+        self.assertEqual(list(page.object_list), self.rows[3:6])
+        self.assertTrue(page.has_previous())
+
+
+@override_settings(HANGERLINE_ADMIN_EXACT_COUNT_LIMIT=2)
+class KeysetChangeListTests(TestCase):
+    """The QC changelist's Previous / Next links carry the cursor"""
+
+    def setUp(self):
+        self.rows = create_qc_rows()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        self.url = reverse('admin:hangerline_qualitycontrolrepair_changelist')
+        patcher = mock.patch.object(admin.site._registry[QualityControlRepair], 'list_per_page', 3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def changelist(self, query=''):
+        response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, 200)
+        return response.context['cl']
+
+    def test_links_round_trip(self):
+        first = self.changelist()
+        self.assertTrue(first.result_count_estimated)
+        self.assertEqual(list(first.result_list), self.rows[:3])
+        self.assertIsNone(first.previous_page_url)
+        self.assertIn('cursor=a.', first.next_page_url)
+
+        second = self.changelist(first.next_page_url)
+        self.assertEqual(list(second.result_list), self.rows[3:6])
+        # Page 2 goes back to the plain first page
+        self.assertNotIn('cursor', second.previous_page_url)
+        self.assertIn('cursor=a.', second.next_page_url)
+
+        third = self.changelist(second.next_page_url)
+        self.assertEqual(list(third.result_list), self.rows[6:])
+        self.assertIsNone(third.next_page_url)
+        self.assertIn('cursor=b.', third.previous_page_url)
+
+        back = self.changelist(third.previous_page_url)
+        self.assertEqual(list(back.result_list), self.rows[3:6])
+
+    def test_malformed_cursor_is_ignored(self):
+        first = self.changelist('?cursor=garbage')
+        self.assertEqual(list(first.result_list), self.rows[:3])
+
+        # Without a usable cursor a deeper page falls back to OFFSET
+        second = self.changelist('?p=2&cursor=garbage')
+        self.assertEqual(list(second.result_list), self.rows[3:6])
@@ -0,0 +1,118 @@
+"""
+Per-day production trend store.
+
+Trend charts cover the trailing 30 days, but only the most recent days can
+still change. Days older than HANGERLINE_TREND_REOPEN_DAYS are "closed". They
+are computed from daily_production_rollup and kept in the cache for
+HANGERLINE_TREND_CACHE_SECONDS. Each day's key includes that day's rebuild
+stamp (rollup_day_stamp) for the filtered lines, so a late correction that
+rebuilds an old day replaces just that day, while the ETL loading today's rows
+leaves the closed days alone. Days without production are not stored, so an
+empty or not-yet-built rollup is never cached as "no production". Only the
+open days (today plus the reopen window) and the uncached days are queried on
+each request.
+"""
+
+from datetime import date, timedelta
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Max
+
+from .models import RollupDayStamp
+from .rollups import ROLLUP_DAILY_PRODUCTION
+
+CACHE_PREFIX = 'hangerline:trend'
+
+
+def _filter_key(lines, shifts, operations):
+    filters = repr((sorted(lines or []), sorted(shifts or []), sorted(operations or [])))
+    return hashlib.md5(filters.encode()).hexdigest()
+
+
+def _day_stamps(days, lines):
+    """{day: latest daily_production_rollup rebuild of the given lines (all lines if none) on that day}"""
+    stamps = RollupDayStamp.objects.filter(rollup=ROLLUP_DAILY_PRODUCTION, day__in=days)
+    if lines:
+        stamps = stamps.filter(source_connection__in=lines)
+    latest = stamps.order_by().values('day').annotate(refreshed_at=Max('refreshed_at'))
+    return {row['day']: row['refreshed_at'] for row in latest}
+
+
+def _query_days(days, lines, shifts, operations):
+    """Aggregate the rollup for the given days, returning {date: point} for days with production"""
+    if not days:
+        return {}
+
+    conditions = ["odp_date = ANY(%s)"]
+    params = [list(days)]
+    for column, values in (('source_connection', lines), ('shift', shifts), ('oc_description', operations)):
+        if values:
+            conditions.append(f"{column} = ANY(%s)")
+            params.append(list(values))
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT
+                odp_date,
+                SUM(loading_qty)::float8 AS total_loading,
+                SUM(unloading_qty)::float8 AS total_offloading,
+                (SUM(efficiency_sum) / NULLIF(SUM(efficiency_count), 0))::float8 AS avg_efficiency,
+                (SUM(loading_qty) - SUM(unloading_qty))::float8 AS total_wip
+            FROM daily_production_rollup
+            WHERE {' AND '.join(conditions)}
+            GROUP BY odp_date
+        """, params)
+        rows = cursor.fetchall()
+
+    return {
+        row[0]: {
+            'loading': row[1] or 0,
+            'offloading': row[2] or 0,
+            'efficiency': row[3] or 0,
+            'wip': row[4] or 0,
+        }
+        for row in rows
+    }
+
+
+def get_daily_trend(start_date, end_date, lines=None, shifts=None, operations=None):
+    """
+    Return {date: {'loading', 'offloading', 'efficiency', 'wip'}} for every day
+    between start_date and end_date (inclusive) that has production.
+    Closed days come from the cache; only open or uncached days hit the database.
+    """
+    reopen_days = getattr(settings, 'HANGERLINE_TREND_REOPEN_DAYS', 2)
+    reopen_from = date.today() - timedelta(days=reopen_days)
+    days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+
+    closed_days = [day for day in days if day < reopen_from]
+    stamps = _day_stamps(closed_days, lines)
+
+    # A day not rebuilt since the stamps were introduced keeps the unstamped key until it is
+    filter_key = _filter_key(lines, shifts, operations)
+    keys = {
+        day: f"{CACHE_PREFIX}:{filter_key}:{day.isoformat()}:{stamps[day].timestamp() if day in stamps else 0}"
+        for day in closed_days
+    }
+    cached = cache.get_many(keys.values())
+
+    trend = {}
+    to_compute = []
+    for day in days:
+        point = cached.get(keys[day]) if day in keys else None
+        if point is None:
+            to_compute.append(day)
+        else:
+            trend[day] = point
+
+    computed = _query_days(to_compute, lines, shifts, operations)
+    trend.update(computed)
+
+    closed = {keys[day]: point for day, point in computed.items() if day in keys}
+    if closed:
+        cache.set_many(closed, timeout=getattr(settings, 'HANGERLINE_TREND_CACHE_SECONDS', 86400))
+
+    return dict(sorted(trend.items()))
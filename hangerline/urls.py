@@ -11,4 +11,5 @@ urlpatterns = [
     path('api/chart/line-loading/', views.chart_data_by_line_loading, name='chart_line_loading'),
     path('api/chart/line-target-summary/', views.chart_data_line_target_summary, name='chart_line_target_summary'),
     path('api/chart/line-wise-targets/', views.chart_data_line_wise_targets, name='chart_line_wise_targets'),
+    path('api/chart/batch/', views.chart_data_batch, name='chart_batch'),
 ]
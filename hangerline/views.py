@@ -1,16 +1,20 @@
 from django.shortcuts import render
 from django.contrib.admin.views.decorators import staff_member_required
 from django.http import JsonResponse
-from django.db.models import Sum, Count, Q
-from datetime import datetime, timedelta
-from .models import OperatorDailyPerformance, LineTarget, Breakdown, BreakdownCategory
+from django.db.models import Q
+from datetime import datetime
+from .models import BreakdownCategory
+from .breakdown_stats import breakdown_date_range, breakdown_minutes_by_category, get_breakdown_dashboard_context
+from .chart_data import CHART_BUILDERS, ChartFilters, get_chart_data
+from .conditional import data_condition
+from .fast_json import FastJsonResponse
+from .production_facts import get_production_facts
 # from .batch_api import fetch_batch_no
 
 
 def django_dashboard(request):
     """Django production dashboard view with summary cards and charts"""
     import json
-    from django.db.models import Sum, Count
     from datetime import datetime
 
     # Get date range from request parameters
@@ -43,152 +47,28 @@ def django_dashboard(request):
         end_date = today
 
     try:
-        # Get summary statistics
-        queryset = OperatorDailyPerformance.objects.filter(
-            odp_date__gte=start_date,
-            odp_date__lte=end_date
-        )
-
-        # Apply line filter if provided
-        if line_filter:
-            queryset = queryset.filter(source_connection=line_filter)
-
-        # Apply shift filter if provided
-        if shift_filter:
-            queryset = queryset.filter(shift=shift_filter)
-
-        # Calculate totals
-        totals = queryset.aggregate(
-            total_loading=Sum('loading_qty'),
-            total_offloading=Sum('unloading_qty'),
-            total_quantity=Sum('odpd_quantity')
-        )
-
-        # Calculate WIP (Loading - Offloading)
-        total_loading = totals['total_loading'] or 0
-        total_offloading = totals['total_offloading'] or 0
-        total_wip = total_loading - total_offloading
-
-        # Get line count
-        line_count = queryset.values('source_connection').distinct().count()
-
-        # Get shift count
-        shift_count = queryset.values('shift').distinct().exclude(shift__isnull=True).exclude(shift='').count()
-
-        # ========== LINE TARGET DATA ==========
-        target_queryset = LineTarget.objects.filter(
-            target_date__gte=start_date,
-            target_date__lte=end_date
-        )
-        if line_filter:
-            target_queryset = target_queryset.filter(source_connection=line_filter)
-
-        # Get total target
-        total_target = target_queryset.aggregate(total=Sum('total_target_qty'))['total'] or 0
-
-        # Calculate variance (target - offloading)
-        variance = total_offloading - total_target
-        variance_percent = round((variance / total_target * 100), 1) if total_target > 0 else 0
-
-        # Achievement percentage
-        achievement_percent = round((total_offloading / total_target * 100), 1) if total_target > 0 else 0
-
-        # Efficiency (offloading / loading * 100)
-        efficiency = round((total_offloading / total_loading * 100), 1) if total_loading > 0 else 0
-
-        # ========== LINE-WISE DATA ==========
-        # Line-wise Loading
-        line_loading_data = (
-            queryset
-            .values('source_connection')
-            .exclude(source_connection__isnull=True)
-            .exclude(source_connection='')
-            .annotate(total=Sum('loading_qty'))
-            .order_by('-total')
-        )
-        line_loading = []
-        for item in line_loading_data:
-            pct = round((item['total'] or 0) / total_loading * 100, 1) if total_loading > 0 else 0
-            line_loading.append({
-                'line': item['source_connection'],
-                'qty': item['total'] or 0,
-                'percent': pct
-            })
-
-        # Line-wise Offloading
-        line_offloading_data = (
-            queryset
-            .values('source_connection')
-            .exclude(source_connection__isnull=True)
-            .exclude(source_connection='')
-            .annotate(
-                offload_total=Sum('unloading_qty'),
-                load_total=Sum('loading_qty')
-            )
-            .order_by('-offload_total')
-        )
-        line_offloading = []
-        for item in line_offloading_data:
-            offload = item['offload_total'] or 0
-            load = item['load_total'] or 0
-            pct = round(offload / total_offloading * 100, 1) if total_offloading > 0 else 0
-            eff = round(offload / load * 100, 1) if load > 0 else 0
-            line_offloading.append({
-                'line': item['source_connection'],
-                'qty': offload,
-                'percent': pct,
-                'efficiency': eff
-            })
-
-        # Line-wise WIP
-        line_wip_data = (
-            queryset
-            .values('source_connection')
-            .exclude(source_connection__isnull=True)
-            .exclude(source_connection='')
-            .annotate(
-                load_total=Sum('loading_qty'),
-                offload_total=Sum('unloading_qty')
-            )
-            .order_by('source_connection')
-        )
-        line_wip = []
-        total_wip_calc = max(total_wip, 1)  # Avoid division by zero
-        for item in line_wip_data:
-            load = item['load_total'] or 0
-            offload = item['offload_total'] or 0
-            wip = load - offload
-            pct = round(abs(wip) / abs(total_wip_calc) * 100, 1) if total_wip != 0 else 0
-            line_wip.append({
-                'line': item['source_connection'],
-                'qty': wip,
-                'percent': min(pct, 100)  # Cap at 100%
-            })
-
-        # Line-wise Targets vs Achievement
-        targets_by_line = target_queryset.values('source_connection').annotate(
-            target_qty=Sum('total_target_qty')
-        ).order_by('source_connection')
-
-        offloading_by_line_map = {
-            item['source_connection']: item['offload_total'] or 0
-            for item in line_offloading_data
-        }
-
-        line_targets = []
-        for item in targets_by_line:
-            line = item['source_connection']
-            target = item['target_qty'] or 0
-            achieved = offloading_by_line_map.get(line, 0)
-            var = achieved - target
-            pct = round(achieved / target * 100, 1) if target > 0 else 0
-            line_targets.append({
-                'line': line,
-                'target': target,
-                'achieved': achieved,
-                'variance': var,
-                'percent': pct
-            })
+        # Every measure on the page comes from a single fact query
+        facts = get_production_facts(start_date, end_date, line_filter, shift_filter)
+
+        totals = {'total_quantity': facts['total_quantity']}
+        total_loading = facts['total_loading']
+        total_offloading = facts['total_offloading']
+        total_wip = facts['total_wip']
+        line_count = facts['line_count']
+        shift_count = facts['shift_count']
+        total_target = facts['total_target']
+        variance = facts['variance']
+        variance_percent = facts['variance_percent']
+        achievement_percent = facts['achievement_percent']
+        efficiency = facts['efficiency']
+
+        line_loading = facts['line_loading']
+        line_offloading = facts['line_offloading']
+        line_wip = facts['line_wip']
+        line_targets = facts['line_targets']
+        line_breakdowns = facts['line_breakdowns']
+        total_breakdown = facts['total_breakdown']
+        breakdown_categories = breakdown_minutes_by_category(start_date, end_date, line_filter, shift_filter)
 
     except Exception as e:
         # Database connection failed, use mock data
@@ -230,16 +110,19 @@ def django_dashboard(request):
             {'line': 'Line-23', 'target': 1180, 'achieved': 2300, 'variance': 1120, 'percent': 194.9},
         ]
 
-    # ========== BREAKDOWN DATA (sample/placeholder) ==========
-    # Since we don't have a Breakdown model, we'll provide sample data
-    # In production, this should be replaced with actual breakdown data
-    breakdown_categories_labels = json.dumps(["Mechanical", "Electrical", "Material", "Operator", "Other"])
-    breakdown_categories_data = json.dumps([30, 25, 20, 15, 10])
-    breakdown_lines_labels = json.dumps([item['source_connection'] for item in line_loading_data[:8]])
-    breakdown_lines_data = json.dumps([10, 15, 12, 8, 20, 18, 14, 16][:len(line_loading_data)])
-    
-    # Total breakdown (sample - replace with actual data)
-    total_breakdown = 120  # minutes
+        line_breakdowns = [
+            {'line': 'Line-21', 'minutes': 10},
+            {'line': 'Line-22', 'minutes': 15},
+            {'line': 'Line-23', 'minutes': 12},
+        ]
+        total_breakdown = 120  # minutes
+        breakdown_categories = [("Mechanical", 30), ("Electrical", 25), ("Material", 20), ("Operator", 15), ("Other", 10)]
+
+    # ========== BREAKDOWN DATA ==========
+    breakdown_categories_labels = json.dumps([name for name, _ in breakdown_categories])
+    breakdown_categories_data = json.dumps([minutes for _, minutes in breakdown_categories])
+    breakdown_lines_labels = json.dumps([item['line'] for item in line_breakdowns[:8]])
+    breakdown_lines_data = json.dumps([item['minutes'] for item in line_breakdowns[:8]])
 
     # Total defects (sample - replace with actual data)
     total_defects = 0
@@ -280,666 +163,92 @@ def django_dashboard(request):
     return render(request, 'admin/hangerline/django_dashboard.html', context)
 
 
+def _chart_response(request, chart_id):
+    return JsonResponse(get_chart_data([chart_id], ChartFilters.from_request(request))[chart_id])
+
+
+@data_condition
 def chart_data_by_shift(request):
     """API endpoint for shift summary data"""
-    # Get date range from request
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-    
-    queryset = OperatorDailyPerformance.objects.all()
-    
-    if start_date:
-        queryset = queryset.filter(odp_date__gte=start_date)
-    if end_date:
-        queryset = queryset.filter(odp_date__lte=end_date)
-    else:
-        # Default: current month
-        now = datetime.now()
-        queryset = queryset.filter(odp_date__year=now.year, odp_date__month=now.month)
-    
-    data = (
-        queryset
-        .values('shift')
-        .exclude(shift__isnull=True)
-        .exclude(shift='')
-        .annotate(
-            total_loading=Sum('loading_qty'),
-            total_unloading=Sum('unloading_qty'),
-            total_wip=Sum('loading_qty') - Sum('unloading_qty')
-        )
-        .order_by('shift')
-    )
-    
-    labels = [d['shift'] for d in data]
-    loading = [d['total_loading'] or 0 for d in data]
-    unloading = [d['total_unloading'] or 0 for d in data]
-    wip = [(d['total_loading'] or 0) - (d['total_unloading'] or 0) for d in data]
-    
-    return JsonResponse({
-        'labels': labels,
-        'datasets': [
-            {'label': 'Loading', 'data': loading, 'backgroundColor': 'rgba(54, 162, 235, 0.8)', 'stack': 'Stack 0'},
-            {'label': 'Offloading', 'data': unloading, 'backgroundColor': 'rgba(255, 99, 132, 0.8)', 'stack': 'Stack 0'},
-            {'label': 'WIP', 'data': wip, 'backgroundColor': 'rgba(255, 206, 86, 0.8)', 'stack': 'Stack 0'},
-        ]
-    })
+    return _chart_response(request, 'shift')
 
 
 @staff_member_required
+@data_condition
 def chart_data_by_source(request):
     """API endpoint for source connection summary data"""
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-    
-    queryset = OperatorDailyPerformance.objects.all()
-    
-    if start_date:
-        queryset = queryset.filter(odp_date__gte=start_date)
-    if end_date:
-        queryset = queryset.filter(odp_date__lte=end_date)
-    else:
-        now = datetime.now()
-        queryset = queryset.filter(odp_date__year=now.year, odp_date__month=now.month)
-    
-    data = (
-        queryset
-        .values('source_connection')
-        .exclude(source_connection__isnull=True)
-        .exclude(source_connection='')
-        .annotate(
-            total_loading=Sum('loading_qty'),
-            total_unloading=Sum('unloading_qty')
-        )
-        .order_by('source_connection')
-    )
-    
-    labels = [d['source_connection'] for d in data]
-    loading = [d['total_loading'] or 0 for d in data]
-    unloading = [d['total_unloading'] or 0 for d in data]
-    wip = [(d['total_loading'] or 0) - (d['total_unloading'] or 0) for d in data]
-    
-    return JsonResponse({
-        'labels': labels,
-        'datasets': [
-            {'label': 'Loading', 'data': loading, 'backgroundColor': 'rgba(54, 162, 235, 0.8)', 'stack': 'Stack 0'},
-            {'label': 'Offloading', 'data': unloading, 'backgroundColor': 'rgba(255, 99, 132, 0.8)', 'stack': 'Stack 0'},
-            {'label': 'WIP', 'data': wip, 'backgroundColor': 'rgba(255, 206, 86, 0.8)', 'stack': 'Stack 0'},
-        ]
-    })
+    return _chart_response(request, 'source')
 
 
 @staff_member_required
+@data_condition
 def chart_data_by_production(request):
     """API endpoint for production category summary data"""
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-    
-    queryset = OperatorDailyPerformance.objects.all()
-    
-    if start_date:
-        queryset = queryset.filter(odp_date__gte=start_date)
-    if end_date:
-        queryset = queryset.filter(odp_date__lte=end_date)
-    else:
-        now = datetime.now()
-        queryset = queryset.filter(odp_date__year=now.year, odp_date__month=now.month)
-    
-    # Production categories
-    categories = {
-        'Loading': queryset.filter(oc_description='Loading/Panel Segregation').aggregate(total=Sum('odpd_quantity'))['total'] or 0,
-        'Offloading': queryset.filter(oc_description='Garment Insert in Poly Bag & Close').aggregate(total=Sum('odpd_quantity'))['total'] or 0,
-        'QC(midline)': queryset.filter(oc_description__icontains='midline').aggregate(total=Sum('odpd_quantity'))['total'] or 0,
-        'QC(endline)': queryset.filter(oc_description__icontains='endline').aggregate(total=Sum('odpd_quantity'))['total'] or 0,
-        'QC(final)': queryset.filter(oc_description__icontains='final').aggregate(total=Sum('odpd_quantity'))['total'] or 0,
-    }
-    
-    labels = list(categories.keys())
-    values = list(categories.values())
-    
-    colors = [
-        'rgba(102, 126, 234, 0.8)',  # Purple for Loading (matches Total Loading stat card)
-        'rgba(240, 147, 251, 0.8)',  # Pink/Red for Offloading (matches Total Offloading stat card)
-        'rgba(255, 206, 86, 0.7)',   # Yellow for QC(midline)
-        'rgba(75, 192, 192, 0.7)',   # Teal for QC(endline)
-        'rgba(153, 102, 255, 0.7)',  # Purple variant for QC(final)
-    ]
-    
-    return JsonResponse({
-        'labels': labels,
-        'datasets': [{
-            'label': 'Quantity',
-            'data': values,
-            'backgroundColor': colors,
-        }]
-    })
+    return _chart_response(request, 'production')
 
 
 @staff_member_required
+@data_condition
 def chart_data_line(request):
     """API endpoint for daily trend line chart"""
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-
-    queryset = OperatorDailyPerformance.objects.all()
-
-    # if start_date:
-    #     queryset = queryset.filter(odp_date__gte=start_date)
-    # if end_date:
-    #     queryset = queryset.filter(odp_date__lte=end_date)
-    # else:
-        # Default: last 30 days
-    end = datetime.now().date()
-    start = end - timedelta(days=30)
-    queryset = queryset.filter(odp_date__gte=start, odp_date__lte=end)
-
-    data = (
-        queryset
-        .values('odp_date')
-        .annotate(
-            total_loading=Sum('loading_qty'),
-            total_unloading=Sum('unloading_qty'),
-            # total_quantity=Sum('odpd_quantity')
-        )
-        .order_by('odp_date')
-    )
-
-    labels = [d['odp_date'].strftime('%Y-%m-%d') for d in data]
-    loading = [d['total_loading'] or 0 for d in data]
-    unloading = [d['total_unloading'] or 0 for d in data]
-    wip = [(d['total_loading'] or 0) - (d['total_unloading'] or 0) for d in data]
-
-    return JsonResponse({
-        'labels': labels,
-        'datasets': [
-            {'label': 'Loading', 'data': loading, 'borderColor': 'rgba(54, 162, 235, 1)', 'fill': False},
-            {'label': 'Offloading', 'data': unloading, 'borderColor': 'rgba(255, 99, 132, 1)', 'fill': False},
-            {'label': 'WIP', 'data': wip, 'borderColor': 'rgba(255, 206, 86, 1)', 'fill': False},
-        ]
-    })
+    return _chart_response(request, 'line')
 
 
 @staff_member_required
+@data_condition
 def chart_data_by_line_offloading(request):
     """API endpoint for line-wise offloading summary with percentages"""
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-
-    queryset = OperatorDailyPerformance.objects.all()
-
-    if start_date:
-        queryset = queryset.filter(odp_date__gte=start_date)
-    if end_date:
-        queryset = queryset.filter(odp_date__lte=end_date)
-    else:
-        now = datetime.now()
-        queryset = queryset.filter(odp_date__year=now.year, odp_date__month=now.month)
-
-    data = (
-        queryset
-        .values('source_connection')
-        .exclude(source_connection__isnull=True)
-        .exclude(source_connection='')
-        .annotate(
-            total_offloading=Sum('unloading_qty')
-        )
-        .order_by('-total_offloading')
-    )
-
-    # Calculate total offloading for percentages
-    total_offloading = sum(d['total_offloading'] or 0 for d in data)
-
-    labels = [d['source_connection'] for d in data]
-    values = [d['total_offloading'] or 0 for d in data]
-    percentages = [(v / total_offloading * 100) if total_offloading > 0 else 0 for v in values]
-
-    return JsonResponse({
-        'labels': labels,
-        'datasets': [{
-            'label': 'Offloading Sum',
-            'data': values,
-            'backgroundColor': [
-                'rgba(52, 152, 219, 0.8)',
-                'rgba(231, 76, 60, 0.8)',
-                'rgba(46, 204, 113, 0.8)',
-                'rgba(155, 89, 182, 0.8)',
-                'rgba(243, 156, 18, 0.8)',
-                'rgba(26, 188, 156, 0.8)',
-                'rgba(149, 165, 166, 0.8)',
-                'rgba(44, 62, 80, 0.8)',
-            ],
-            'borderColor': [
-                'rgba(52, 152, 219, 1)',
-                'rgba(231, 76, 60, 1)',
-                'rgba(46, 204, 113, 1)',
-                'rgba(155, 89, 182, 1)',
-                'rgba(243, 156, 18, 1)',
-                'rgba(26, 188, 156, 1)',
-                'rgba(149, 165, 166, 1)',
-                'rgba(44, 62, 80, 1)',
-            ],
-            'borderWidth': 2,
-            'borderRadius': 8,
-            'borderSkipped': False,
-        }],
-        'percentages': percentages,
-        'total_offloading': total_offloading
-    })
+    return _chart_response(request, 'line-offloading')
 
 
 @staff_member_required
+@data_condition
 def chart_data_by_line_loading(request):
     """API endpoint for line-wise loading summary with percentages"""
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-
-    queryset = OperatorDailyPerformance.objects.all()
-
-    if start_date:
-        queryset = queryset.filter(odp_date__gte=start_date)
-    if end_date:
-        queryset = queryset.filter(odp_date__lte=end_date)
-    else:
-        now = datetime.now()
-        queryset = queryset.filter(odp_date__year=now.year, odp_date__month=now.month)
-
-    data = (
-        queryset
-        .values('source_connection')
-        .exclude(source_connection__isnull=True)
-        .exclude(source_connection='')
-        .annotate(
-            total_loading=Sum('loading_qty')
-        )
-        .order_by('-total_loading')
-    )
-
-    # Calculate total loading for percentages
-    total_loading = sum(d['total_loading'] or 0 for d in data)
-
-    labels = [d['source_connection'] for d in data]
-    values = [d['total_loading'] or 0 for d in data]
-    percentages = [(v / total_loading * 100) if total_loading > 0 else 0 for v in values]
-
-    return JsonResponse({
-        'labels': labels,
-        'datasets': [{
-            'label': 'Loading Sum',
-            'data': values,
-            'backgroundColor': [
-                'rgba(52, 152, 219, 0.8)',
-                'rgba(231, 76, 60, 0.8)',
-                'rgba(46, 204, 113, 0.8)',
-                'rgba(155, 89, 182, 0.8)',
-                'rgba(243, 156, 18, 0.8)',
-                'rgba(26, 188, 156, 0.8)',
-                'rgba(149, 165, 166, 0.8)',
-                'rgba(44, 62, 80, 0.8)',
-            ],
-            'borderColor': [
-                'rgba(52, 152, 219, 1)',
-                'rgba(231, 76, 60, 1)',
-                'rgba(46, 204, 113, 1)',
-                'rgba(155, 89, 182, 1)',
-                'rgba(243, 156, 18, 1)',
-                'rgba(26, 188, 156, 1)',
-                'rgba(149, 165, 166, 1)',
-                'rgba(44, 62, 80, 1)',
-            ],
-            'borderWidth': 2,
-            'borderRadius': 8,
-            'borderSkipped': False,
-        }],
-        'percentages': percentages,
-        'total_loading': total_loading
-    })
+    return _chart_response(request, 'line-loading')
 
 
 @staff_member_required
+@data_condition
 def chart_data_line_target_summary(request):
     """API endpoint for line target summary data"""
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-
-    queryset = LineTarget.objects.all()
-
-    if start_date:
-        queryset = queryset.filter(target_date__gte=start_date)
-    if end_date:
-        queryset = queryset.filter(target_date__lte=end_date)
-    else:
-        # Default: current month
-        now = datetime.now()
-        queryset = queryset.filter(target_date__year=now.year, target_date__month=now.month)
-
-    # Aggregate line target data
-    targets_data = queryset.aggregate(
-        total_targets=Sum('total_target_qty'),
-        target_lines=Count('id')
-    )
-
-    # Get actual offloading data for the same period
-    odp_queryset = OperatorDailyPerformance.objects.all()
-    if start_date:
-        odp_queryset = odp_queryset.filter(odp_date__gte=start_date)
-    if end_date:
-        odp_queryset = odp_queryset.filter(odp_date__lte=end_date)
-    else:
-        now = datetime.now()
-        odp_queryset = odp_queryset.filter(odp_date__year=now.year, odp_date__month=now.month)
-
-    actual_data = odp_queryset.aggregate(
-        total_offloading=Sum('unloading_qty')
-    )
-
-    # Calculate variance and achievement rate
-    target_qty = targets_data['total_targets'] or 0
-    offloading_qty = actual_data['total_offloading'] or 0
-    variance = target_qty - offloading_qty
-    achievement_rate = (offloading_qty / target_qty * 100) if target_qty > 0 else 0
-
-    return JsonResponse({
-        'total_targets': target_qty,
-        'total_offloading': offloading_qty,
-        'variance': variance,
-        'achievement_rate': round(achievement_rate, 1),
-        'target_lines': targets_data['target_lines'] or 0,
-    })
+    return _chart_response(request, 'line-target-summary')
 
 
 @staff_member_required
+@data_condition
 def chart_data_line_wise_targets(request):
     """API endpoint for line-wise target summary with percentages"""
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
+    return _chart_response(request, 'line-wise-targets')
 
-    # Get line targets
-    target_queryset = LineTarget.objects.all()
-    if start_date:
-        target_queryset = target_queryset.filter(target_date__gte=start_date)
-    if end_date:
-        target_queryset = target_queryset.filter(target_date__lte=end_date)
-    else:
-        now = datetime.now()
-        target_queryset = target_queryset.filter(target_date__year=now.year, target_date__month=now.month)
-
-    # Get actual offloading by line
-    odp_queryset = OperatorDailyPerformance.objects.all()
-    if start_date:
-        odp_queryset = odp_queryset.filter(odp_date__gte=start_date)
-    if end_date:
-        odp_queryset = odp_queryset.filter(odp_date__lte=end_date)
-    else:
-        now = datetime.now()
-        odp_queryset = odp_queryset.filter(odp_date__year=now.year, odp_date__month=now.month)
-
-    # Aggregate targets by line
-    targets_by_line = target_queryset.values('source_connection').annotate(
-        target_qty=Sum('total_target_qty')
-    ).order_by('source_connection')
-
-    # Aggregate actual offloading by line
-    offloading_by_line = odp_queryset.values('source_connection').annotate(
-        actual_qty=Sum('unloading_qty')
-    ).order_by('source_connection')
-
-    # Calculate total target quantity
-    total_target_qty = sum(item['target_qty'] for item in targets_by_line)
-
-    # Create a map for quick lookup
-    offloading_map = {item['source_connection']: item['actual_qty'] for item in offloading_by_line}
-
-    # Combine data
-    result_data = []
-    for target_item in targets_by_line:
-        line = target_item['source_connection']
-        target_qty = target_item['target_qty'] or 0
-        actual_qty = offloading_map.get(line, 0)
-
-        # Calculate percentages
-        target_percentage = (target_qty / total_target_qty * 100) if total_target_qty > 0 else 0
-        achievement_rate = (actual_qty / target_qty * 100) if target_qty > 0 else 0
-
-        result_data.append({
-            'line': line,
-            'target_qty': target_qty,
-            'actual_qty': actual_qty,
-            'target_percentage': round(target_percentage, 1),
-            'achievement_rate': round(achievement_rate, 1)
-        })
-
-    return JsonResponse({
-        'data': result_data,
-        'total_target_qty': total_target_qty
-    })
-
-
-def breakdown_dashboard(request):
-    """Breakdown dashboard view with summary cards and charts"""
-    from django.db.models import Sum, Count, Avg, F, ExpressionWrapper, fields
-    from django.db.models.functions import Extract
-    from datetime import datetime, date
-    import json
 
-    # Get date range from request parameters
-    start_date_str = request.GET.get('start_date')
-    end_date_str = request.GET.get('end_date')
+@staff_member_required
+@data_condition
+def chart_data_batch(request):
+    """
+    API endpoint returning several charts in one response, e.g.
+    ?charts=source,shift,production&start_date=...&end_date=...&line=...&shift=...
+    All charts share the filters and a single production scan.
+    """
+    chart_ids = [chart_id for chart_id in request.GET.get('charts', '').split(',') if chart_id]
+    if not chart_ids:
+        return JsonResponse({'error': f"Pass charts=<ids>, one or more of: {', '.join(CHART_BUILDERS)}"}, status=400)
 
-    # Parse dates or use current month as default
-    if start_date_str:
-        try:
-            start_date = date.fromisoformat(start_date_str)
-        except ValueError:
-            start_date = None
-    else:
-        start_date = None
+    try:
+        data = get_chart_data(chart_ids, ChartFilters.from_request(request))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
 
-    if end_date_str:
-        try:
-            end_date = date.fromisoformat(end_date_str)
-        except ValueError:
-            end_date = None
-    else:
-        end_date = None
+    return FastJsonResponse(data)
 
-    # Default to current month if no dates provided
-    if not start_date or not end_date:
-        today = date.today()
-        current_month = today.replace(day=1)
-        next_month = date(today.year + (1 if today.month == 12 else 0), (today.month % 12) + 1, 1)
-        start_date = current_month
-        end_date = next_month
-    else:
-        # For display purposes, use the start date's month
-        current_month = start_date.replace(day=1)
-
-    # Get breakdown data first
-    breakdowns = Breakdown.objects.filter(
-        p_date__gte=start_date,
-        p_date__lte=end_date
-    )
-
-    # Calculate statistics manually since we can't use database aggregation with model properties
-    total_breakdowns = breakdowns.count()
-    total_time = sum(b.breakdown_time_minutes for b in breakdowns)
-    avg_time = total_time / total_breakdowns if total_breakdowns > 0 else 0
-
-    total_stats = {
-        'total_breakdowns': total_breakdowns,
-        'total_time': total_time,
-        'avg_time': avg_time
-    }
 
-    # Group by category manually
-    from collections import defaultdict
-    category_data = defaultdict(lambda: {'count': 0, 'total_time': 0, 'times': []})
-
-    for breakdown in breakdowns:
-        cat_name = breakdown.breakdown_category.name
-        time_mins = breakdown.breakdown_time_minutes
-        category_data[cat_name]['count'] += 1
-        category_data[cat_name]['total_time'] += time_mins
-        category_data[cat_name]['times'].append(time_mins)
-
-    # Convert to list and calculate averages
-    category_stats = []
-    for cat_name, data in category_data.items():
-        avg_time = data['total_time'] / data['count'] if data['count'] > 0 else 0
-        category_stats.append({
-            'breakdown_category__name': cat_name,
-            'count': data['count'],
-            'total_time': data['total_time'],
-            'avg_time': avg_time
-        })
-
-    # Sort by total time descending
-    category_stats.sort(key=lambda x: x['total_time'], reverse=True)
-
-    # Calculate percentage for each category
-    total_time_all = total_stats['total_time'] or 0
-    for stat in category_stats:
-        if total_time_all > 0:
-            stat['percentage'] = round((stat['total_time'] or 0) / total_time_all * 100, 1)
-        else:
-            stat['percentage'] = 0.0
-
-    # Group by line manually
-    line_data = defaultdict(lambda: {'count': 0, 'total_time': 0, 'times': []})
-
-    for breakdown in breakdowns:
-        line_name = breakdown.line_no
-        time_mins = breakdown.breakdown_time_minutes
-        line_data[line_name]['count'] += 1
-        line_data[line_name]['total_time'] += time_mins
-        line_data[line_name]['times'].append(time_mins)
-
-    # Convert to list and calculate averages
-    line_stats = []
-    for line_name, data in line_data.items():
-        avg_time = data['total_time'] / data['count'] if data['count'] > 0 else 0
-        line_stats.append({
-            'line_no': line_name,
-            'count': data['count'],
-            'total_time': data['total_time'],
-            'avg_time': avg_time
-        })
-
-    # Sort by total time descending
-    line_stats.sort(key=lambda x: x['total_time'], reverse=True)
-
-    # Calculate percentage for each line
-    for stat in line_stats:
-        if total_time_all > 0:
-            stat['percentage'] = round((stat['total_time'] or 0) / total_time_all * 100, 1)
-        else:
-            stat['percentage'] = 0.0
-
-    # Prepare data for category pie chart
-    category_chart_labels = [stat['breakdown_category__name'] for stat in category_stats] if category_stats else []
-    category_chart_data = [stat['total_time'] or 0 for stat in category_stats] if category_stats else []
-
-    # Prepare data for line pie chart
-    line_chart_labels = [stat['line_no'] for stat in line_stats] if line_stats else []
-    line_chart_data = [stat['total_time'] or 0 for stat in line_stats] if line_stats else []
-
-    # Colors for pie charts
-    chart_colors = [
-        '#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF',
-        '#FF9F40', '#FF6384', '#C9CBCF', '#4BC0C0', '#FF6384'
-    ]
-
-    # Calculate trend data (breakdown time by date and line)
-    trend_data = defaultdict(lambda: defaultdict(float))
-
-    # Group breakdowns by date and line
-    for breakdown in breakdowns:
-        date_str = breakdown.p_date.isoformat()
-        line_name = breakdown.line_no
-        trend_data[date_str][line_name] += breakdown.breakdown_time_minutes
-
-    # Prepare data for line-wise trend chart
-    dates = sorted(trend_data.keys())
-    lines = sorted(set(line for date_data in trend_data.values() for line in date_data.keys()))
-
-    trend_chart_data = []
-    for line in lines:
-        line_data = []
-        for date in dates:
-            line_data.append(trend_data[date].get(line, 0))
-        trend_chart_data.append({
-            'label': f'Line {line}',
-            'data': line_data,
-            'borderColor': chart_colors[len(trend_chart_data) % len(chart_colors)],
-            'backgroundColor': chart_colors[len(trend_chart_data) % len(chart_colors)].replace('1)', '0.1)'),
-            'fill': False,
-            'tension': 0.1
-        })
-
-    # Calculate total downtime trend data (sum across all lines per date)
-    total_trend_data = []
-    for date in dates:
-        total_time = sum(trend_data[date].values())
-        total_trend_data.append(total_time)
-
-    total_trend_chart_data = [{
-        'label': 'Total Downtime',
-        'data': total_trend_data,
-        'borderColor': '#dc3545',
-        'backgroundColor': 'rgba(220, 53, 69, 0.1)',
-        'fill': False,
-        'tension': 0.1,
-        'borderWidth': 3,
-        'pointBackgroundColor': '#dc3545',
-        'pointBorderColor': '#fff',
-        'pointBorderWidth': 2,
-        'pointRadius': 5
-    }]
-
-    # Calculate category-wise trend data (breakdown time by category over time)
-    category_trend_data = defaultdict(lambda: defaultdict(float))
-
-    # Group breakdowns by date and category
-    for breakdown in breakdowns:
-        date_str = breakdown.p_date.isoformat()
-        category_name = breakdown.breakdown_category.name
-        category_trend_data[date_str][category_name] += breakdown.breakdown_time_minutes
-
-    # Prepare data for category trend chart
-    # Get all unique categories across all dates
-    all_categories = sorted(set(category for date_data in category_trend_data.values() for category in date_data.keys()))
-
-    category_trend_chart_data = []
-    for category_name in all_categories:
-        category_line_data = []
-        for date in dates:
-            category_line_data.append(category_trend_data[date].get(category_name, 0))
-        category_trend_chart_data.append({
-            'label': category_name,
-            'data': category_line_data,
-            'borderColor': chart_colors[len(category_trend_chart_data) % len(chart_colors)],
-            'backgroundColor': chart_colors[len(category_trend_chart_data) % len(chart_colors)].replace('1)', '0.1)'),
-            'fill': False,
-            'tension': 0.1,
-            'borderWidth': 2,
-            'pointBackgroundColor': chart_colors[len(category_trend_chart_data) % len(chart_colors)],
-            'pointBorderColor': '#fff',
-            'pointBorderWidth': 1,
-            'pointRadius': 4
-        })
+def breakdown_dashboard(request):
+    """Breakdown dashboard view with summary cards and charts"""
+    start_date, end_date, current_month = breakdown_date_range(request)
 
     context = {
         'title': 'Breakdown Dashboard',
-        'total_stats': total_stats,
-        'category_stats': category_stats,
-        'line_stats': line_stats,
-        'category_chart_labels': json.dumps(category_chart_labels),
-        'category_chart_data': json.dumps(category_chart_data),
-        'line_chart_labels': json.dumps(line_chart_labels),
-        'line_chart_data': json.dumps(line_chart_data),
-        'trend_dates': json.dumps(dates),
-        'trend_chart_data': json.dumps(trend_chart_data),
-        'total_trend_chart_data': json.dumps(total_trend_chart_data),
-        'category_trend_chart_data': json.dumps(category_trend_chart_data),
-        'chart_colors': json.dumps(chart_colors),
+        **get_breakdown_dashboard_context(start_date, end_date),
         'current_month': current_month.strftime('%B %Y'),
         'start_date': start_date.isoformat(),
         'end_date': end_date.isoformat(),
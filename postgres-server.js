@@ -376,13 +376,13 @@ app.get('/api/production-data', async (req, res) => {
 
       // Query 6: Breakdown
       pool.query(`
-        SELECT SUM(EXTRACT(EPOCH FROM (b.time_end - b.time_start)) / 60) AS duration_minutes
+        SELECT SUM(b.breakdown_minutes) AS duration_minutes
         FROM breakdown b WHERE b.p_date >= '2026-12-01' AND b.p_date <= $1::date
       `, [endDate]),
 
       // Query 7: Breakdown by Category
       pool.query(`
-        SELECT c.name AS category_name, SUM(EXTRACT(EPOCH FROM (b.time_end - b.time_start)) / 60) AS duration_minutes
+        SELECT c.name AS category_name, SUM(b.breakdown_minutes) AS duration_minutes
         FROM breakdown b JOIN breakdown_category c ON b.breakdown_category_id = c.id
         WHERE b.p_date >= '2026-12-01' AND b.p_date <= $1::date
         GROUP BY c.name ORDER BY duration_minutes DESC
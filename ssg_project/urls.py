@@ -21,8 +21,10 @@ from django.conf import settings
 from django.conf.urls.static import static
 from datetime import date
 from rest_framework_simplejwt.views import TokenRefreshView
-from hangerline.api_views import LoginView, DashboardAPIView, UserView
-from hangerline.dashboard_utils import get_dashboard_data, convert_decimals
+from hangerline.api_views import LoginView, DashboardAPIView, DateWiseEfficiencyAPIView, POProgressAPIView, UserView
+from hangerline.conditional import data_condition
+from hangerline.dashboard_cache import get_cached_dashboard_data
+from hangerline.fast_json import FastJsonResponse, dumps
 
 def dashboard_view(request):
     """React dashboard view with real data"""
@@ -30,7 +32,6 @@ def dashboard_view(request):
     from django.db.models.functions import ExtractMonth, ExtractYear
     from datetime import datetime, date
     from django.http import JsonResponse
-    import json
     from hangerline.models import OperatorDailyPerformance, Breakdown, LineTarget
     import logging
 
@@ -61,8 +62,8 @@ def dashboard_view(request):
             logger.info(f"Using provided date range: {start_date} to {end_date}")
 
         # Get data for initial page load
-        logger.info("Calling get_dashboard_data...")
-        dashboard_data = get_dashboard_data(start_date, end_date, line_filter, shift_filter)
+        logger.info("Calling get_cached_dashboard_data...")
+        dashboard_data = get_cached_dashboard_data(start_date, end_date, line_filter, shift_filter)
         logger.info(f"Dashboard data retrieved, keys: {list(dashboard_data.keys()) if dashboard_data else 'None'}")
 
         # Pass data to template as JSON
@@ -84,7 +85,7 @@ def dashboard_view(request):
             logger.info(f"Template file read successfully, length: {len(html_content)}")
 
             # Inject data into the HTML by adding a script tag
-            dashboard_data_json = json.dumps(dashboard_data, default=str)
+            dashboard_data_json = dumps(dashboard_data).decode()
             data_script = f'<script>window.data = {dashboard_data_json};</script>'
 
             # Insert the data script before the closing </head> tag
@@ -101,7 +102,7 @@ def dashboard_view(request):
         except FileNotFoundError as e:
             logger.error(f"FileNotFoundError reading template: {e}")
             return HttpResponse(f"Dashboard template not found: {e}", status=404)
-        except json.JSONEncodeError as e:
+        except (TypeError, ValueError) as e:
             logger.error(f"JSON encoding error: {e}")
             return HttpResponse(f"Dashboard data serialization error: {e}", status=500)
         except Exception as e:
@@ -112,6 +113,7 @@ def dashboard_view(request):
         logger.error(f"Unexpected error in dashboard_view outer try: {e}", exc_info=True)
         return HttpResponse(f"Dashboard initialization error: {str(e)}", status=500)
 
+@data_condition
 def get_dashboard_data_api(request):
     """API endpoint for filtered dashboard data"""
     from django.http import JsonResponse
@@ -145,14 +147,14 @@ def get_dashboard_data_api(request):
             logger.info("No date filters provided - showing all available data")
 
         # Get filtered data
-        logger.info(f"Calling get_dashboard_data with: start={start_date}, end={end_date}, line={line_filter}, shift={shift_filter}")
-        dashboard_data = get_dashboard_data(start_date, end_date, line_filter, shift_filter)
+        logger.info(f"Calling get_cached_dashboard_data with: start={start_date}, end={end_date}, line={line_filter}, shift={shift_filter}")
+        dashboard_data = get_cached_dashboard_data(start_date, end_date, line_filter, shift_filter)
 
         logger.info(f"Dashboard data keys: {list(dashboard_data.keys()) if dashboard_data else 'None'}")
         if dashboard_data and 'summary' in dashboard_data:
             logger.info(f"Returning dashboard data with summary: {dashboard_data['summary']}")
 
-        return JsonResponse(dashboard_data)
+        return FastJsonResponse(dashboard_data)
 
     except Exception as e:
         logger.error(f"API Error: {str(e)}", exc_info=True)
@@ -182,6 +184,8 @@ urlpatterns = [
     path('api/login/', LoginView.as_view(), name='api_login'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/dashboard/', DashboardAPIView.as_view(), name='api_dashboard'),
+    path('api/dashboard/efficiency/', DateWiseEfficiencyAPIView.as_view(), name='api_dashboard_efficiency'),
+    path('api/po-progress/', POProgressAPIView.as_view(), name='api_po_progress'),
     path('api/user/', UserView.as_view(), name='api_user'),
 
     # App URLs